@@ -0,0 +1,147 @@
+"""Micro-benchmarks of the Lednice coordinator hot paths."""
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from custom_components.lednice.const import (
+    DOMAIN,
+    SERVICE_ANALYTICS,
+    SERVICE_CONSUME_PRODUCTS,
+    SERVICE_REPORT,
+    SERVICE_VERIFY_PIN,
+)
+from custom_components.lednice.sensor import (
+    LedniceConsumptionSensor,
+    LedniceHistorySensor,
+    LedniceInventorySensor,
+    LedniceRoomConsumptionSensor,
+)
+
+from stub_hass import async_make_coordinator, reservation_pin
+
+RESERVATIONS = [10, 100, 1000]
+LOG_ENTRIES = [1_000, 100_000]
+
+
+@pytest.mark.parametrize("reservations", RESERVATIONS)
+def bench_get_room_by_pin(bench, hass, event_loop_runner, reservations):
+    coordinator = event_loop_runner(async_make_coordinator(hass, reservations=reservations))
+    pin = reservation_pin(reservations // 2)
+    assert coordinator.get_room_by_pin(pin)
+
+    bench(coordinator.get_room_by_pin, pin)
+
+
+@pytest.mark.parametrize("reservations", RESERVATIONS)
+def bench_validate_previo_pin_time(bench, hass, event_loop_runner, reservations):
+    coordinator = event_loop_runner(async_make_coordinator(hass, reservations=reservations))
+    pin = reservation_pin(reservations // 2)
+    entry = coordinator._pin_index.lookup(pin)[0]
+    now = time.time()
+
+    bench(coordinator._validate_previo_pin_time, entry, pin, now)
+
+
+@pytest.mark.parametrize("log_entries", LOG_ENTRIES)
+def bench_remove_item(bench, hass, event_loop_runner, log_entries):
+    coordinator = event_loop_runner(async_make_coordinator(hass, log_entries=log_entries))
+
+    def remove_item():
+        return event_loop_runner(coordinator.remove_item("Product 1", 1, "room3", 21.0))
+
+    assert bench(remove_item)
+
+
+@pytest.mark.parametrize("reservations", RESERVATIONS)
+def bench_handle_verify_pin(bench, hass, event_loop_runner, reservations):
+    event_loop_runner(async_make_coordinator(hass, reservations=reservations, log_entries=1_000))
+    data = {"pin": reservation_pin(reservations // 2)}
+
+    def verify_pin():
+        return event_loop_runner(hass.services.async_call(DOMAIN, SERVICE_VERIFY_PIN, data))
+
+    assert bench(verify_pin)["valid"]
+
+
+@pytest.mark.parametrize("log_entries", LOG_ENTRIES)
+def bench_handle_consume_products(bench, hass, event_loop_runner, log_entries):
+    event_loop_runner(async_make_coordinator(hass, reservations=100, log_entries=log_entries))
+    data = {"pin": reservation_pin(50), "products": [1, 2, 3]}
+
+    def consume_products():
+        return event_loop_runner(hass.services.async_call(DOMAIN, SERVICE_CONSUME_PRODUCTS, data))
+
+    assert bench(consume_products)["success_count"] == 3
+
+
+@pytest.mark.parametrize("log_entries", LOG_ENTRIES)
+@pytest.mark.parametrize("sensor", ["inventory", "consumption", "room", "history"])
+def bench_sensor_attributes(bench, hass, event_loop_runner, sensor, log_entries):
+    coordinator = event_loop_runner(async_make_coordinator(hass, reservations=100, log_entries=log_entries))
+    entry = coordinator.entry
+    entity = {
+        "inventory": lambda: LedniceInventorySensor(coordinator, entry),
+        "consumption": lambda: LedniceConsumptionSensor(coordinator, entry),
+        "room": lambda: LedniceRoomConsumptionSensor(coordinator, entry, "room3"),
+        "history": lambda: LedniceHistorySensor(coordinator, entry),
+    }[sensor]()
+
+    # Rebuild cost, paid once per coordinator revision
+    bench(entity._compute)
+
+
+@pytest.mark.parametrize("sensor", ["inventory", "consumption", "room", "history"])
+def bench_sensor_cached_attributes(bench, hass, event_loop_runner, sensor):
+    coordinator = event_loop_runner(async_make_coordinator(hass, reservations=100, log_entries=100_000))
+    entry = coordinator.entry
+    entity = {
+        "inventory": lambda: LedniceInventorySensor(coordinator, entry),
+        "consumption": lambda: LedniceConsumptionSensor(coordinator, entry),
+        "room": lambda: LedniceRoomConsumptionSensor(coordinator, entry, "room3"),
+        "history": lambda: LedniceHistorySensor(coordinator, entry),
+    }[sensor]()
+    assert entity.state == entity._compute()[0]
+
+    # Repeated reads within one revision (state write, websocket, diagnostics)
+    bench(lambda: (entity.state, entity.extra_state_attributes))
+
+
+@pytest.mark.parametrize("reservations", RESERVATIONS)
+def bench_extract_all_previo_pins(bench, hass, event_loop_runner, reservations):
+    coordinator = event_loop_runner(async_make_coordinator(hass, reservations=reservations))
+
+    def extract_all():
+        return event_loop_runner(coordinator._extract_all_previo_pins())
+
+    bench(extract_all)
+    assert len(coordinator.data["previo_pins"]) == reservations
+
+
+@pytest.mark.parametrize("log_entries", LOG_ENTRIES)
+def bench_handle_report(bench, hass, event_loop_runner, log_entries):
+    event_loop_runner(async_make_coordinator(hass, log_entries=log_entries))
+    # The whole synthetic log (one entry per minute), from midnight to a partial hour
+    start = (datetime.now() - timedelta(minutes=log_entries + 90)).replace(hour=0, minute=0)
+    data = {"start": start, "end": datetime.now()}
+
+    def report():
+        return event_loop_runner(hass.services.async_call(DOMAIN, SERVICE_REPORT, data))
+
+    result = bench(report)
+    assert result["complete"] and result["total_quantity"] == log_entries
+
+
+@pytest.mark.parametrize("log_entries", LOG_ENTRIES)
+def bench_handle_analytics(bench, hass, event_loop_runner, log_entries):
+    pytest.importorskip("numpy")
+    event_loop_runner(async_make_coordinator(hass, log_entries=log_entries))
+
+    def analytics():
+        return event_loop_runner(hass.services.async_call(DOMAIN, SERVICE_ANALYTICS, {"top": 10}))
+
+    # The first call loads the columns; the benchmark measures the warm path
+    assert analytics()["purchases"] == log_entries
+    bench(analytics)
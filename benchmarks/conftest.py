@@ -0,0 +1,76 @@
+"""Shared fixtures for the Lednice benchmarks."""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("pytest_benchmark")
+
+# Make custom_components importable when running from a checkout
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_hass import StubHass  # noqa: E402
+
+THRESHOLDS_FILE = os.path.join(os.path.dirname(__file__), "thresholds.json")
+
+
+def pytest_addoption(parser) -> None:
+    parser.addoption(
+        "--threshold-slack",
+        type=float,
+        default=1.0,
+        help="Multiply every regression threshold by this factor (e.g. 3 on a Raspberry Pi).",
+    )
+
+
+@pytest.fixture(scope="session")
+def thresholds() -> dict[str, float]:
+    """Return the maximum allowed mean time in seconds per benchmark id."""
+    with open(THRESHOLDS_FILE, encoding="utf-8") as thresholds_file:
+        return json.load(thresholds_file)
+
+
+@pytest.fixture
+def event_loop_runner():
+    """Return a function running a coroutine to completion on a private loop."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    # Let queued ledger flushes finish before the loop goes away
+    pending = asyncio.all_tasks(loop)
+    if pending:
+        loop.run_until_complete(asyncio.gather(*pending))
+    loop.close()
+
+
+@pytest.fixture
+def hass(event_loop_runner, tmp_path):
+    """Return a stub hass bound to the benchmark loop, with its config dir in tmp_path."""
+    return event_loop_runner(_make_hass(str(tmp_path)))
+
+
+async def _make_hass(config_dir: str) -> StubHass:
+    return StubHass(asyncio.get_running_loop(), config_dir)
+
+
+@pytest.fixture
+def bench(benchmark, request, thresholds):
+    """Benchmark a callable and fail if its mean exceeds the threshold from thresholds.json."""
+
+    def run(func, *args):
+        result = benchmark(func, *args)
+        stats = benchmark.stats
+        limit = thresholds.get(request.node.name)
+        if stats is not None and limit is not None:
+            limit *= request.config.getoption("--threshold-slack")
+            mean = stats.stats.mean
+            assert mean <= limit, (
+                f"{request.node.name}: mean {mean * 1e6:.1f} µs exceeds threshold {limit * 1e6:.1f} µs"
+            )
+        return result
+
+    return run
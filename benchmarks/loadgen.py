@@ -0,0 +1,305 @@
+"""Synthetic load generator simulating a busy guesthouse.
+
+Drives the real Lednice service handlers with a weighted mix of verify_pin,
+consume_products, scan_code and Previo sensor updates from M concurrent
+kiosks across N rooms, then reports throughput, latency percentiles and how
+many saves the load caused.
+
+    python benchmarks/loadgen.py --rooms 10 --kiosks 4 --duration 30
+    python benchmarks/loadgen.py --core real --save-delay 0 --json
+
+--core stub (default) uses stub_hass (no disk writes for the Store); --core
+real starts a local Home Assistant core in a temporary directory with the
+real Store and event bus.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_components.lednice import LedniceDataCoordinator, async_setup_services  # noqa: E402
+from custom_components.lednice.const import (  # noqa: E402
+    DOMAIN,
+    PREVIO_ENTITY_PREFIX,
+    SERVICE_CONSUME_PRODUCTS,
+    SERVICE_SCAN_CODE,
+    SERVICE_VERIFY_PIN,
+)
+
+from stub_hass import StubHass, StubStore, make_data, make_entry  # noqa: E402
+
+OP_VERIFY_PIN = "verify_pin"
+OP_CONSUME_PRODUCTS = "consume_products"
+OP_SCAN_CODE = "scan_code"
+OP_PREVIO_UPDATE = "previo_update"
+DEFAULT_MIX = "verify_pin=50,consume_products=30,scan_code=15,previo_update=5"
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    """Parse 'op=weight,...' into a weight per operation."""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in (OP_VERIFY_PIN, OP_CONSUME_PRODUCTS, OP_SCAN_CODE, OP_PREVIO_UPDATE):
+            raise argparse.ArgumentTypeError(f"Unknown operation {name!r}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(sorted_values: list[float], share: float) -> float:
+    """Return the nearest-rank percentile of sorted values."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(share * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Guesthouse:
+    """A coordinator with N rooms, their Previo reservations and a service caller."""
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.hass = None
+        self.coordinator: LedniceDataCoordinator | None = None
+        self.store = None
+        self.reports_store = None
+        self.pins: list[str] = []
+        self.sensors: list[str] = []
+        self.products = args.products
+        self._real = args.core == "real"
+
+    async def async_start(self) -> None:
+        """Create hass, the coordinator and the Previo sensors."""
+        options = {
+            "save_delay": self.args.save_delay,
+            "consumption_retention": self.args.log_entries or 1000,
+        }
+        entry = make_entry("loadgen", options)
+        data = make_data(products=self.products, log_entries=self.args.log_entries)
+
+        if self._real:
+            from homeassistant.core import CoreState, HomeAssistant
+            from homeassistant.helpers import entity_registry as er
+            from homeassistant.helpers.storage import Store
+
+            config_dir = tempfile.mkdtemp(prefix="lednice-loadgen-")
+            self.hass = HomeAssistant(config_dir)
+            self.hass.state = CoreState.running
+            await er.async_load(self.hass)
+            self.store = Store(self.hass, 1, "lednice_storage_loadgen")
+            self.reports_store = Store(self.hass, 1, "lednice_reports_loadgen")
+        else:
+            self.hass = StubHass(asyncio.get_running_loop())
+            self.store = StubStore()
+            self.reports_store = StubStore()
+
+        self.hass.data.setdefault(DOMAIN, {})
+        now = datetime.now()
+        for index in range(self.args.rooms):
+            room_number = index % 10 + 1
+            pin = f"{700000 + index}"
+            entity_id = f"{PREVIO_ENTITY_PREFIX}_loadgen_{index}"
+            self.pins.append(pin)
+            self.sensors.append(entity_id)
+            self.hass.states.async_set(entity_id, "confirmed", {
+                "room": str(room_number),
+                "card_keys": [pin],
+                "checkin": (now - timedelta(hours=3)).isoformat(),
+                "checkout": (now + timedelta(days=2)).isoformat(),
+                "guest": f"Guest {index}",
+            })
+
+        self.coordinator = LedniceDataCoordinator(self.hass, self.store, data, entry)
+        self.hass.data[DOMAIN][entry.entry_id] = self.coordinator
+        await self.coordinator.async_setup_reports(self.reports_store)
+        await async_setup_services(self.hass)
+        if self._real:
+            await self.coordinator.setup_previo_monitoring()
+        else:
+            await self.coordinator._extract_all_previo_pins()
+
+    async def async_stop(self) -> None:
+        """Flush pending writes and stop hass."""
+        await self.coordinator.async_flush()
+        if self._real:
+            for unsub in self.coordinator._previo_listeners:
+                unsub()
+            await self.hass.async_stop(force=True)
+
+    async def async_call(self, service: str, data: dict) -> None:
+        """Call a Lednice service the way a kiosk or scanner would."""
+        if self._real:
+            await self.hass.services.async_call(
+                DOMAIN, service, data, blocking=True, return_response=service != SERVICE_SCAN_CODE
+            )
+        else:
+            await self.hass.services.async_call(DOMAIN, service, data)
+
+    async def async_previo_update(self, rng: random.Random) -> None:
+        """Publish a changed reservation on a random Previo sensor and process it."""
+        entity_id = rng.choice(self.sensors)
+        state = self.hass.states.get(entity_id)
+        attributes = dict(state.attributes)
+        attributes["checkout"] = (datetime.now() + timedelta(days=rng.randint(1, 7))).isoformat()
+        self.hass.states.async_set(entity_id, state.state, attributes)
+
+        if self._real:
+            # The state change event reaches the coordinator through its tracker
+            await self.hass.async_block_till_done()
+        else:
+            await self.coordinator._handle_previo_state_change(entity_id, self.hass.states.get(entity_id))
+
+    async def async_run_op(self, op: str, rng: random.Random) -> None:
+        """Run one operation."""
+        if op == OP_VERIFY_PIN:
+            await self.async_call(SERVICE_VERIFY_PIN, {"pin": rng.choice(self.pins)})
+        elif op == OP_CONSUME_PRODUCTS:
+            basket = [rng.randint(1, self.products) for _ in range(rng.randint(1, 3))]
+            await self.async_call(SERVICE_CONSUME_PRODUCTS, {"pin": rng.choice(self.pins), "products": basket})
+        elif op == OP_SCAN_CODE:
+            code = f"859000{rng.randint(1, self.products):07d}"
+            await self.async_call(SERVICE_SCAN_CODE, {"code": code, "pin": rng.choice(self.pins)})
+        else:
+            await self.async_previo_update(rng)
+
+
+async def kiosk(
+    guesthouse: Guesthouse,
+    kiosk_id: int,
+    weights: dict[str, float],
+    deadline: float,
+    remaining: list[int],
+    latencies: dict[str, list[float]],
+    seed: int,
+) -> None:
+    """Issue operations back to back until the deadline or the operation budget is reached."""
+    rng = random.Random(seed + kiosk_id)
+    ops = list(weights)
+    op_weights = [weights[op] for op in ops]
+
+    while time.perf_counter() < deadline and remaining[0] != 0:
+        remaining[0] -= 1
+        op = rng.choices(ops, op_weights)[0]
+        started = time.perf_counter()
+        await guesthouse.async_run_op(op, rng)
+        latencies[op].append(time.perf_counter() - started)
+        # Give other kiosks a turn even if the call never yielded
+        await asyncio.sleep(0)
+
+
+async def async_main(args: argparse.Namespace) -> dict:
+    """Run the load and return the report."""
+    weights = parse_mix(args.mix)
+    guesthouse = Guesthouse(args)
+    await guesthouse.async_start()
+
+    latencies: dict[str, list[float]] = defaultdict(list)
+    remaining = [args.operations or -1]
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(
+        kiosk(guesthouse, kiosk_id, weights, deadline, remaining, latencies, args.seed)
+        for kiosk_id in range(args.kiosks)
+    ))
+    elapsed = time.perf_counter() - started
+    await guesthouse.async_stop()
+
+    coordinator = guesthouse.coordinator
+    report = {
+        "config": {
+            "core": args.core,
+            "rooms": args.rooms,
+            "kiosks": args.kiosks,
+            "products": args.products,
+            "log_entries": args.log_entries,
+            "save_delay": args.save_delay,
+            "mix": weights,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "operations": {},
+        "persistence": coordinator.persistence_stats,
+        "mutations": coordinator.mutation_stats,
+        "ledger": coordinator.ledger.stats,
+    }
+
+    all_latencies = []
+    for op, values in sorted(latencies.items()):
+        all_latencies.extend(values)
+        report["operations"][op] = _summarize(values, elapsed)
+    report["total"] = _summarize(all_latencies, elapsed)
+    return report
+
+
+def _summarize(values: list[float], elapsed: float) -> dict:
+    """Return count, throughput and latency percentiles in milliseconds."""
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "throughput_per_s": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+    }
+
+
+def print_report(report: dict) -> None:
+    """Print the report as a table."""
+    config = report["config"]
+    print(
+        f"core={config['core']} rooms={config['rooms']} kiosks={config['kiosks']} "
+        f"save_delay={config['save_delay']}s elapsed={report['elapsed_s']}s"
+    )
+    print(f"{'operation':<18}{'count':>8}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, summary in [*report["operations"].items(), ("total", report["total"])]:
+        print(
+            f"{name:<18}{summary['count']:>8}{summary['throughput_per_s']:>10}"
+            f"{summary['p50_ms']:>10}{summary['p95_ms']:>10}{summary['p99_ms']:>10}"
+        )
+    persistence = report["persistence"]
+    mutations = report["mutations"]
+    print(
+        f"saves: {persistence['save_requests']} requested, {persistence['disk_writes']} written; "
+        f"ledger records: {report['ledger']['records_written']}; "
+        f"lock: {mutations['contended']} contended, max queue {mutations['max_queue_depth']}, "
+        f"max wait {mutations['wait_max_ms']} ms"
+    )
+
+
+def main() -> None:
+    """Parse arguments and run the load generator."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--core", choices=["stub", "real"], default="stub", help="Home Assistant core to run against")
+    parser.add_argument("--rooms", type=int, default=10, help="Rooms with an active Previo reservation")
+    parser.add_argument("--kiosks", type=int, default=4, help="Concurrent kiosks issuing calls")
+    parser.add_argument("--products", type=int, default=20, help="Product codes in stock")
+    parser.add_argument("--log-entries", type=int, default=0, help="Consumption/history entries to start with")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    parser.add_argument("--operations", type=int, default=0, help="Stop after this many operations (0 = no limit)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted operation mix (default {DEFAULT_MIX})")
+    parser.add_argument("--save-delay", type=int, default=2, help="Store save delay option in seconds")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(async_main(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
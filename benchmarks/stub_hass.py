@@ -0,0 +1,231 @@
+"""Minimal Home Assistant stand-in for benchmarking the Lednice coordinator.
+
+Only what the coordinator, the service handlers and the sensors touch is
+implemented: config paths, states, bus, service registry, task and executor
+helpers. Storage goes to a StubStore that only counts writes, so timings
+measure Lednice code rather than disk I/O (the ledger still appends to a
+temporary config directory, as it does in production).
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
+
+from homeassistant.core import State
+
+from custom_components.lednice import LedniceDataCoordinator, async_setup_services
+from custom_components.lednice.const import DOMAIN, PREVIO_ENTITY_PREFIX
+
+
+class StubStates:
+    """Dict-backed state machine."""
+
+    def __init__(self) -> None:
+        self._states: dict[str, State] = {}
+
+    def async_set(self, entity_id: str, state: str, attributes: dict | None = None) -> None:
+        self._states[entity_id] = State(entity_id, state, attributes or {})
+
+    def get(self, entity_id: str) -> State | None:
+        return self._states.get(entity_id)
+
+    def async_all(self, domain: str | None = None) -> list[State]:
+        return [state for state in self._states.values() if domain is None or state.domain == domain]
+
+    def async_entity_ids(self, domain: str | None = None) -> list[str]:
+        return [state.entity_id for state in self.async_all(domain)]
+
+
+class StubBus:
+    """Event bus that only counts fired events."""
+
+    def __init__(self) -> None:
+        self.fired = 0
+
+    def async_fire(self, event_type: str, event_data: dict | None = None) -> None:
+        self.fired += 1
+
+    def async_listen(self, event_type: str, listener, *args, **kwargs):
+        return lambda: None
+
+    def async_listen_once(self, event_type: str, listener):
+        return lambda: None
+
+
+class StubServices:
+    """Service registry calling handlers directly after schema validation."""
+
+    def __init__(self) -> None:
+        self.handlers: dict[tuple[str, str], tuple[Any, Any]] = {}
+
+    def async_register(self, domain, service, handler, schema=None, supports_response=None) -> None:
+        self.handlers[(domain, service)] = (handler, schema)
+
+    async def async_call(self, domain: str, service: str, data: dict | None = None) -> Any:
+        handler, schema = self.handlers[(domain, service)]
+        data = data or {}
+        call = SimpleNamespace(domain=domain, service=service, data=schema(data) if schema else data)
+        return await handler(call)
+
+
+class StubStore:
+    """Store that counts saves instead of writing them.
+
+    async_delay_save re-arms its timer on every call like the real Store, so
+    bursts only produce a write once they pause.
+    """
+
+    def __init__(self) -> None:
+        self.saves = 0
+        self.delayed_saves = 0
+        self._delay_handle: asyncio.TimerHandle | None = None
+
+    async def async_load(self) -> dict | None:
+        return None
+
+    async def async_save(self, data: dict) -> None:
+        self._cancel_delayed()
+        self.saves += 1
+
+    def async_delay_save(self, data_func, delay: float = 0) -> None:
+        self.delayed_saves += 1
+        self._cancel_delayed()
+        self._delay_handle = asyncio.get_running_loop().call_later(delay, self._delayed_write, data_func)
+
+    def _delayed_write(self, data_func) -> None:
+        self._delay_handle = None
+        data_func()
+        self.saves += 1
+
+    def _cancel_delayed(self) -> None:
+        if self._delay_handle is not None:
+            self._delay_handle.cancel()
+            self._delay_handle = None
+
+
+class StubHass:
+    """The parts of HomeAssistant used by Lednice."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, config_dir: str | None = None) -> None:
+        self.loop = loop
+        config_dir = config_dir or tempfile.mkdtemp(prefix="lednice-bench-")
+        self.config = SimpleNamespace(
+            config_dir=config_dir,
+            path=lambda *parts: os.path.join(config_dir, *parts),
+        )
+        self.data: dict[str, Any] = {DOMAIN: {}}
+        self.states = StubStates()
+        self.bus = StubBus()
+        self.services = StubServices()
+
+    def async_create_task(self, coro):
+        return self.loop.create_task(coro)
+
+    async def async_add_executor_job(self, func, *args):
+        return await self.loop.run_in_executor(None, func, *args)
+
+
+def make_entry(entry_id: str = "bench", options: dict | None = None) -> SimpleNamespace:
+    """Return a config entry stand-in."""
+    return SimpleNamespace(
+        entry_id=entry_id,
+        title="Lednice",
+        options=options or {},
+        data={},
+        async_on_unload=lambda func: None,
+        add_update_listener=lambda func: (lambda: None),
+    )
+
+
+def reservation_pin(index: int) -> str:
+    """Return the Previo card key of synthetic reservation index."""
+    return f"{500000 + index}"
+
+
+def add_previo_sensors(hass: StubHass, count: int) -> None:
+    """Create count Previo sensors, each with one active reservation."""
+    now = datetime.now()
+    for index in range(count):
+        hass.states.async_set(
+            f"{PREVIO_ENTITY_PREFIX}_reservation_{index}",
+            "confirmed",
+            {
+                "room": str(index % 10 + 1),
+                "card_keys": [reservation_pin(index)],
+                "checkin": (now - timedelta(hours=2)).isoformat(),
+                "checkout": (now + timedelta(days=2)).isoformat(),
+                "guest": f"Guest {index}",
+            },
+        )
+
+
+def make_data(products: int = 20, log_entries: int = 0) -> dict:
+    """Return Store data with products, well-stocked inventory and a synthetic log."""
+    inventory = {}
+    product_codes = {}
+    for code in range(1, products + 1):
+        name = f"Product {code}"
+        inventory[name] = {"quantity": 10**9, "code": f"859000{code:07d}", "added": "2025-01-01T00:00:00"}
+        product_codes[str(code)] = {"name": name, "price": 20.0 + code, "barcode": "", "code": code}
+
+    start = time.time() - log_entries * 60
+    consumption_log = []
+    history = []
+    for index in range(log_entries):
+        timestamp = datetime.fromtimestamp(start + index * 60).isoformat()
+        entry = {
+            "item": f"Product {index % products + 1}",
+            "quantity": 1,
+            "room": f"room{index % 10 + 1}",
+            "price": 20.0 + index % products + 1,
+            "timestamp": timestamp,
+        }
+        consumption_log.append(entry)
+        history.append({
+            "timestamp": timestamp,
+            "action": "remove",
+            "item": entry["item"],
+            "quantity": 1,
+            "room": entry["room"],
+            "guest": None,
+            "details": f"Price: {entry['price']} Kč",
+        })
+
+    return {
+        "inventory": inventory,
+        "room_pins": {"owner": "0000", **{f"room{i}": f"{1000 + i:04d}" for i in range(1, 11)}},
+        "consumption_log": consumption_log,
+        "product_codes": product_codes,
+        "history": history,
+    }
+
+
+async def async_make_coordinator(
+    hass: StubHass,
+    reservations: int = 0,
+    log_entries: int = 0,
+    options: dict | None = None,
+    entry_id: str = "bench",
+) -> LedniceDataCoordinator:
+    """Create a coordinator with synthetic data and Previo reservations, services registered."""
+    retention = max(log_entries, 1000)
+    entry = make_entry(entry_id, {
+        "save_delay": 2,
+        "consumption_retention": retention,
+        "history_retention": retention,
+        **(options or {}),
+    })
+    add_previo_sensors(hass, reservations)
+
+    coordinator = LedniceDataCoordinator(hass, StubStore(), make_data(log_entries=log_entries), entry)
+    hass.data[DOMAIN][entry.entry_id] = coordinator
+    await coordinator._extract_all_previo_pins()
+    await coordinator.async_setup_reports(StubStore())
+    if not hass.services.handlers:
+        await async_setup_services(hass)
+    return coordinator
@@ -1,16 +1,30 @@
 """Lednice - Fridge Inventory Manager Integration."""
+import asyncio
 import logging
+import inspect
+import time
+from collections import deque
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from typing import Any
+from functools import lru_cache, wraps
+from typing import Any, AsyncIterator, Callable, Iterable
 
 import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
 from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, State, callback
-from homeassistant.helpers import config_validation as cv
+from homeassistant.exceptions import HomeAssistantError, Unauthorized, UnknownUser
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.helpers.service import async_register_admin_service
 from homeassistant.helpers.storage import Store
-from homeassistant.helpers.event import async_track_state_change_event, async_track_time_interval
+from homeassistant.helpers.event import (
+    async_track_point_in_utc_time,
+    async_track_state_change_event,
+    async_track_time_interval,
+    async_track_utc_time_change,
+)
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
@@ -24,6 +38,12 @@ from .const import (
     SERVICE_CONSUME_PRODUCTS,
     SERVICE_VERIFY_PIN,
     SERVICE_CLEAR_ROOM_CONSUMPTION,
+    SERVICE_QUERY,
+    SERVICE_SET_TRACE,
+    SERVICE_IMPORT_INVENTORY,
+    SERVICE_EXPORT_INVENTORY,
+    SERVICE_REPORT,
+    SERVICE_ANALYTICS,
     ATTR_ITEM_NAME,
     ATTR_QUANTITY,
     ATTR_CODE,
@@ -33,27 +53,151 @@ from .const import (
     ATTR_PRODUCT_NAME,
     ATTR_PRICE,
     ATTR_PRODUCTS,
+    ATTR_ATOMIC,
+    ATTR_DATASET,
+    ATTR_OFFSET,
+    ATTR_LIMIT,
+    ATTR_START,
+    ATTR_END,
+    ATTR_ENABLED,
+    ATTR_SAMPLE_RATE,
+    ATTR_ITEMS,
+    ATTR_ENTRY_ID,
+    ATTR_FILE,
+    ATTR_MODE,
+    ATTR_PERIOD,
+    ATTR_DATE,
+    ATTR_TOP,
+    ATTR_OCCUPIED_NIGHTS,
+    IMPORT_MODE_ADD,
+    IMPORT_MODES,
+    QUERY_DATASETS,
+    REPORT_PERIODS,
+    DEFAULT_ANALYTICS_TOP,
+    MAX_ANALYTICS_TOP,
+    QUERY_INVENTORY,
+    QUERY_PRODUCTS,
+    QUERY_CONSUMPTION,
+    QUERY_HISTORY,
+    QUERY_RESERVATIONS,
+    DEFAULT_QUERY_LIMIT,
+    MAX_QUERY_LIMIT,
     STORAGE_KEY,
+    REPORTS_STORAGE_KEY,
     STORAGE_VERSION,
+    CONF_SAVE_DELAY,
+    CONF_LEAN_ATTRIBUTES,
+    CONF_HISTORY_DATABASE,
+    CONF_CONSUMPTION_RETENTION,
+    CONF_HISTORY_RETENTION,
+    DEFAULT_SAVE_DELAY,
+    DEFAULT_LEAN_ATTRIBUTES,
+    DEFAULT_HISTORY_DATABASE,
+    DEFAULT_CONSUMPTION_RETENTION,
+    DEFAULT_HISTORY_RETENTION,
     DEFAULT_OWNER_PIN,
     OWNER_ROOM,
-    MAX_HISTORY_ENTRIES,
-    PREVIO_DOMAIN,
     PREVIO_ATTR_ROOM,
     PREVIO_ATTR_CARD_KEYS,
     PREVIO_ATTR_CHECKIN,
     PREVIO_ATTR_CHECKOUT,
     PREVIO_ATTR_GUEST,
+    PREVIO_ENTITY_PREFIX,
+    PREVIO_FINGERPRINT_ATTRS,
+    PREVIO_INPUT_TEXT_PREFIX,
+    PREVIO_PIN_EXPIRY_SECONDS,
+    TOPIC_CONSUMPTION,
+    TOPIC_HISTORY,
+    TOPIC_INVENTORY,
+    TOPIC_PINS,
+    TOPIC_PREVIO,
+    TOPIC_PRODUCTS,
+    consumption_topic,
+)
+from .aggregates import ConsumptionAggregates, HistoryAggregates
+from .analytics import ConsumptionColumns
+from .barcode_index import BARCODE_KIND_ITEM, BARCODE_KIND_PRODUCT, BarcodeIndex
+from .history_db import TABLE_CONSUMPTION, TABLE_HISTORY, HistoryDatabase
+from .inventory_io import (
+    parse_inventory_row,
+    read_inventory_file,
+    resolve_inventory_file,
+    write_inventory_file,
+)
+from .ledger import ConsumptionLedger
+from .long_term_statistics import ConsumptionStatistics, backfill_records
+from .reporting import ConsumptionReports, period_range
+from .tracing import TRACE
+from .pin_index import (
+    PIN_SOURCE_INPUT_TEXT,
+    PIN_SOURCE_PREVIO,
+    PIN_SOURCE_STATIC,
+    PinIndex,
+    PinIndexEntry,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = [Platform.SENSOR]
 
+# Configured through the UI only; async_setup just registers the services
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+# Date formats emitted by Previo and other PMS feeds
+DATE_FORMATS = [
+    "%Y-%m-%d",  # 2025-11-24
+    "%Y-%m-%dT%H:%M:%S",  # 2025-11-24T10:00:00
+    "%Y-%m-%d %H:%M:%S",  # 2025-11-24 10:00:00
+    "%B %d, %Y at %I:%M:%S %p",  # November 24, 2025 at 10:00:00 AM
+    "%B %d, %Y",  # November 24, 2025
+]
+
+
+@lru_cache(maxsize=512)
+def _parse_date_string(date_string: str) -> datetime | None:
+    """Parse a date string, memoized since reservations repeat the same strings."""
+    # Try ISO format first (fastest)
+    try:
+        return datetime.fromisoformat(date_string)
+    except (ValueError, AttributeError, TypeError):
+        pass
+
+    # Try other formats
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_string, fmt)
+        except (ValueError, AttributeError, TypeError):
+            continue
+
+    # If all fails, log warning and return None
+    _LOGGER.warning("Could not parse date: %s", date_string)
+    return None
+
+
+def _local_timestamp(value: datetime) -> str:
+    """Return a datetime as a naive ISO timestamp in the Home Assistant time zone, the format used in the logs."""
+    if value.tzinfo is not None:
+        value = dt_util.as_local(value).replace(tzinfo=None)
+    return value.isoformat()
+
+
+def _reservation_fingerprint(reservation: dict) -> tuple:
+    """Return the fields that identify the content of a stored reservation."""
+    return (
+        reservation.get("room"),
+        reservation.get("pin"),
+        reservation.get("checkin"),
+        reservation.get("checkout"),
+        reservation.get("guest"),
+    )
+
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Lednice component."""
     hass.data.setdefault(DOMAIN, {})
+
+    # Services are registered once per domain and routed to an entry per call
+    await async_setup_services(hass)
     return True
 
 
@@ -93,24 +237,47 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             # Generate PIN: room1 -> 1001, room2 -> 1002, etc.
             pin = f"{1000 + i:04d}"
             data.setdefault("room_pins", {})[room] = pin
-            _LOGGER.info(f"Initialized PIN for {room}: {pin}")
+            _LOGGER.info("Initialized PIN for %s: %s", room, pin)
 
     # Store coordinator in hass.data
     coordinator = LedniceDataCoordinator(hass, store, data, entry)
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
+    # Open the optional long-term history database
+    if coordinator.history_db:
+        await coordinator.history_db.async_open(data["history"], data["consumption_log"])
+
+    # Pre-aggregated reports and long-term statistics, backfilled on the first run
+    await coordinator.async_setup_reports(
+        Store(hass, STORAGE_VERSION, f"{REPORTS_STORAGE_KEY}_{entry.entry_id}")
+    )
+    await coordinator.async_setup_statistics()
+
     # Setup Previo sensor monitoring
     await coordinator.setup_previo_monitoring()
 
     # Setup platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    # Register services
-    await async_setup_services(hass, coordinator)
+    async def async_flush_on_stop(event) -> None:
+        """Write pending data before Home Assistant stops."""
+        await coordinator.async_flush()
+
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_flush_on_stop)
+    )
+
+    # Reload when options change so sensors pick up their new attribute mode
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry after its options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
@@ -123,24 +290,67 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 listener()
             coordinator._previo_listeners.clear()
 
+        # Write out any delayed save before the coordinator goes away
+        if coordinator:
+            await coordinator.async_flush()
+            if coordinator.history_db:
+                await coordinator.history_db.async_close()
+
         hass.data[DOMAIN].pop(entry.entry_id)
 
     return unload_ok
 
 
-async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoordinator") -> None:
+def _async_register_admin_service(
+    hass: HomeAssistant, service: str, handler: Callable, schema: vol.Schema
+) -> None:
+    """Register a service with an optional response that only admin users may call."""
+    if "supports_response" in inspect.signature(async_register_admin_service).parameters:
+        async_register_admin_service(
+            hass, DOMAIN, service, handler, schema, supports_response=SupportsResponse.OPTIONAL
+        )
+        return
+
+    # Older cores register admin services without responses; same check as theirs
+    @wraps(handler)
+    async def admin_handler(call: ServiceCall) -> Any:
+        if call.context.user_id:
+            user = await hass.auth.async_get_user(call.context.user_id)
+            if user is None:
+                raise UnknownUser(context=call.context)
+            if not user.is_admin:
+                raise Unauthorized(context=call.context)
+        return await handler(call)
+
+    hass.services.async_register(
+        DOMAIN, service, admin_handler, schema=schema, supports_response=SupportsResponse.OPTIONAL
+    )
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
     """Set up services for Lednice."""
 
-    def get_coordinator() -> "LedniceDataCoordinator":
-        """Get the first available coordinator."""
+    def get_coordinator(call: ServiceCall) -> "LedniceDataCoordinator | None":
+        """Get the coordinator of the entry targeted by a call.
+
+        Without entry_id the call goes to the only loaded entry; with several
+        fridges configured the target has to be explicit.
+        """
         coordinators = hass.data.get(DOMAIN, {})
-        if coordinators:
-            return next(iter(coordinators.values()))
-        return None
+        entry_id = call.data.get(ATTR_ENTRY_ID)
+        if entry_id:
+            if entry_id not in coordinators:
+                raise HomeAssistantError(f"Lednice entry {entry_id} is not loaded")
+            return coordinators[entry_id]
+        if len(coordinators) > 1:
+            raise HomeAssistantError(
+                f"{len(coordinators)} Lednice fridges are configured, pass entry_id to choose one"
+            )
+        return next(iter(coordinators.values()), None)
 
     async def handle_add_item(call: ServiceCall) -> None:
         """Handle add item service."""
-        coord = get_coordinator()
+        coord = get_coordinator(call)
         if not coord:
             _LOGGER.error("No Lednice coordinator found")
             return
@@ -150,11 +360,12 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
         code = call.data.get(ATTR_CODE, "")
 
         await coord.add_item(item_name, quantity, code)
-        _LOGGER.info(f"Added {quantity}x {item_name} to inventory")
+        _LOGGER.info("Added %sx %s to inventory", quantity, item_name)
 
+    @TRACE.operation()
     async def handle_remove_item(call: ServiceCall) -> None:
         """Handle remove item service."""
-        coord = get_coordinator()
+        coord = get_coordinator(call)
         if not coord:
             _LOGGER.error("No Lednice coordinator found")
             return
@@ -169,13 +380,13 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
         success = await coord.remove_item(item_name, quantity, room, price)
 
         if success:
-            _LOGGER.info(f"Removed {quantity}x {item_name} from inventory (Room: {room})")
+            _LOGGER.info("Removed %sx %s from inventory (Room: %s)", quantity, item_name, room)
         else:
-            _LOGGER.warning(f"Failed to remove {item_name} - insufficient quantity")
+            _LOGGER.warning("Failed to remove %s - insufficient quantity", item_name)
 
     async def handle_update_item(call: ServiceCall) -> None:
         """Handle update item service."""
-        coord = get_coordinator()
+        coord = get_coordinator(call)
         if not coord:
             _LOGGER.error("No Lednice coordinator found")
             return
@@ -185,11 +396,12 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
         code = call.data.get(ATTR_CODE)
 
         await coord.update_item(item_name, quantity, code)
-        _LOGGER.info(f"Updated {item_name} to quantity {quantity}")
+        _LOGGER.info("Updated %s to quantity %s", item_name, quantity)
 
+    @TRACE.operation()
     async def handle_scan_code(call: ServiceCall) -> None:
         """Handle barcode scan service."""
-        coord = get_coordinator()
+        coord = get_coordinator(call)
         if not coord:
             _LOGGER.error("No Lednice coordinator found")
             return
@@ -199,22 +411,31 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
 
         room = coord.get_room_by_pin(pin) if pin else None
         item_name = coord.get_item_by_code(code)
+        # Get price from inventory item if available
+        price = coord.inventory.get(item_name, {}).get("price", 0.0) if item_name else 0.0
+
+        if not item_name:
+            # Fall back to the product code registered with this barcode
+            product_info = coord.get_product_by_barcode(code)
+            if product_info:
+                item_name = product_info.get("name")
+                price = product_info.get("price", 0.0)
 
         if item_name:
-            # Get price from inventory item if available
-            price = coord.inventory.get(item_name, {}).get("price", 0.0)
             success = await coord.remove_item(item_name, 1, room, price)
             if success:
-                _LOGGER.info(f"Scanned code {code} - removed {item_name} (Room: {room})")
+                _LOGGER.info("Scanned code %s - removed %s (Room: %s)", code, item_name, room)
                 hass.bus.async_fire(f"{DOMAIN}_item_scanned", {
+                    ATTR_ENTRY_ID: coord.entry.entry_id,
                     "item": item_name,
                     "code": code,
                     "room": room,
                     "success": True
                 })
             else:
-                _LOGGER.warning(f"Scanned code {code} but {item_name} is out of stock")
+                _LOGGER.warning("Scanned code %s but %s is out of stock", code, item_name)
                 hass.bus.async_fire(f"{DOMAIN}_item_scanned", {
+                    ATTR_ENTRY_ID: coord.entry.entry_id,
                     "item": item_name,
                     "code": code,
                     "room": room,
@@ -222,8 +443,9 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
                     "reason": "out_of_stock"
                 })
         else:
-            _LOGGER.warning(f"Unknown code scanned: {code}")
+            _LOGGER.warning("Unknown code scanned: %s", code)
             hass.bus.async_fire(f"{DOMAIN}_item_scanned", {
+                ATTR_ENTRY_ID: coord.entry.entry_id,
                 "code": code,
                 "room": room,
                 "success": False,
@@ -232,7 +454,7 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
 
     async def handle_reset_inventory(call: ServiceCall) -> None:
         """Handle reset inventory service."""
-        coord = get_coordinator()
+        coord = get_coordinator(call)
         if not coord:
             _LOGGER.error("No Lednice coordinator found")
             return
@@ -242,7 +464,7 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
 
     async def handle_add_product_code(call: ServiceCall) -> None:
         """Handle add product code service."""
-        coord = get_coordinator()
+        coord = get_coordinator(call)
         if not coord:
             _LOGGER.error("No Lednice coordinator found")
             return
@@ -253,11 +475,11 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
         barcode = call.data.get(ATTR_CODE, "")
 
         await coord.add_product_code(product_code, product_name, price, barcode)
-        _LOGGER.info(f"Added product code {product_code}: {product_name} (${price})")
+        _LOGGER.info("Added product code %s: %s (%s Kč)", product_code, product_name, price)
 
     async def handle_remove_product_code(call: ServiceCall) -> None:
         """Handle remove product code service."""
-        coord = get_coordinator()
+        coord = get_coordinator(call)
         if not coord:
             _LOGGER.error("No Lednice coordinator found")
             return
@@ -265,68 +487,62 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
         product_code = call.data.get(ATTR_PRODUCT_CODE)
 
         await coord.remove_product_code(product_code)
-        _LOGGER.info(f"Removed product code {product_code}")
+        _LOGGER.info("Removed product code %s", product_code)
 
-    async def handle_consume_products(call: ServiceCall) -> None:
+    @TRACE.operation()
+    async def handle_consume_products(call: ServiceCall) -> dict:
         """Handle consume products service (for self-service)."""
-        coord = get_coordinator()
+        coord = get_coordinator(call)
         if not coord:
             _LOGGER.error("No Lednice coordinator found")
-            return
+            return {
+                "room": None,
+                "success_count": 0,
+                "error": "No coordinator found"
+            }
 
         pin = call.data.get(ATTR_PIN)
         products = call.data.get(ATTR_PRODUCTS, [])  # List of product codes
+        atomic = call.data.get(ATTR_ATOMIC, False)
 
-        _LOGGER.warning(f"🛒 CONSUME_PRODUCTS called with pin={pin}, products={products}")
+        TRACE("consume_products pin=%s products=%s", pin, products)
 
         room = coord.get_room_by_pin(pin) if pin else None
         if not room:
-            _LOGGER.warning(f"Invalid PIN: {pin}")
+            TRACE("consume_products pin=%s result=invalid_pin", pin)
             hass.bus.async_fire(f"{DOMAIN}_consume_failed", {
+                ATTR_ENTRY_ID: coord.entry.entry_id,
                 "reason": "invalid_pin",
                 "pin": pin
             })
-            return
-
-        _LOGGER.warning(f"🛒 Resolved PIN {pin} → room {room}")
-
-        # Process each product
-        success_count = 0
-        failed_products = []
-
-        for product_code in products:
-            product_info = coord.get_product_by_code(product_code)
-            if not product_info:
-                _LOGGER.warning(f"Unknown product code: {product_code}")
-                failed_products.append(product_code)
-                continue
-
-            # Try to remove from inventory
-            item_name = product_info.get("name", f"Product {product_code}")
-            price = product_info.get("price", 0.0)
+            return {
+                "room": None,
+                "success_count": 0,
+                "failed_products": products,
+                "error": "invalid_pin"
+            }
 
-            _LOGGER.warning(f"🛒 Purchasing: {item_name} for room {room}, price {price}")
+        # Validate and consume the whole basket with a single save
+        result = await coord.consume_basket(room, products, atomic)
 
-            success = await coord.remove_item(item_name, 1, room, price)
-            if success:
-                success_count += 1
-                _LOGGER.warning(f"✅ Successfully added {item_name} to consumption_log for room {room}")
-            else:
-                failed_products.append(product_code)
-                _LOGGER.warning(f"❌ Failed to add {item_name} - out of stock")
-
-        _LOGGER.warning(f"🛒 FINAL: Consumed {success_count} products for room {room}")
-        _LOGGER.warning(f"🛒 Current consumption_log has {len(coord.consumption_log)} total entries")
+        TRACE(
+            "consume_products room=%s consumed=%s failed=%s",
+            room, result["success_count"], result["failed_products"]
+        )
 
         hass.bus.async_fire(f"{DOMAIN}_products_consumed", {
+            ATTR_ENTRY_ID: coord.entry.entry_id,
             "room": room,
-            "success_count": success_count,
-            "failed_products": failed_products
+            "success_count": result["success_count"],
+            "failed_products": result["failed_products"]
         })
 
+        return result
+
+    @TRACE.operation()
     async def handle_verify_pin(call: ServiceCall) -> dict:
         """Handle verify PIN service (for self-service)."""
-        coord = get_coordinator()
+        coord = get_coordinator(call)
         if not coord:
             _LOGGER.error("No Lednice coordinator found")
             return {
@@ -339,23 +555,19 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
 
         # Validate PIN exists and is not empty
         if not pin:
-            _LOGGER.warning("🔐 PIN verification FAILED: Empty PIN provided")
+            TRACE("verify_pin result=empty_pin")
             response = {
                 "pin": "",
                 "valid": False,
                 "room": None
             }
-            hass.bus.async_fire(f"{DOMAIN}_pin_verified", response)
+            hass.bus.async_fire(f"{DOMAIN}_pin_verified", {**response, ATTR_ENTRY_ID: coord.entry.entry_id})
             return response
 
         room = coord.get_room_by_pin(pin)
 
-        # Log verification attempt for debugging (using WARNING to ensure visibility)
         is_valid = room is not None
-        _LOGGER.warning(
-            f"🔐 PIN verification: PIN='{pin}' | Room='{room}' | Valid={is_valid} | "
-            f"Available PINs={dict(coord.room_pins)}"
-        )
+        TRACE("verify_pin pin=%s room=%s valid=%s", pin, room, is_valid)
 
         # Prepare response with consumption data
         response = {
@@ -366,99 +578,144 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
 
         # If valid, add consumption information
         if is_valid and room:
-            # Get guest info from Previo if available
-            previo_pins = coord.data.get("previo_pins", {})
-            _LOGGER.warning(f"🔍 Looking for guest info: room={room}, pin={pin}")
-            _LOGGER.warning(f"🔍 Available previo_pins keys: {list(previo_pins.keys())}")
-
-            # Search for matching room AND pin in new structure (room{X}_{PIN})
-            guest_info = {}
-            for entry_key, pin_data in previo_pins.items():
-                if pin_data.get("room") == room and pin_data.get("pin") == pin:
-                    guest_info = pin_data
-                    _LOGGER.warning(f"✅ Found guest info in {entry_key}: {guest_info}")
-                    break
-
-            if not guest_info:
-                _LOGGER.warning(f"⚠️ No Previo guest info found for room={room}, pin={pin} (this is OK for static PINs)")
+            # Get guest info from Previo if available (none for static PINs)
+            guest_info = coord.get_reservation(room, pin) or {}
 
             guest_name = guest_info.get("guest")
             checkin = guest_info.get("checkin")
             checkout = guest_info.get("checkout")
 
-            # Calculate consumption for this room
-            room_logs = [
-                log for log in coord.consumption_log
-                if log.get("room") == room
-            ]
-
-            # Calculate total price
-            total_price = sum(
-                log.get("price", 0.0) * log.get("quantity", 1)
-                for log in room_logs
-            )
-
-            # Group items by name with quantities and prices
-            item_summary = {}
-            for log in room_logs:
-                item = log.get("item", "Unknown")
-                quantity = log.get("quantity", 1)
-                price = log.get("price", 0.0)
-
-                if item not in item_summary:
-                    item_summary[item] = {
-                        "quantity": 0,
-                        "unit_price": price,
-                        "total_price": 0.0
-                    }
-
-                item_summary[item]["quantity"] += quantity
-                item_summary[item]["total_price"] += price * quantity
+            # Running consumption totals for this room
+            consumption = coord.room_consumption(room)
+            total_price = consumption["total_price"]
+            item_summary = consumption["item_summary"]
 
             # Add consumption data to response
             response.update({
                 "guest_name": guest_name,
                 "checkin": checkin,
                 "checkout": checkout,
-                "total_price": round(total_price, 2),
-                "total_items": sum(log.get("quantity", 1) for log in room_logs),
+                "total_price": total_price,
+                "total_items": consumption["total_quantity"],
                 "item_summary": item_summary,
-                "consumption_count": len(room_logs)
+                "consumption_count": consumption["consumption_count"]
             })
 
-            _LOGGER.warning(
-                f"💰 Room {room} consumption: {total_price:.2f} Kč | "
-                f"Guest: {guest_name or 'N/A'} | Items: {len(item_summary)} | "
-                f"item_summary: {item_summary}"
+            TRACE(
+                "verify_pin room=%s guest=%s total_price=%s item_summary=%s",
+                room, guest_name, total_price, item_summary
             )
 
-        _LOGGER.warning(f"🔔 Firing event lednice_pin_verified with data: {response}")
-        hass.bus.async_fire(f"{DOMAIN}_pin_verified", response)
+        hass.bus.async_fire(f"{DOMAIN}_pin_verified", {**response, ATTR_ENTRY_ID: coord.entry.entry_id})
 
         # Return response data directly to the service caller
         return response
 
     async def handle_clear_room_consumption(call: ServiceCall) -> None:
         """Handle clear room consumption service."""
-        coord = get_coordinator()
+        coord = get_coordinator(call)
         if not coord:
             _LOGGER.error("No Lednice coordinator found")
             return
 
         room = call.data.get(ATTR_ROOM)
 
-        # Remove all consumption log entries for this room
-        original_count = len(coord.data.get("consumption_log", []))
-        coord.data["consumption_log"] = [
-            entry for entry in coord.data.get("consumption_log", [])
-            if entry.get("room") != room
-        ]
-        removed_count = original_count - len(coord.data["consumption_log"])
+        removed_count = await coord.clear_room_consumption(room)
+
+        _LOGGER.info("Cleared %s consumption entries for room '%s'", removed_count, room)
+
+    async def handle_set_trace(call: ServiceCall) -> None:
+        """Handle set trace service switching verbose hot-path tracing on or off."""
+        TRACE.configure(call.data[ATTR_ENABLED], call.data[ATTR_SAMPLE_RATE])
+        _LOGGER.info(
+            "Tracing %s (sample rate %s)",
+            "enabled" if TRACE.enabled else "disabled", TRACE.sample_rate
+        )
+
+    async def handle_import_inventory(call: ServiceCall) -> dict:
+        """Handle bulk inventory import from an inline list and/or a CSV/JSON file."""
+        coord = get_coordinator(call)
+        if not coord:
+            _LOGGER.error("No Lednice coordinator found")
+            return {"added": [], "updated": [], "rejected": [], "error": "No coordinator found"}
+
+        rows = list(call.data.get(ATTR_ITEMS, []))
+        if ATTR_FILE in call.data:
+            path = resolve_inventory_file(hass, call.data[ATTR_FILE])
+            rows.extend(await hass.async_add_executor_job(read_inventory_file, path))
+        if not rows:
+            raise HomeAssistantError("Nothing to import, pass items or file")
+
+        result = await coord.import_inventory(rows, call.data[ATTR_MODE])
+        _LOGGER.info(
+            "Imported inventory: %s added, %s updated, %s rejected",
+            len(result["added"]), len(result["updated"]), len(result["rejected"])
+        )
+        return result
+
+    async def handle_export_inventory(call: ServiceCall) -> dict:
+        """Handle inventory export, optionally to a CSV/JSON file."""
+        coord = get_coordinator(call)
+        if not coord:
+            _LOGGER.error("No Lednice coordinator found")
+            return {"items": [], "total": 0, "error": "No coordinator found"}
+
+        rows = coord.export_inventory()
+        result = {"items": rows, "total": len(rows)}
+        if ATTR_FILE in call.data:
+            path = resolve_inventory_file(hass, call.data[ATTR_FILE])
+            await hass.async_add_executor_job(write_inventory_file, path, rows)
+            result["file"] = path
+        return result
+
+    async def handle_query(call: ServiceCall) -> dict:
+        """Handle query service returning a page of inventory, logs or reservations."""
+        coord = get_coordinator(call)
+        if not coord:
+            _LOGGER.error("No Lednice coordinator found")
+            return {"items": [], "total": 0, "error": "No coordinator found"}
+
+        start = call.data.get(ATTR_START)
+        end = call.data.get(ATTR_END)
+        return await coord.async_query(
+            call.data[ATTR_DATASET],
+            room=call.data.get(ATTR_ROOM),
+            item=call.data.get(ATTR_ITEM_NAME),
+            start=_local_timestamp(start) if start else None,
+            end=_local_timestamp(end) if end else None,
+            offset=call.data[ATTR_OFFSET],
+            limit=call.data[ATTR_LIMIT],
+        )
 
-        await coord._save_data()
-        coord._notify_listeners()
+    async def handle_report(call: ServiceCall) -> dict:
+        """Handle report service returning consumption and revenue totals of a period."""
+        coord = get_coordinator(call)
+        if not coord:
+            _LOGGER.error("No Lednice coordinator found")
+            return {"error": "No coordinator found"}
 
-        _LOGGER.info(f"Cleared {removed_count} consumption entries for room '{room}'")
+        if ATTR_PERIOD in call.data:
+            start, end = period_range(call.data[ATTR_PERIOD], call.data.get(ATTR_DATE))
+        elif ATTR_START in call.data and ATTR_END in call.data:
+            start, end = call.data[ATTR_START], call.data[ATTR_END]
+        else:
+            raise HomeAssistantError("Report needs either a period or both start and end")
+
+        return coord.report(start, end, room=call.data.get(ATTR_ROOM), item=call.data.get(ATTR_ITEM_NAME))
+
+    async def handle_analytics(call: ServiceCall) -> dict:
+        """Handle analytics service returning vectorized analysis of all purchases."""
+        coord = get_coordinator(call)
+        if not coord:
+            _LOGGER.error("No Lednice coordinator found")
+            return {"error": "No coordinator found"}
+
+        return await coord.async_analytics(
+            start=call.data.get(ATTR_START),
+            end=call.data.get(ATTR_END),
+            top=call.data[ATTR_TOP],
+            occupied_nights=call.data.get(ATTR_OCCUPIED_NIGHTS),
+        )
 
     # Register services
     hass.services.async_register(
@@ -466,6 +723,7 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
         SERVICE_ADD_ITEM,
         handle_add_item,
         schema=vol.Schema({
+            vol.Optional(ATTR_ENTRY_ID): cv.string,
             vol.Required(ATTR_ITEM_NAME): cv.string,
             vol.Optional(ATTR_QUANTITY, default=1): cv.positive_int,
             vol.Optional(ATTR_CODE, default=""): cv.string,
@@ -477,6 +735,7 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
         SERVICE_REMOVE_ITEM,
         handle_remove_item,
         schema=vol.Schema({
+            vol.Optional(ATTR_ENTRY_ID): cv.string,
             vol.Required(ATTR_ITEM_NAME): cv.string,
             vol.Optional(ATTR_QUANTITY, default=1): cv.positive_int,
             vol.Optional(ATTR_PIN): cv.string,
@@ -488,6 +747,7 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
         SERVICE_UPDATE_ITEM,
         handle_update_item,
         schema=vol.Schema({
+            vol.Optional(ATTR_ENTRY_ID): cv.string,
             vol.Required(ATTR_ITEM_NAME): cv.string,
             vol.Required(ATTR_QUANTITY): cv.positive_int,
             vol.Optional(ATTR_CODE): cv.string,
@@ -499,6 +759,7 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
         SERVICE_SCAN_CODE,
         handle_scan_code,
         schema=vol.Schema({
+            vol.Optional(ATTR_ENTRY_ID): cv.string,
             vol.Required(ATTR_CODE): cv.string,
             vol.Optional(ATTR_PIN): cv.string,
         })
@@ -508,7 +769,9 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
         DOMAIN,
         SERVICE_RESET_INVENTORY,
         handle_reset_inventory,
-        schema=vol.Schema({})
+        schema=vol.Schema({
+            vol.Optional(ATTR_ENTRY_ID): cv.string,
+        })
     )
 
     hass.services.async_register(
@@ -516,6 +779,7 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
         SERVICE_ADD_PRODUCT_CODE,
         handle_add_product_code,
         schema=vol.Schema({
+            vol.Optional(ATTR_ENTRY_ID): cv.string,
             vol.Required(ATTR_PRODUCT_CODE): cv.positive_int,
             vol.Required(ATTR_PRODUCT_NAME): cv.string,
             vol.Optional(ATTR_PRICE, default=0.0): vol.Coerce(float),
@@ -528,6 +792,7 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
         SERVICE_REMOVE_PRODUCT_CODE,
         handle_remove_product_code,
         schema=vol.Schema({
+            vol.Optional(ATTR_ENTRY_ID): cv.string,
             vol.Required(ATTR_PRODUCT_CODE): cv.positive_int,
         })
     )
@@ -537,9 +802,12 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
         SERVICE_CONSUME_PRODUCTS,
         handle_consume_products,
         schema=vol.Schema({
+            vol.Optional(ATTR_ENTRY_ID): cv.string,
             vol.Required(ATTR_PIN): cv.string,
             vol.Required(ATTR_PRODUCTS): [cv.positive_int],
-        })
+            vol.Optional(ATTR_ATOMIC, default=False): cv.boolean,
+        }),
+        supports_response=SupportsResponse.OPTIONAL
     )
 
     hass.services.async_register(
@@ -547,6 +815,7 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
         SERVICE_VERIFY_PIN,
         handle_verify_pin,
         schema=vol.Schema({
+            vol.Optional(ATTR_ENTRY_ID): cv.string,
             vol.Required(ATTR_PIN): cv.string,
         }),
         supports_response=SupportsResponse.OPTIONAL
@@ -557,10 +826,97 @@ async def async_setup_services(hass: HomeAssistant, coordinator: "LedniceDataCoo
         SERVICE_CLEAR_ROOM_CONSUMPTION,
         handle_clear_room_consumption,
         schema=vol.Schema({
+            vol.Optional(ATTR_ENTRY_ID): cv.string,
             vol.Required(ATTR_ROOM): cv.string,
         })
     )
 
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_TRACE,
+        handle_set_trace,
+        schema=vol.Schema({
+            vol.Required(ATTR_ENABLED): cv.boolean,
+            vol.Optional(ATTR_SAMPLE_RATE, default=1.0): vol.All(
+                vol.Coerce(float), vol.Range(min=0.0, max=1.0)
+            ),
+        })
+    )
+
+    # Both read or write files of the configuration, so they are for admins only
+    _async_register_admin_service(
+        hass,
+        SERVICE_IMPORT_INVENTORY,
+        handle_import_inventory,
+        vol.Schema({
+            vol.Optional(ATTR_ENTRY_ID): cv.string,
+            vol.Optional(ATTR_ITEMS): vol.All(cv.ensure_list, [dict]),
+            vol.Optional(ATTR_FILE): cv.string,
+            vol.Optional(ATTR_MODE, default=IMPORT_MODE_ADD): vol.In(IMPORT_MODES),
+        }),
+    )
+
+    _async_register_admin_service(
+        hass,
+        SERVICE_EXPORT_INVENTORY,
+        handle_export_inventory,
+        vol.Schema({
+            vol.Optional(ATTR_ENTRY_ID): cv.string,
+            vol.Optional(ATTR_FILE): cv.string,
+        }),
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY,
+        handle_query,
+        schema=vol.Schema({
+            vol.Optional(ATTR_ENTRY_ID): cv.string,
+            vol.Required(ATTR_DATASET): vol.In(QUERY_DATASETS),
+            vol.Optional(ATTR_ROOM): cv.string,
+            vol.Optional(ATTR_ITEM_NAME): cv.string,
+            vol.Optional(ATTR_START): cv.datetime,
+            vol.Optional(ATTR_END): cv.datetime,
+            vol.Optional(ATTR_OFFSET, default=0): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Optional(ATTR_LIMIT, default=DEFAULT_QUERY_LIMIT): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=MAX_QUERY_LIMIT)
+            ),
+        }),
+        supports_response=SupportsResponse.ONLY
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REPORT,
+        handle_report,
+        schema=vol.Schema({
+            vol.Optional(ATTR_ENTRY_ID): cv.string,
+            vol.Optional(ATTR_PERIOD): vol.In(REPORT_PERIODS),
+            vol.Optional(ATTR_DATE): cv.date,
+            vol.Optional(ATTR_START): cv.datetime,
+            vol.Optional(ATTR_END): cv.datetime,
+            vol.Optional(ATTR_ROOM): cv.string,
+            vol.Optional(ATTR_ITEM_NAME): cv.string,
+        }),
+        supports_response=SupportsResponse.ONLY
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_ANALYTICS,
+        handle_analytics,
+        schema=vol.Schema({
+            vol.Optional(ATTR_ENTRY_ID): cv.string,
+            vol.Optional(ATTR_START): cv.datetime,
+            vol.Optional(ATTR_END): cv.datetime,
+            vol.Optional(ATTR_TOP, default=DEFAULT_ANALYTICS_TOP): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=MAX_ANALYTICS_TOP)
+            ),
+            vol.Optional(ATTR_OCCUPIED_NIGHTS): cv.positive_int,
+        }),
+        supports_response=SupportsResponse.ONLY
+    )
+
 
 class LedniceDataCoordinator:
     """Class to manage Lednice data."""
@@ -571,8 +927,67 @@ class LedniceDataCoordinator:
         self.store = store
         self.data = data
         self.entry = entry
-        self._listeners = []
+        self._listeners: dict[Callable[[], None], frozenset[str] | None] = {}
+        # Bumped on every notification; sensors cache their state per revision
+        self.revision = 0
         self._previo_listeners = []
+        # Fires when the next stored stay begins (see _async_schedule_checkin)
+        self._checkin_timer: Callable[[], None] | None = None
+        self._previo_entities: set[str] = set()
+        self._previo_sensor_fingerprints: dict[str, str] = {}
+        self._previo_fingerprints = {
+            room_key: _reservation_fingerprint(reservation)
+            for room_key, reservation in self.data.get("previo_pins", {}).items()
+        }
+        self._previo_stats = {
+            "reservations_applied": 0,
+            "reservations_skipped": 0,
+            "sensor_updates_skipped": 0,
+        }
+        self._pin_index = PinIndex()
+        self._rebuild_pin_index()
+        self._barcode_index = BarcodeIndex()
+        self._rebuild_barcode_index()
+        # Both logs are ring buffers; the Store schema keeps plain lists (see _data_to_save)
+        self.data["consumption_log"] = deque(
+            self.data.get("consumption_log", []), maxlen=self.consumption_retention
+        )
+        self.data["history"] = deque(self.data.get("history", []), maxlen=self.history_retention)
+        self._history_totals = HistoryAggregates()
+        self._history_totals.rebuild(self.history)
+        self._consumption = ConsumptionAggregates()
+        self._consumption.rebuild(self.consumption_log)
+        # Lifetime revenue per room for the revenue sensors; unlike the room totals it
+        # never drops when a room is settled or old entries leave the log
+        if "room_revenue" not in self.data:
+            self.data["room_revenue"] = {
+                room: round(totals.revenue, 2) for room, totals in self._consumption.rooms.items() if room
+            }
+        self.ledger = ConsumptionLedger(hass, entry.entry_id)
+        self.history_db = (
+            HistoryDatabase(hass, entry.entry_id)
+            if entry.options.get(CONF_HISTORY_DATABASE, DEFAULT_HISTORY_DATABASE)
+            else None
+        )
+        self.reports: ConsumptionReports | None = None
+        self._reports_store: Store | None = None
+        self._reports_save_pending = False
+        # Columnar purchases for analytics, loaded on the first analytics call
+        self._analytics: ConsumptionColumns | None = None
+        self._analytics_lock = asyncio.Lock()
+        self.statistics: ConsumptionStatistics | None = None
+        self._save_pending = False
+        self._save_requests = 0
+        self._disk_writes = 0
+        self._mutation_lock = asyncio.Lock()
+        self._mutation_stats = {
+            "mutations": 0,
+            "contended": 0,
+            "queue_depth": 0,
+            "max_queue_depth": 0,
+            "wait_total": 0.0,
+            "wait_max": 0.0,
+        }
 
     @staticmethod
     def _parse_date(date_input) -> datetime | None:
@@ -584,37 +999,15 @@ class LedniceDataCoordinator:
         if isinstance(date_input, datetime):
             return date_input
 
-        # If not a string, convert to string
-        if not isinstance(date_input, str):
-            date_string = str(date_input)
-        else:
-            date_string = date_input
-
-        # List of formats to try
-        formats = [
-            "%Y-%m-%d",  # 2025-11-24
-            "%Y-%m-%dT%H:%M:%S",  # 2025-11-24T10:00:00
-            "%Y-%m-%d %H:%M:%S",  # 2025-11-24 10:00:00
-            "%B %d, %Y at %I:%M:%S %p",  # November 24, 2025 at 10:00:00 AM
-            "%B %d, %Y",  # November 24, 2025
-        ]
-
-        # Try ISO format first (fastest)
-        try:
-            return datetime.fromisoformat(date_string)
-        except (ValueError, AttributeError, TypeError):
-            pass
+        return _parse_date_string(str(date_input))
 
-        # Try other formats
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_string, fmt)
-            except (ValueError, AttributeError, TypeError):
-                continue
-
-        # If all fails, log warning and return None
-        _LOGGER.warning(f"Could not parse date: {date_input} (type: {type(date_input)})")
-        return None
+    @classmethod
+    def _parse_timestamp(cls, date_input) -> float | None:
+        """Parse a date into epoch seconds, treating naive times as Home Assistant local time."""
+        parsed = cls._parse_date(date_input)
+        if parsed is None:
+            return None
+        return dt_util.as_utc(parsed).timestamp()
 
     @property
     def inventory(self) -> dict:
@@ -627,9 +1020,14 @@ class LedniceDataCoordinator:
         return self.data.get("room_pins", {})
 
     @property
-    def consumption_log(self) -> list:
+    def consumption_log(self) -> deque:
         """Return consumption log."""
-        return self.data.get("consumption_log", [])
+        return self.data["consumption_log"]
+
+    @property
+    def history(self) -> deque:
+        """Return history log."""
+        return self.data["history"]
 
     @property
     def product_codes(self) -> dict:
@@ -638,104 +1036,222 @@ class LedniceDataCoordinator:
 
     def get_room_by_pin(self, pin: str) -> str | None:
         """Get room name by PIN, checking Previo pins first (with validity), then previo input_text, then fallback to static pins."""
-        # First check Previo pins with validity
-        previo_pins = self.data.get("previo_pins", {})
-        current_time = datetime.now()
-
-        _LOGGER.warning(f"🔍 PIN CHECK: Checking PIN '{pin}' against {len(previo_pins)} Previo reservations")
-        _LOGGER.warning(f"🔍 Current time: {current_time}")
-        _LOGGER.warning(f"🔍 Available Previo entries: {[(key, data.get('pin'), data.get('room')) for key, data in previo_pins.items()]}")
-
-        # First: Check if PIN matches directly in previo_pins
-        # Note: Keys are now in format "room{X}_{PIN}" to support multiple reservations per room
-        for entry_key, pin_data in previo_pins.items():
-            stored_pin = pin_data.get("pin")
-            room = pin_data.get("room")
-
-            if stored_pin == pin:
-                _LOGGER.warning(f"🔍 PIN MATCH FOUND in previo_pins: {entry_key} has PIN '{pin}' for {room}")
-                return self._validate_previo_pin_time(room, pin, pin_data, current_time)
-
-        # Second: Check input_text.previo_used_pins_simple_X entities as fallback
-        _LOGGER.warning(f"🔍 PIN not found in previo_pins, checking input_text entities...")
-        for room_num in range(1, 11):
-            input_text_entity = f"input_text.previo_used_pins_simple_{room_num}"
-            state = self.hass.states.get(input_text_entity)
-            if state and state.state and state.state == pin:
-                room = f"room{room_num}"
-                _LOGGER.warning(f"✅ PIN found in {input_text_entity}, matched to {room}")
-
-                # Search previo_pins for matching room AND pin (keys are now room{X}_{PIN})
-                matching_pin_data = None
-                for entry_key, pin_data in previo_pins.items():
-                    if pin_data.get("room") == room and pin_data.get("pin") == pin:
-                        matching_pin_data = pin_data
-                        _LOGGER.warning(f"🔍 Found matching Previo reservation: {entry_key}, validating time")
-                        break
-
-                if matching_pin_data:
-                    return self._validate_previo_pin_time(room, pin, matching_pin_data, current_time)
-                else:
-                    # No Previo data, accept PIN from input_text without time validation
-                    _LOGGER.warning(f"✅ Accepting PIN from input_text (no time validation)")
+        entries = self._pin_index.lookup(pin)
+        if not entries:
+            TRACE("pin_lookup pin=%s result=unknown", pin)
+            return None
+
+        # Previo reservations take precedence and are only valid during the stay
+        if entries[0].source == PIN_SOURCE_PREVIO:
+            current_ts = time.time()
+            for entry in entries:
+                if entry.source != PIN_SOURCE_PREVIO:
+                    break
+                room = self._validate_previo_pin_time(entry, pin, current_ts)
+                if room:
                     return room
+            return None
 
-        # Third: Fallback to static room PINs
-        _LOGGER.warning(f"🔍 Checking static PINs: {dict(self.room_pins)}")
-        for room, room_pin in self.room_pins.items():
-            if room_pin == pin:
-                _LOGGER.warning(f"✅ Static PIN verified: room={room}, pin={pin}")
-                return room
+        entry = entries[0]
+        TRACE("pin_lookup pin=%s room=%s source=%s result=valid", pin, entry.room, entry.source)
+        return entry.room
 
-        _LOGGER.warning(f"❌ PIN '{pin}' not found in any Previo or static PINs")
+    def get_reservation(self, room: str, pin: str) -> dict | None:
+        """Return the stored Previo reservation of a room with the given PIN, if any."""
+        for entry in self._pin_index.lookup(pin):
+            if entry.source == PIN_SOURCE_PREVIO and entry.room == room:
+                return self.data.get("previo_pins", {}).get(entry.key)
         return None
 
-    def _validate_previo_pin_time(self, room: str, pin: str, pin_data: dict, current_time: datetime) -> str | None:
+    def room_reservation(self, room: str) -> dict | None:
+        """Return the stored Previo reservation of a room whose stay started most recently."""
+        current_ts = time.time()
+        started = [
+            reservation
+            for reservation in self.data.get("previo_pins", {}).values()
+            if reservation.get("room") == room and (reservation.get("checkin_ts") or 0) <= current_ts
+        ]
+        return max(started, key=lambda reservation: reservation.get("checkin_ts") or 0, default=None)
+
+    def _validate_previo_pin_time(self, entry: PinIndexEntry, pin: str, current_ts: float) -> str | None:
         """Validate if Previo PIN is within valid time range."""
-        checkin_str = pin_data.get("checkin", "")
-        checkout_str = pin_data.get("checkout", "")
+        room = entry.room
+        checkin_ts = entry.valid_from
+        checkout_ts = entry.valid_until
 
-        _LOGGER.warning(f"🔍 RAW DATES for {room}: checkin_str='{checkin_str}', checkout_str='{checkout_str}'")
+        if checkin_ts is None or checkout_ts is None:
+            TRACE("pin_lookup pin=%s room=%s source=previo result=unparsable_dates", pin, room)
+            return None
 
-        checkin_dt = self._parse_date(checkin_str)
-        checkout_dt = self._parse_date(checkout_str)
+        # PIN is valid if current time is between checkin and checkout (inclusive)
+        if checkin_ts <= current_ts <= checkout_ts:
+            TRACE("pin_lookup pin=%s room=%s source=previo result=valid", pin, room)
+            return room
 
-        _LOGGER.warning(f"🔍 PARSED DATES for {room}: checkin_dt={checkin_dt}, checkout_dt={checkout_dt}")
+        if TRACE.active:
+            TRACE(
+                "pin_lookup pin=%s room=%s source=previo result=%s valid_from=%s valid_until=%s",
+                pin,
+                room,
+                "too_early" if current_ts < checkin_ts else "too_late",
+                dt_util.as_local(dt_util.utc_from_timestamp(checkin_ts)),
+                dt_util.as_local(dt_util.utc_from_timestamp(checkout_ts)),
+            )
+        return None
 
-        if not checkin_dt or not checkout_dt:
-            _LOGGER.warning(f"❌ Could not parse dates for room {room}, rejecting PIN")
-            _LOGGER.warning(f"❌ Failed to parse: checkin='{checkin_str}' or checkout='{checkout_str}'")
-            return None
+    def _rebuild_pin_index(self) -> None:
+        """Rebuild the PIN index from static PINs and stored Previo reservations."""
+        self._pin_index.clear()
+        for room, pin in self.room_pins.items():
+            self._index_static_pin(room, pin)
+        for entry_key, pin_data in self.data.get("previo_pins", {}).items():
+            self._index_previo_pin(entry_key, pin_data)
+
+    def _rebuild_barcode_index(self) -> None:
+        """Rebuild the barcode index from inventory items and product codes."""
+        self._barcode_index.clear()
+        for item_name, item_data in self.inventory.items():
+            self._index_barcode(BARCODE_KIND_ITEM, item_name, item_data.get("code"))
+        for code_str, product in self.product_codes.items():
+            self._index_barcode(BARCODE_KIND_PRODUCT, code_str, product.get("barcode"))
+
+    def _index_barcode(self, kind: str, owner: str, barcode: str | None) -> None:
+        """Update the barcode index for an item or product code, reporting collisions."""
+        collisions = self._barcode_index.set(kind, owner, barcode)
+        if not collisions:
+            return
 
         _LOGGER.warning(
-            f"🔍 TIME CHECK for {room}: checkin={checkin_dt}, checkout={checkout_dt}, current={current_time}"
+            "Barcode %s of %s %s is already used by %s; scans resolve to %s",
+            barcode, kind, owner, ", ".join(collisions), collisions[0]
         )
-        _LOGGER.warning(f"🔍 COMPARISON: {checkin_dt} <= {current_time} <= {checkout_dt}?")
+        self.hass.bus.async_fire(f"{DOMAIN}_barcode_collision", {
+            ATTR_ENTRY_ID: self.entry.entry_id,
+            "barcode": barcode,
+            "kind": kind,
+            "owner": owner,
+            "existing": collisions,
+        })
 
-        # PIN is valid if current time is between checkin and checkout (inclusive)
-        if checkin_dt <= current_time <= checkout_dt:
-            _LOGGER.warning(
-                f"✅ Previo PIN VERIFIED: room={room}, pin={pin}, guest={pin_data.get('guest')}, "
-                f"valid from {checkin_dt} to {checkout_dt}"
-            )
-            return room
+    def _index_static_pin(self, room: str, pin: str | None) -> None:
+        """Update the PIN index for a static room PIN."""
+        if pin:
+            self._pin_index.add(str(pin), PinIndexEntry(PIN_SOURCE_STATIC, room, room))
         else:
-            _LOGGER.warning(
-                f"❌ Previo PIN TIME MISMATCH: room={room}, pin={pin}, "
-                f"valid from {checkin_dt} to {checkout_dt}, current={current_time}"
-            )
-            if current_time < checkin_dt:
-                _LOGGER.warning(f"❌ Too early - checkin not reached yet!")
-            if current_time > checkout_dt:
-                _LOGGER.warning(f"❌ Too late - checkout time passed!")
-            return None
+            self._pin_index.remove(PIN_SOURCE_STATIC, room)
+
+    def _index_previo_pin(self, entry_key: str, pin_data: dict) -> None:
+        """Update the PIN index for a stored Previo reservation."""
+        pin = pin_data.get("pin")
+        room = pin_data.get("room")
+        if not pin or not room:
+            self._pin_index.remove(PIN_SOURCE_PREVIO, entry_key)
+            return
+
+        # Reservations stored before the bounds were pre-parsed get them once here
+        if "checkin_ts" not in pin_data:
+            pin_data["checkin_ts"] = self._parse_timestamp(pin_data.get("checkin"))
+        if "checkout_ts" not in pin_data:
+            pin_data["checkout_ts"] = self._parse_timestamp(pin_data.get("checkout"))
+
+        self._pin_index.add(pin, PinIndexEntry(
+            PIN_SOURCE_PREVIO,
+            room,
+            entry_key,
+            pin_data["checkin_ts"],
+            pin_data["checkout_ts"],
+        ))
+
+    def _index_input_text_pin(self, entity_id: str, state: State | None) -> None:
+        """Update the PIN index for a previo_used_pins_simple_X helper."""
+        if state is None or not state.state or state.state in ("unavailable", "unknown"):
+            self._pin_index.remove(PIN_SOURCE_INPUT_TEXT, entity_id)
+            return
+
+        room = f"room{entity_id[len(PREVIO_INPUT_TEXT_PREFIX):]}"
+        self._pin_index.add(state.state, PinIndexEntry(PIN_SOURCE_INPUT_TEXT, room, entity_id))
+
+    def query(
+        self,
+        dataset: str,
+        room: str | None = None,
+        item: str | None = None,
+        start: str | None = None,
+        end: str | None = None,
+        offset: int = 0,
+        limit: int = DEFAULT_QUERY_LIMIT,
+    ) -> dict[str, Any]:
+        """Return a filtered page of a dataset (logs are returned newest first).
+
+        start/end are local ISO timestamps limiting log entries to [start, end).
+        """
+        if dataset == QUERY_INVENTORY:
+            rows = [{"name": name, **data} for name, data in self.inventory.items()]
+            item_key = "name"
+        elif dataset == QUERY_PRODUCTS:
+            rows = sorted(self.product_codes.values(), key=lambda product: int(product.get("code", 0)))
+            item_key = "name"
+        elif dataset == QUERY_RESERVATIONS:
+            rows = [{"key": key, **data} for key, data in self.data.get("previo_pins", {}).items()]
+            rows.sort(key=lambda reservation: reservation.get("checkin_ts") or 0)
+            item_key = None
+        elif dataset == QUERY_CONSUMPTION:
+            rows = list(reversed(self.consumption_log))
+            item_key = "item"
+        else:
+            rows = list(reversed(self.history))
+            item_key = "item"
+
+        if room is not None and dataset in (QUERY_CONSUMPTION, QUERY_HISTORY, QUERY_RESERVATIONS):
+            rows = [row for row in rows if row.get("room") == room]
+        if item is not None and item_key:
+            rows = [row for row in rows if row.get(item_key) == item]
+        if dataset in (QUERY_CONSUMPTION, QUERY_HISTORY):
+            if start is not None:
+                rows = [row for row in rows if row.get("timestamp", "") >= start]
+            if end is not None:
+                rows = [row for row in rows if row.get("timestamp", "") < end]
+
+        return {
+            "dataset": dataset,
+            "total": len(rows),
+            "offset": offset,
+            "limit": limit,
+            "items": rows[offset:offset + limit],
+        }
+
+    async def async_query(
+        self,
+        dataset: str,
+        room: str | None = None,
+        item: str | None = None,
+        start: str | None = None,
+        end: str | None = None,
+        offset: int = 0,
+        limit: int = DEFAULT_QUERY_LIMIT,
+    ) -> dict[str, Any]:
+        """Return a filtered page of a dataset, reading logs from the history database if enabled."""
+        if self.history_db is None or dataset not in (QUERY_CONSUMPTION, QUERY_HISTORY):
+            return self.query(dataset, room, item, start, end, offset, limit)
+
+        table = TABLE_CONSUMPTION if dataset == QUERY_CONSUMPTION else TABLE_HISTORY
+        total, rows = await self.history_db.async_query(table, room, item, start, end, offset, limit)
+        return {
+            "dataset": dataset,
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "items": rows,
+        }
 
     def get_item_by_code(self, code: str) -> str | None:
         """Get item name by barcode."""
-        for item_name, item_data in self.inventory.items():
-            if item_data.get("code") == code:
-                return item_name
-        return None
+        return self._barcode_index.lookup(BARCODE_KIND_ITEM, code)
+
+    def get_product_by_barcode(self, barcode: str) -> dict | None:
+        """Get product info by the barcode registered with a product code."""
+        code_str = self._barcode_index.lookup(BARCODE_KIND_PRODUCT, barcode)
+        return self.product_codes.get(code_str) if code_str else None
 
     def get_product_by_code(self, product_code: int) -> dict | None:
         """Get product info by product code (1-100)."""
@@ -743,116 +1259,343 @@ class LedniceDataCoordinator:
 
     async def add_item(self, item_name: str, quantity: int, code: str = "") -> None:
         """Add item to inventory."""
-        if item_name in self.inventory:
-            self.inventory[item_name]["quantity"] += quantity
-            if code:
-                self.inventory[item_name]["code"] = code
-        else:
-            self.inventory[item_name] = {
-                "quantity": quantity,
-                "code": code,
-                "added": datetime.now().isoformat()
-            }
+        async with self._mutation():
+            if item_name in self.inventory:
+                self.inventory[item_name]["quantity"] += quantity
+                if code:
+                    self.inventory[item_name]["code"] = code
+                    self._index_barcode(BARCODE_KIND_ITEM, item_name, code)
+            else:
+                self.inventory[item_name] = {
+                    "quantity": quantity,
+                    "code": code,
+                    "added": _local_timestamp(dt_util.now())
+                }
+                self._index_barcode(BARCODE_KIND_ITEM, item_name, code)
 
-        # Log to history
-        details = f"Code: {code}" if code else "No code"
-        self._log_history("add", item_name, quantity, "owner", details)
+            # Log to history
+            details = f"Code: {code}" if code else "No code"
+            self._log_history("add", item_name, quantity, "owner", details)
 
-        await self._save_data()
-        self._notify_listeners()
+            await self._save_data()
+            self._notify_listeners(TOPIC_INVENTORY, TOPIC_HISTORY)
 
     async def remove_item(self, item_name: str, quantity: int, room: str | None = None, price: float = 0.0) -> bool:
         """Remove item from inventory."""
-        if item_name not in self.inventory:
-            return False
+        async with self._mutation():
+            if item_name not in self.inventory:
+                return False
 
-        current_qty = self.inventory[item_name]["quantity"]
-        if current_qty < quantity:
-            return False
+            current_qty = self.inventory[item_name]["quantity"]
+            if current_qty < quantity:
+                return False
+
+            changed_rooms = self._record_consumption(item_name, quantity, room, price)
+
+            await self._save_data()
+            self._notify_consumption_changed(changed_rooms)
+            return True
+
+    async def consume_basket(self, room: str, product_codes: list[int], atomic: bool = False) -> dict[str, Any]:
+        """Consume a basket of product codes for a room with one save and one notification.
+
+        Stock is checked for the whole basket before anything is changed. With
+        atomic=True nothing is consumed unless every product is available,
+        otherwise available products are consumed and the rest reported as failed.
+        """
+        async with self._mutation():
+            items = []
+            available = {}  # item name -> stock left after the products accepted so far
+
+            for product_code in product_codes:
+                product_info = self.get_product_by_code(product_code)
+                if not product_info:
+                    items.append({"product_code": product_code, "success": False, "reason": "unknown_product"})
+                    continue
+
+                item_name = product_info.get("name", f"Product {product_code}")
+                price = product_info.get("price", 0.0)
+
+                if item_name not in available:
+                    available[item_name] = self.inventory.get(item_name, {}).get("quantity", 0)
+
+                if available[item_name] < 1:
+                    items.append({
+                        "product_code": product_code,
+                        "item": item_name,
+                        "price": price,
+                        "success": False,
+                        "reason": "out_of_stock",
+                    })
+                    continue
+
+                available[item_name] -= 1
+                items.append({"product_code": product_code, "item": item_name, "price": price, "success": True})
+
+            if atomic and not all(item["success"] for item in items):
+                for item in items:
+                    if item["success"]:
+                        item["success"] = False
+                        item["reason"] = "basket_rejected"
 
+            # Apply accepted products, one log entry per item and price
+            consumed = {}
+            for item in items:
+                if item["success"]:
+                    key = (item["item"], item["price"])
+                    consumed[key] = consumed.get(key, 0) + 1
+
+            changed_rooms = set()
+            for (item_name, price), quantity in consumed.items():
+                changed_rooms |= self._record_consumption(item_name, quantity, room, price)
+
+            if consumed:
+                await self._save_data()
+                self._notify_consumption_changed(changed_rooms)
+
+            accepted = [item for item in items if item["success"]]
+            return {
+                "room": room,
+                "success_count": len(accepted),
+                "failed_products": [item["product_code"] for item in items if not item["success"]],
+                "total_price": round(sum((item["price"] for item in accepted), 0.0), 2),
+                "items": items,
+            }
+
+    def _record_consumption(self, item_name: str, quantity: int, room: str | None, price: float) -> set[str | None]:
+        """Decrement stock and log the consumption; the caller saves and notifies.
+
+        Returns the rooms whose consumption changed, including rooms of entries
+        trimmed from the log.
+        """
         self.inventory[item_name]["quantity"] -= quantity
 
         # Log consumption
-        self.data["consumption_log"].append({
+        entry = {
             "item": item_name,
             "quantity": quantity,
             "room": room,
             "price": price,
-            "timestamp": datetime.now().isoformat()
-        })
-
-        # Keep only last 1000 logs
-        if len(self.data["consumption_log"]) > 1000:
-            self.data["consumption_log"] = self.data["consumption_log"][-1000:]
+            "timestamp": _local_timestamp(dt_util.now())
+        }
+        changed_rooms = {room}
+
+        # A full ring drops its oldest entry on append; the ledger retains every purchase
+        log = self.consumption_log
+        if len(log) == log.maxlen:
+            evicted = log[0]
+            self._consumption.remove(evicted)
+            changed_rooms.add(evicted.get("room"))
+
+        log.append(entry)
+        self._consumption.add(entry)
+        if room is not None and price:
+            revenue = self.data["room_revenue"]
+            revenue[room] = revenue.get(room, 0.0) + price * quantity
+        self.ledger.append(entry)
+        if self.history_db:
+            self.history_db.add_consumption(entry)
+        if self.reports:
+            self.reports.add(entry)
+            self._schedule_reports_save()
+        if self._analytics is not None:
+            self._analytics.extend((entry,))
+        if self.statistics:
+            self.statistics.add(entry)
 
         # Log to history
         details = f"Price: {price} Kč" if price > 0 else "No price"
         self._log_history("remove", item_name, quantity, room, details)
 
-        await self._save_data()
-        self._notify_listeners()
-        return True
+        return changed_rooms
 
     async def update_item(self, item_name: str, quantity: int | None = None, code: str | None = None) -> None:
         """Update item in inventory."""
-        old_quantity = 0
-        if item_name not in self.inventory:
-            self.inventory[item_name] = {
-                "quantity": 0,
-                "code": "",
-                "added": datetime.now().isoformat()
-            }
-        else:
-            old_quantity = self.inventory[item_name].get("quantity", 0)
+        async with self._mutation():
+            old_quantity = 0
+            if item_name not in self.inventory:
+                self.inventory[item_name] = {
+                    "quantity": 0,
+                    "code": "",
+                    "added": _local_timestamp(dt_util.now())
+                }
+            else:
+                old_quantity = self.inventory[item_name].get("quantity", 0)
 
-        details_parts = []
-        if quantity is not None:
-            self.inventory[item_name]["quantity"] = quantity
-            details_parts.append(f"Qty: {old_quantity} → {quantity}")
-        if code is not None:
-            self.inventory[item_name]["code"] = code
-            details_parts.append(f"Code: {code}")
+            details_parts = []
+            if quantity is not None:
+                self.inventory[item_name]["quantity"] = quantity
+                details_parts.append(f"Qty: {old_quantity} → {quantity}")
+            if code is not None:
+                self.inventory[item_name]["code"] = code
+                self._index_barcode(BARCODE_KIND_ITEM, item_name, code)
+                details_parts.append(f"Code: {code}")
 
-        # Log to history
-        details = ", ".join(details_parts) if details_parts else "Updated"
-        qty_change = (quantity - old_quantity) if quantity is not None else 0
-        self._log_history("update", item_name, qty_change, "owner", details)
+            # Log to history
+            details = ", ".join(details_parts) if details_parts else "Updated"
+            qty_change = (quantity - old_quantity) if quantity is not None else 0
+            self._log_history("update", item_name, qty_change, "owner", details)
 
-        await self._save_data()
-        self._notify_listeners()
+            await self._save_data()
+            self._notify_listeners(TOPIC_INVENTORY, TOPIC_HISTORY)
+
+    async def import_inventory(self, rows: list[Any], mode: str = IMPORT_MODE_ADD) -> dict[str, list]:
+        """Apply many inventory rows with a single save and notification.
+
+        In add mode the quantity of a row is added to the stock, in set mode it
+        replaces it. Invalid rows are rejected without affecting the others.
+        """
+        async with self._mutation():
+            added, updated, rejected = [], [], []
+
+            for row_number, row in enumerate(rows, start=1):
+                try:
+                    item_name, quantity, code = parse_inventory_row(row)
+                except ValueError as err:
+                    # Only the row number: the response must not echo file contents back
+                    rejected.append({"row": row_number, "reason": str(err)})
+                    continue
+
+                item = self.inventory.get(item_name)
+                if item is None:
+                    item = self.inventory[item_name] = {
+                        "quantity": 0,
+                        "code": "",
+                        "added": _local_timestamp(dt_util.now())
+                    }
+                    added.append(item_name)
+                else:
+                    updated.append(item_name)
+
+                old_quantity = item.get("quantity", 0)
+                item["quantity"] = old_quantity + quantity if mode == IMPORT_MODE_ADD else quantity
+                if code is not None:
+                    item["code"] = code
+                    self._index_barcode(BARCODE_KIND_ITEM, item_name, code)
+
+                self._log_history(
+                    "add" if mode == IMPORT_MODE_ADD else "update",
+                    item_name,
+                    item["quantity"] - old_quantity,
+                    "owner",
+                    f"Import: {old_quantity} → {item['quantity']}"
+                )
+
+            if added or updated:
+                await self._save_data()
+                self._notify_listeners(TOPIC_INVENTORY, TOPIC_HISTORY)
+
+            return {"added": added, "updated": updated, "rejected": rejected}
+
+    def export_inventory(self) -> list[dict[str, Any]]:
+        """Return inventory rows in the import format."""
+        return [
+            {"item_name": name, "quantity": data.get("quantity", 0), "code": data.get("code", "")}
+            for name, data in self.inventory.items()
+        ]
 
     async def set_room_pin(self, room: str, pin: str) -> None:
         """Set PIN for a room."""
-        self.data["room_pins"][room] = pin
-        await self._save_data()
-        self._notify_listeners()
+        async with self._mutation():
+            self.data["room_pins"][room] = pin
+            self._index_static_pin(room, pin)
+            await self._save_data()
+            self._notify_listeners(TOPIC_PINS)
 
     async def add_product_code(self, product_code: int, name: str, price: float = 0.0, barcode: str = "") -> None:
         """Add or update a product code mapping."""
-        self.data["product_codes"][str(product_code)] = {
-            "name": name,
-            "price": price,
-            "barcode": barcode,
-            "code": product_code
-        }
-        await self._save_data()
-        self._notify_listeners()
+        async with self._mutation():
+            self.data["product_codes"][str(product_code)] = {
+                "name": name,
+                "price": price,
+                "barcode": barcode,
+                "code": product_code
+            }
+            self._index_barcode(BARCODE_KIND_PRODUCT, str(product_code), barcode)
+            await self._save_data()
+            self._notify_listeners(TOPIC_PRODUCTS)
 
     async def remove_product_code(self, product_code: int) -> None:
         """Remove a product code mapping."""
-        code_str = str(product_code)
-        if code_str in self.data["product_codes"]:
-            del self.data["product_codes"][code_str]
+        async with self._mutation():
+            code_str = str(product_code)
+            if code_str in self.data["product_codes"]:
+                del self.data["product_codes"][code_str]
+                self._barcode_index.remove(BARCODE_KIND_PRODUCT, code_str)
+                await self._save_data()
+                self._notify_listeners(TOPIC_PRODUCTS)
+
+    async def clear_room_consumption(self, room: str) -> int:
+        """Remove all consumption entries of a room (guest has paid), returning how many."""
+        async with self._mutation():
+            original_count = len(self.consumption_log)
+            self.data["consumption_log"] = deque(
+                (entry for entry in self.consumption_log if entry.get("room") != room),
+                maxlen=self.consumption_retention,
+            )
+            removed_count = original_count - len(self.data["consumption_log"])
+            self._consumption.clear_room(room)
+
             await self._save_data()
-            self._notify_listeners()
+            self._notify_listeners(TOPIC_CONSUMPTION, consumption_topic(room))
+            return removed_count
+
+    def room_consumption(self, room: str | None) -> dict[str, Any]:
+        """Return running consumption totals of a room."""
+        totals = self._consumption.rooms.get(room)
+        if totals is None:
+            return {
+                "total_quantity": 0,
+                "total_price": 0.0,
+                "consumption_count": 0,
+                "item_statistics": {},
+                "item_summary": {},
+                "recent_items": [],
+            }
+
+        return {
+            "total_quantity": totals.quantity,
+            "total_price": round(totals.revenue, 2),
+            "consumption_count": totals.count,
+            "item_statistics": {item: data["quantity"] for item, data in totals.items.items()},
+            "item_summary": {item: dict(data) for item, data in totals.items.items()},
+            "recent_items": list(totals.recent),
+        }
+
+    def consumption_summary(self) -> dict[str, Any]:
+        """Return running consumption totals across all rooms."""
+        rooms = self._consumption.rooms
+        return {
+            "total_consumed": self._consumption.total_quantity,
+            "total_revenue": self._consumption.total_revenue,
+            "room_statistics": {room: totals.quantity for room, totals in rooms.items()},
+            "room_prices": {room: totals.revenue for room, totals in rooms.items()},
+            "item_statistics": dict(self._consumption.item_totals),
+        }
+
+    def history_summary(self) -> dict[str, Any]:
+        """Return running totals of the history kept in memory."""
+        totals = self._history_totals
+        return {
+            "total_added": totals.total_added,
+            "total_removed": totals.total_removed,
+            "action_counts": dict(totals.action_counts),
+        }
+
+    def room_revenue(self, room: str) -> float:
+        """Return the lifetime revenue of a room."""
+        return round(self.data["room_revenue"].get(room, 0.0), 2)
 
     async def reset_inventory(self) -> None:
         """Reset entire inventory."""
-        self.data["inventory"] = {}
-        self.data["consumption_log"] = []
-        self._log_history("reset", "all", 0, "owner", "Inventory reset")
-        await self._save_data()
-        self._notify_listeners()
+        async with self._mutation():
+            self.data["inventory"] = {}
+            self._barcode_index.clear(BARCODE_KIND_ITEM)
+            self.consumption_log.clear()
+            self._consumption.clear()
+            self._log_history("reset", "all", 0, "owner", "Inventory reset")
+            await self._save_data()
+            self._notify_listeners()
 
     def _log_history(self, action: str, item: str, quantity: int, room: str | None = None, details: str = "") -> None:
         """Log an action to history."""
@@ -864,7 +1607,7 @@ class LedniceDataCoordinator:
                 guest = previo_pins[room].get("guest")
 
         entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _local_timestamp(dt_util.now()),
             "action": action,  # add, remove, update, reset
             "item": item,
             "quantity": quantity,
@@ -873,35 +1616,288 @@ class LedniceDataCoordinator:
             "details": details
         }
 
-        # Add to history
-        if "history" not in self.data:
-            self.data["history"] = []
+        # Add to history (the ring buffer drops the oldest entry once full)
+        history = self.history
+        if len(history) == history.maxlen:
+            self._history_totals.remove(history[0])
+        history.append(entry)
+        self._history_totals.add(entry)
+        if self.history_db:
+            self.history_db.add_history(entry)
+
+        TRACE("history action=%s item=%s qty=%s room=%s guest=%s", action, item, quantity, room, guest)
+
+    @property
+    def save_delay(self) -> int:
+        """Return the write-behind coalescing window in seconds (0 = save immediately)."""
+        return self.entry.options.get(CONF_SAVE_DELAY, DEFAULT_SAVE_DELAY)
+
+    @property
+    def consumption_retention(self) -> int:
+        """Return how many consumption entries the Store keeps."""
+        return self.entry.options.get(CONF_CONSUMPTION_RETENTION, DEFAULT_CONSUMPTION_RETENTION)
+
+    @property
+    def history_retention(self) -> int:
+        """Return how many history entries the Store keeps."""
+        return self.entry.options.get(CONF_HISTORY_RETENTION, DEFAULT_HISTORY_RETENTION)
+
+    @property
+    def lean_attributes(self) -> bool:
+        """Return True if sensors should only publish compact attributes."""
+        return self.entry.options.get(CONF_LEAN_ATTRIBUTES, DEFAULT_LEAN_ATTRIBUTES)
+
+    @property
+    def previo_stats(self) -> dict[str, Any]:
+        """Return counters of applied and skipped Previo updates."""
+        return {
+            **self._previo_stats,
+            "tracked_sensors": len(self._previo_entities),
+            "reservations": len(self.data.get("previo_pins", {})),
+        }
+
+    @property
+    def persistence_stats(self) -> dict[str, Any]:
+        """Return counters describing how many disk writes were coalesced."""
+        return {
+            "save_delay": self.save_delay,
+            "save_requests": self._save_requests,
+            "disk_writes": self._disk_writes,
+            "writes_saved": self._save_requests - self._disk_writes - int(self._save_pending),
+            "save_pending": self._save_pending,
+        }
 
-        self.data["history"].append(entry)
+    @property
+    def mutation_stats(self) -> dict[str, Any]:
+        """Return counters describing contention on the mutation lock."""
+        stats = self._mutation_stats
+        return {
+            "mutations": stats["mutations"],
+            "contended": stats["contended"],
+            "queue_depth": stats["queue_depth"],
+            "max_queue_depth": stats["max_queue_depth"],
+            "wait_avg_ms": round(stats["wait_total"] / stats["mutations"] * 1000, 3) if stats["mutations"] else 0.0,
+            "wait_max_ms": round(stats["wait_max"] * 1000, 3),
+        }
 
-        # Keep only last MAX_HISTORY_ENTRIES
-        if len(self.data["history"]) > MAX_HISTORY_ENTRIES:
-            self.data["history"] = self.data["history"][-MAX_HISTORY_ENTRIES:]
+    @asynccontextmanager
+    async def _mutation(self) -> AsyncIterator[None]:
+        """Run a mutation exclusively, in call order.
+
+        Every public method that changes data (and the Previo sync) holds this
+        lock from its first check to its save and notification, so concurrent
+        kiosks, scanners and automations cannot interleave. The lock is not
+        reentrant: internal helpers called under it must not take it again.
+        Each mutation is also one traced operation.
+        """
+        stats = self._mutation_stats
+        queued = time.monotonic()
+        if self._mutation_lock.locked():
+            # Another mutation is running; queue_depth counts the callers waiting behind it
+            stats["contended"] += 1
+            stats["queue_depth"] += 1
+            stats["max_queue_depth"] = max(stats["max_queue_depth"], stats["queue_depth"])
+            try:
+                await self._mutation_lock.acquire()
+            finally:
+                stats["queue_depth"] -= 1
+        else:
+            await self._mutation_lock.acquire()
 
-        _LOGGER.debug(f"📝 History logged: {action} | {item} | qty={quantity} | room={room} | guest={guest}")
+        waited = time.monotonic() - queued
+        stats["mutations"] += 1
+        stats["wait_total"] += waited
+        stats["wait_max"] = max(stats["wait_max"], waited)
+        try:
+            async with TRACE.operation():
+                yield
+        finally:
+            self._mutation_lock.release()
 
     async def _save_data(self) -> None:
-        """Save data to storage."""
-        await self.store.async_save(self.data)
+        """Save data to storage, coalescing bursts into one write when a save delay is set."""
+        self._save_requests += 1
+
+        delay = self.save_delay
+        if delay > 0:
+            self._save_pending = True
+            self.store.async_delay_save(self._data_to_save, delay)
+            return
+
+        await self.store.async_save(self._data_to_save())
+
+    async def async_flush(self) -> None:
+        """Write a pending delayed save and queued ledger records to disk now."""
+        if self._save_pending:
+            await self.store.async_save(self._data_to_save())
+        if self._reports_save_pending:
+            await self._reports_store.async_save(self._reports_to_save())
+        await self.ledger.async_flush()
+        if self.history_db:
+            await self.history_db.async_flush()
+
+    @callback
+    def _data_to_save(self) -> dict:
+        """Return data for the Store; called once per actual disk write."""
+        self._save_pending = False
+        self._disk_writes += 1
+        return {
+            **self.data,
+            "consumption_log": list(self.consumption_log),
+            "history": list(self.history),
+        }
+
+    @callback
+    def _schedule_reports_save(self) -> None:
+        """Save the report buckets to their own Store, coalesced like the main data."""
+        self._reports_save_pending = True
+        self._reports_store.async_delay_save(self._reports_to_save, self.save_delay)
+
+    @callback
+    def _reports_to_save(self) -> dict:
+        """Return the report buckets for their Store."""
+        self._reports_save_pending = False
+        return self.reports.snapshot()
 
-    def add_listener(self, listener) -> None:
-        """Add a listener for data updates."""
-        self._listeners.append(listener)
+    def add_listener(self, listener, topics: Iterable[str] | None = None) -> None:
+        """Add a listener for data updates, optionally only for the given topics."""
+        self._listeners[listener] = frozenset(topics) if topics is not None else None
 
     def remove_listener(self, listener) -> None:
         """Remove a listener."""
-        if listener in self._listeners:
-            self._listeners.remove(listener)
+        self._listeners.pop(listener, None)
+
+    def _notify_consumption_changed(self, rooms: set[str | None]) -> None:
+        """Notify listeners after items were consumed by the given rooms."""
+        self._notify_listeners(
+            TOPIC_INVENTORY,
+            TOPIC_HISTORY,
+            TOPIC_CONSUMPTION,
+            *(consumption_topic(room) for room in rooms),
+        )
+
+    def _notify_listeners(self, *topics: str) -> None:
+        """Notify listeners subscribed to any of the changed topics (all listeners if none given)."""
+        self.revision += 1
+        changed = frozenset(topics)
+        for listener, subscribed in list(self._listeners.items()):
+            if not changed or subscribed is None or not subscribed.isdisjoint(changed):
+                listener()
+
+    async def _async_known_purchases(self) -> list[dict[str, Any]]:
+        """Return every purchase still on record, each once."""
+        # The ledger holds every purchase since it was introduced, the log and
+        # history may reach further back
+        return backfill_records([*await self.ledger.async_read(), *self.consumption_log], self.history)
+
+    def report(
+        self, start: datetime, end: datetime, room: str | None = None, item: str | None = None
+    ) -> dict[str, Any]:
+        """Return consumption and revenue totals of a period from the pre-aggregated buckets."""
+        if self.reports is None:
+            raise HomeAssistantError("Reports are not set up yet")
+        return self.reports.report(start, end, room=room, item=item)
+
+    async def async_analytics(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        top: int = DEFAULT_ANALYTICS_TOP,
+        occupied_nights: int | None = None,
+    ) -> dict[str, Any]:
+        """Return vectorized analytics over every purchase on record (needs NumPy)."""
+        async with self._analytics_lock:
+            if self._analytics is None:
+                await self._async_load_analytics()
+
+            return await self.hass.async_add_executor_job(
+                self._analytics.analyze, self._analytics.take_pending(), start, end, top, occupied_nights
+            )
+
+    async def _async_load_analytics(self) -> None:
+        """Load every purchase on record into new analytics columns.
+
+        Only the snapshot of the logs is taken under the mutation lock. From
+        then on purchases are queued in the columns, so reading the ledger and
+        merging the records do not hold up mutations.
+        """
+        # Importing NumPy blocks, so it does not run in the loop
+        columns = await self.hass.async_add_executor_job(ConsumptionColumns)
+        async with self._mutation():
+            consumption_log = list(self.consumption_log)
+            history = list(self.history)
+            self._analytics = columns
+
+        try:
+            ledger = await self.ledger.async_read()
+            # The ledger may already hold purchases queued since the snapshot;
+            # backfill_records keeps each record once
+            records = await self.hass.async_add_executor_job(
+                backfill_records, [*ledger, *consumption_log, *columns.take_pending()], history
+            )
+        except BaseException:
+            self._analytics = None
+            raise
+        columns.extend(records)
+
+    async def async_setup_reports(self, store: Store) -> None:
+        """Start the pre-aggregated reports, backfilling them from the logs on the first run.
+
+        The buckets have their own Store, so the main data stays small and is
+        not rewritten with them on every change.
+        """
+        async with self._mutation():
+            self._reports_store = store
+            state = await store.async_load()
+            # Earlier versions kept the buckets in the main Store data
+            legacy = self.data.pop("reports", None)
+            if state is None:
+                state = legacy
+            first_run = state is None
+            self.reports = ConsumptionReports(state or {})
+            if first_run:
+                records = await self._async_known_purchases()
+                for record in records:
+                    self.reports.add(record)
+                _LOGGER.info("Backfilling reports from %s purchases", len(records))
+            if first_run or legacy is not None:
+                await store.async_save(self._reports_to_save())
+            if legacy is not None:
+                _LOGGER.info("Moved report buckets to their own Store")
+                await self._save_data()
+
+    async def async_setup_statistics(self) -> None:
+        """Start importing hourly statistics, backfilling them from the logs on the first run."""
+        if "recorder" not in self.hass.config.components:
+            _LOGGER.debug("Recorder not loaded, long-term statistics disabled")
+            return
 
-    def _notify_listeners(self) -> None:
-        """Notify all listeners of data update."""
-        for listener in self._listeners:
-            listener()
+        async with self._mutation():
+            first_run = "statistics" not in self.data
+            self.statistics = ConsumptionStatistics(self.hass, self.entry, self.data.setdefault("statistics", {}))
+            if first_run:
+                records = await self._async_known_purchases()
+                for record in records:
+                    self.statistics.add(record)
+                _LOGGER.info("Backfilling long-term statistics from %s purchases", len(records))
+
+            if self.statistics.async_import_completed_hours() or first_run:
+                await self._save_data()
+
+        @callback
+        def import_statistics(now):
+            """Import the hour that just ended."""
+            self.hass.async_create_task(self._async_import_statistics(now))
+
+        self.entry.async_on_unload(
+            async_track_utc_time_change(self.hass, import_statistics, minute=0, second=5)
+        )
+
+    async def _async_import_statistics(self, now: datetime) -> None:
+        """Import completed hours and save the advanced watermarks."""
+        async with self._mutation():
+            if self.statistics.async_import_completed_hours(now):
+                await self._save_data()
 
     async def setup_previo_monitoring(self) -> None:
         """Set up monitoring of Previo sensors."""
@@ -910,27 +1906,47 @@ class LedniceDataCoordinator:
             self.data["previo_pins"] = {}
 
         # Get all Previo sensors
-        _LOGGER.info("🔍 Setting up Previo sensor monitoring...")
+        _LOGGER.debug("Setting up Previo sensor monitoring")
+
+        # Track only the Previo sensors themselves; state changes of other entities
+        # are routed away by Home Assistant and never reach this integration
+        self._async_discover_previo_entities()
 
-        # Track all sensor state changes for previo_v4 domain
         @callback
-        def previo_state_change_listener(event):
-            """Handle Previo sensor state changes."""
-            entity_id = event.data.get("entity_id")
-            new_state = event.data.get("new_state")
+        def previo_registry_filter(event_or_data) -> bool:
+            """Only pass registry events that add or rename a Previo sensor."""
+            # Home Assistant passes the event data (2024.4+) or the whole event (older)
+            data = getattr(event_or_data, "data", event_or_data)
+            return (
+                data.get("action") in ("create", "update")
+                and data.get("entity_id", "").startswith(PREVIO_ENTITY_PREFIX)
+            )
 
-            if not entity_id or not new_state:
-                return
+        @callback
+        def previo_registry_listener(event):
+            """Start tracking a Previo sensor added to the entity registry."""
+            self._async_track_previo_entities([event.data["entity_id"]])
 
-            # Only process previo_v4 sensors
-            if not entity_id.startswith(f"sensor.{PREVIO_DOMAIN}"):
-                return
+        self._previo_listeners.append(
+            self.hass.bus.async_listen(
+                er.EVENT_ENTITY_REGISTRY_UPDATED,
+                previo_registry_listener,
+                event_filter=previo_registry_filter,
+            )
+        )
 
-            self.hass.async_create_task(self._handle_previo_state_change(entity_id, new_state))
+        # Index PINs published by the previo_used_pins_simple_X helpers and keep them in sync
+        input_text_entities = [f"{PREVIO_INPUT_TEXT_PREFIX}{room_num}" for room_num in range(1, 11)]
+        for entity_id in input_text_entities:
+            self._index_input_text_pin(entity_id, self.hass.states.get(entity_id))
+
+        @callback
+        def input_text_pin_listener(event):
+            """Handle previo_used_pins_simple_X helper changes."""
+            self._index_input_text_pin(event.data["entity_id"], event.data.get("new_state"))
 
-        # Subscribe to all state changes
         self._previo_listeners.append(
-            self.hass.bus.async_listen("state_changed", previo_state_change_listener)
+            async_track_state_change_event(self.hass, input_text_entities, input_text_pin_listener)
         )
 
         # Initial extraction from all current Previo sensors
@@ -940,6 +1956,8 @@ class LedniceDataCoordinator:
         @callback
         def cleanup_expired_pins(now):
             """Periodic cleanup of expired PINs."""
+            # Also pick up Previo sensors that exist only as states (not in the registry)
+            self._async_discover_previo_entities()
             self.hass.async_create_task(self._cleanup_expired_previo_pins())
 
         self._previo_listeners.append(
@@ -953,94 +1971,198 @@ class LedniceDataCoordinator:
         # Run initial cleanup
         await self._cleanup_expired_previo_pins()
 
-        _LOGGER.info("✅ Previo sensor monitoring set up successfully")
+        # Room sensors show the guest of the stay that has begun; refresh them at each check-in
+        self._async_schedule_checkin()
+        self._previo_listeners.append(self._async_cancel_checkin)
+
+        _LOGGER.debug("Previo sensor monitoring set up")
+
+    @callback
+    def _async_schedule_checkin(self) -> None:
+        """(Re)arm the timer for the earliest check-in of the stored reservations still ahead."""
+        self._async_cancel_checkin()
+        current_ts = time.time()
+        upcoming = [
+            reservation["checkin_ts"]
+            for reservation in self.data.get("previo_pins", {}).values()
+            if (reservation.get("checkin_ts") or 0) > current_ts
+        ]
+        if upcoming:
+            self._checkin_timer = async_track_point_in_utc_time(
+                self.hass, self._async_checkin_reached, dt_util.utc_from_timestamp(min(upcoming))
+            )
+
+    @callback
+    def _async_cancel_checkin(self) -> None:
+        """Cancel the pending check-in timer."""
+        if self._checkin_timer is not None:
+            self._checkin_timer()
+            self._checkin_timer = None
+
+    @callback
+    def _async_checkin_reached(self, now: datetime) -> None:
+        """Notify Previo listeners that a stay has begun, then wait for the next one."""
+        self._checkin_timer = None
+        self._notify_listeners(TOPIC_PREVIO)
+        self._async_schedule_checkin()
+
+    @callback
+    def _async_discover_previo_entities(self) -> None:
+        """Find Previo sensors among current states and registry entries and track them."""
+        entity_ids = {
+            entity_id
+            for entity_id in self.hass.states.async_entity_ids("sensor")
+            if entity_id.startswith(PREVIO_ENTITY_PREFIX)
+        }
+        entity_ids.update(
+            registry_entry.entity_id
+            for registry_entry in er.async_get(self.hass).entities.values()
+            if registry_entry.entity_id.startswith(PREVIO_ENTITY_PREFIX)
+        )
+        self._async_track_previo_entities(entity_ids)
+
+    @callback
+    def _async_track_previo_entities(self, entity_ids: Iterable[str]) -> None:
+        """Start tracking state changes of Previo sensors not tracked yet."""
+        new_entities = set(entity_ids) - self._previo_entities
+        if not new_entities:
+            return
+
+        self._previo_entities |= new_entities
+        _LOGGER.debug("Tracking %s new Previo sensor(s): %s", len(new_entities), new_entities)
+        self._previo_listeners.append(
+            async_track_state_change_event(self.hass, sorted(new_entities), self._async_previo_state_listener)
+        )
+
+    @callback
+    def _async_previo_state_listener(self, event) -> None:
+        """Handle Previo sensor state changes."""
+        new_state = event.data.get("new_state")
+        if new_state is None:
+            return
+
+        self.hass.async_create_task(self._handle_previo_state_change(event.data["entity_id"], new_state))
 
     async def _handle_previo_state_change(self, entity_id: str, new_state: State) -> None:
         """Handle a Previo sensor state change."""
         if new_state is None or new_state.state in ["unavailable", "unknown"]:
             return
 
+        # Attribute flickers that don't touch the reservation fields need no work at all
+        if not self._update_previo_sensor_fingerprint(entity_id, new_state):
+            self._previo_stats["sensor_updates_skipped"] += 1
+            return
+
         # Extract PIN from this sensor
         await self._extract_previo_pins_from_sensor(entity_id, new_state)
 
-    async def _extract_all_previo_pins(self) -> None:
-        """Extract PINs from all current Previo sensors."""
-        _LOGGER.warning("🔍 Extracting PINs from all Previo sensors...")
-        _LOGGER.warning(f"🔍 Looking for sensors starting with: sensor.{PREVIO_DOMAIN}")
+    def _update_previo_sensor_fingerprint(self, entity_id: str, state: State) -> bool:
+        """Remember the reservation fields of a Previo sensor, returning False if they are unchanged."""
+        fingerprint = repr(tuple(state.attributes.get(attr) for attr in PREVIO_FINGERPRINT_ATTRS))
+        if self._previo_sensor_fingerprints.get(entity_id) == fingerprint:
+            return False
 
-        # Get all sensor entities
-        all_sensors = self.hass.states.async_all("sensor")
-        _LOGGER.warning(f"🔍 Total sensors in system: {len(list(all_sensors))}")
+        self._previo_sensor_fingerprints[entity_id] = fingerprint
+        return True
+
+    async def _extract_all_previo_pins(self) -> None:
+        """Extract PINs from all current Previo sensors with a single save."""
+        async with self._mutation():
+            previo_states = [
+                state for state in self.hass.states.async_all("sensor")
+                if state.entity_id.startswith(PREVIO_ENTITY_PREFIX)
+            ]
 
-        previo_sensors = []
-        for state in self.hass.states.async_all("sensor"):
-            if state.entity_id.startswith(f"sensor.{PREVIO_DOMAIN}"):
-                previo_sensors.append(state.entity_id)
-                _LOGGER.warning(f"🔍 Found Previo sensor: {state.entity_id}")
-                await self._extract_previo_pins_from_sensor(state.entity_id, state)
+            if not previo_states:
+                _LOGGER.debug("No Previo sensors found (looking for %s_*)", PREVIO_ENTITY_PREFIX)
 
-        if not previo_sensors:
-            _LOGGER.warning(f"⚠️ No Previo sensors found! Looking for: sensor.{PREVIO_DOMAIN}_*")
-            # Show first 20 sensor names for debugging
-            sample_sensors = [s.entity_id for s in list(self.hass.states.async_all("sensor"))[:20]]
-            _LOGGER.warning(f"🔍 Sample of available sensors: {sample_sensors}")
+            reservations = {}
+            for state in previo_states:
+                self._update_previo_sensor_fingerprint(state.entity_id, state)
+                reservations.update(self._parse_previo_reservations(state.entity_id, state))
 
-        await self._save_data()
-        self._notify_listeners()
+            changed = self._apply_previo_reservations(reservations)
+            if changed:
+                await self._save_data()
+                self._notify_listeners(TOPIC_PREVIO)
+                self._async_schedule_checkin()
 
-        _LOGGER.warning(f"✅ Previo PIN extraction complete. Found {len(previo_sensors)} Previo sensors, {len(self.data.get('previo_pins', {}))} active reservations")
+            _LOGGER.debug(
+                "Previo PIN extraction complete: %s sensors, %s changed, %s active reservations",
+                len(previo_states), changed, len(self.data.get("previo_pins", {}))
+            )
 
     async def _extract_previo_pins_from_sensor(self, entity_id: str, state: State) -> None:
         """Extract PINs from a single Previo sensor."""
-        _LOGGER.warning(f"🔍 Processing Previo sensor: {entity_id}")
+        async with self._mutation():
+            if self._apply_previo_reservations(self._parse_previo_reservations(entity_id, state)):
+                await self._save_data()
+                self._notify_listeners(TOPIC_PREVIO)
+                self._async_schedule_checkin()
+
+    def _apply_previo_reservations(self, reservations: dict[str, dict]) -> int:
+        """Store reservations that are new or differ from the stored ones, returning how many changed."""
+        previo_pins = self.data.setdefault("previo_pins", {})
+        changed = 0
+
+        for room_key, reservation in reservations.items():
+            fingerprint = _reservation_fingerprint(reservation)
+            if room_key in previo_pins and self._previo_fingerprints.get(room_key) == fingerprint:
+                self._previo_stats["reservations_skipped"] += 1
+                continue
 
-        if not state or not state.attributes:
-            _LOGGER.warning(f"⚠️ Sensor {entity_id} has no state or attributes")
-            return
+            previo_pins[room_key] = reservation
+            self._previo_fingerprints[room_key] = fingerprint
+            self._index_previo_pin(room_key, reservation)
+            self._previo_stats["reservations_applied"] += 1
+            changed += 1
+
+            TRACE(
+                "previo_store key=%s guest=%s checkin=%s checkout=%s",
+                room_key, reservation["guest"], reservation["checkin"], reservation["checkout"]
+            )
+
+        return changed
 
-        # Show all attributes for debugging
-        _LOGGER.warning(f"🔍 Sensor {entity_id} attributes: {dict(state.attributes)}")
+    def _parse_previo_reservations(self, entity_id: str, state: State) -> dict[str, dict]:
+        """Parse the reservations (one per room) published by a Previo sensor, keyed room{X}_{PIN}."""
+        TRACE("previo_parse entity=%s", entity_id)
+        reservations = {}
+
+        if not state or not state.attributes:
+            _LOGGER.debug("Previo sensor %s has no state or attributes", entity_id)
+            return reservations
 
         # Get room attribute
         room_attr = state.attributes.get(PREVIO_ATTR_ROOM)
-        _LOGGER.warning(f"🔍 Room attribute: {room_attr}")
         if not room_attr:
-            _LOGGER.warning(f"⚠️ Sensor {entity_id} missing '{PREVIO_ATTR_ROOM}' attribute")
-            return
+            _LOGGER.debug("Previo sensor %s missing '%s' attribute", entity_id, PREVIO_ATTR_ROOM)
+            return reservations
 
         # Parse room number(s) - can be string like "1" or "1, 2" for multiple rooms
         room_str = str(room_attr)
         room_numbers = [r.strip() for r in room_str.split(",")]
-        _LOGGER.warning(f"🔍 Parsed room numbers: {room_numbers}")
 
         # Get card_keys attribute
         card_keys = state.attributes.get(PREVIO_ATTR_CARD_KEYS)
-        _LOGGER.warning(f"🔍 card_keys attribute: {card_keys}")
 
         if not card_keys or not isinstance(card_keys, list):
             # Try single card_key as fallback
             single_key = state.attributes.get("card_key")
-            _LOGGER.warning(f"🔍 Trying fallback card_key attribute: {single_key}")
             if single_key:
                 card_keys = [single_key]
             else:
-                _LOGGER.warning(f"⚠️ Sensor {entity_id} missing both 'card_keys' and 'card_key' attributes")
-                return
-
-        _LOGGER.warning(f"🔍 Final card_keys to use: {card_keys}")
+                _LOGGER.debug("Previo sensor %s missing both 'card_keys' and 'card_key' attributes", entity_id)
+                return reservations
 
         # Get checkin/checkout dates (could be string or datetime object)
         checkin_raw = state.attributes.get(PREVIO_ATTR_CHECKIN)
         checkout_raw = state.attributes.get(PREVIO_ATTR_CHECKOUT)
         guest = state.attributes.get(PREVIO_ATTR_GUEST, "Unknown")
 
-        _LOGGER.warning(f"🔍 Checkin (raw): {checkin_raw} (type: {type(checkin_raw)})")
-        _LOGGER.warning(f"🔍 Checkout (raw): {checkout_raw} (type: {type(checkout_raw)})")
-        _LOGGER.warning(f"🔍 Guest: {guest}")
-
         if not checkin_raw or not checkout_raw:
-            _LOGGER.warning(f"⚠️ Previo sensor {entity_id} missing checkin/checkout dates")
-            return
+            _LOGGER.debug("Previo sensor %s missing checkin/checkout dates", entity_id)
+            return reservations
 
         # Convert to ISO string if datetime object (for consistent storage)
         if isinstance(checkin_raw, datetime):
@@ -1053,7 +2175,9 @@ class LedniceDataCoordinator:
         else:
             checkout = str(checkout_raw) if checkout_raw else None
 
-        _LOGGER.warning(f"🔍 Converted - Checkin: {checkin}, Checkout: {checkout}")
+        # Parse the stay bounds once here so PIN checks and cleanup only compare numbers
+        checkin_ts = self._parse_timestamp(checkin_raw)
+        checkout_ts = self._parse_timestamp(checkout_raw)
 
         # Map each room number (1-10) to corresponding PIN from card_keys
         for i, room_num in enumerate(room_numbers):
@@ -1061,80 +2185,69 @@ class LedniceDataCoordinator:
                 # Validate room number is 1-10
                 room_int = int(room_num)
                 if not 1 <= room_int <= 10:
-                    _LOGGER.warning(f"Previo sensor {entity_id} has invalid room number: {room_num}")
+                    _LOGGER.debug("Previo sensor %s has invalid room number: %s", entity_id, room_num)
                     continue
 
                 # Get corresponding PIN (if exists)
-                _LOGGER.warning(f"🔍 Processing room {room_num} (index {i})")
                 if i < len(card_keys):
                     pin = str(card_keys[i]).strip()
-                    _LOGGER.warning(f"🔍 Extracted PIN for room {room_num}: '{pin}'")
                     if not pin:
-                        _LOGGER.warning(f"⚠️ PIN is empty for room {room_num}")
+                        _LOGGER.debug("Previo sensor %s has an empty PIN for room %s", entity_id, room_num)
                         continue
 
-                    # Store in previo_pins with combined key room_PIN to support multiple reservations per room
+                    # Key by combined room_PIN to support multiple reservations per room
                     room_key = f"room{room_int}_{pin}"
-                    self.data["previo_pins"][room_key] = {
+                    reservations[room_key] = {
                         "room": f"room{room_int}",
                         "pin": pin,
                         "checkin": checkin,
                         "checkout": checkout,
+                        "checkin_ts": checkin_ts,
+                        "checkout_ts": checkout_ts,
                         "guest": guest,
                         "sensor": entity_id
                     }
-
-                    _LOGGER.warning(
-                        f"✅ Previo PIN STORED: {room_key} -> PIN={pin}, "
-                        f"guest={guest}, valid {checkin} to {checkout}"
-                    )
                 else:
-                    _LOGGER.warning(f"⚠️ No card_key available for room {room_num} at index {i}")
+                    _LOGGER.debug("Previo sensor %s has no card_key for room %s at index %s", entity_id, room_num, i)
 
             except (ValueError, IndexError) as err:
-                _LOGGER.error(f"Error processing room {room_num} from {entity_id}: {err}")
+                _LOGGER.error("Error processing room %s from %s: %s", room_num, entity_id, err)
 
-        # Save and notify after processing
-        await self._save_data()
-        self._notify_listeners()
+        return reservations
 
     async def _cleanup_expired_previo_pins(self) -> None:
         """Remove Previo PINs that are expired (1 hour after checkout)."""
-        if "previo_pins" not in self.data:
-            return
-
-        current_time = datetime.now()
-        expired_rooms = []
-
-        for room, pin_data in self.data["previo_pins"].items():
-            checkout_str = pin_data.get("checkout")
-            if not checkout_str:
-                continue
+        async with self._mutation():
+            if "previo_pins" not in self.data:
+                return
 
-            # Parse checkout datetime
-            checkout_dt = self._parse_date(checkout_str)
+            current_ts = time.time()
+            expired_rooms = []
 
-            if not checkout_dt:
-                _LOGGER.warning(f"Could not parse checkout date for {room}: {checkout_str}")
-                continue
+            for room, pin_data in self.data["previo_pins"].items():
+                checkout_ts = pin_data.get("checkout_ts")
+                if checkout_ts is None:
+                    _LOGGER.debug("Could not parse checkout date for %s: %s", room, pin_data.get("checkout"))
+                    continue
 
-            # Check if more than 1 hour past checkout
-            time_since_checkout = current_time - checkout_dt
-            if time_since_checkout > timedelta(hours=1):
-                expired_rooms.append(room)
-                _LOGGER.info(
-                    f"🗑️ Removing expired Previo PIN: {room} | "
-                    f"guest={pin_data.get('guest')} | "
-                    f"checkout={checkout_str} | "
-                    f"expired {time_since_checkout.total_seconds() / 3600:.1f}h ago"
-                )
+                # Check if more than 1 hour past checkout
+                seconds_since_checkout = current_ts - checkout_ts
+                if seconds_since_checkout > PREVIO_PIN_EXPIRY_SECONDS:
+                    expired_rooms.append(room)
+                    _LOGGER.info(
+                        "Removing expired Previo PIN: %s | guest=%s | checkout=%s | expired %.1fh ago",
+                        room, pin_data.get("guest"), pin_data.get("checkout"), seconds_since_checkout / 3600
+                    )
 
-        # Remove expired PINs
-        if expired_rooms:
-            for room in expired_rooms:
-                del self.data["previo_pins"][room]
+            # Remove expired PINs
+            if expired_rooms:
+                for room in expired_rooms:
+                    del self.data["previo_pins"][room]
+                    self._previo_fingerprints.pop(room, None)
+                    self._pin_index.remove(PIN_SOURCE_PREVIO, room)
 
-            await self._save_data()
-            self._notify_listeners()
+                await self._save_data()
+                self._notify_listeners(TOPIC_PREVIO)
+                self._async_schedule_checkin()
 
-            _LOGGER.info(f"✅ Cleaned up {len(expired_rooms)} expired Previo PIN(s)")
+                _LOGGER.info("Cleaned up %s expired Previo PIN(s)", len(expired_rooms))
@@ -0,0 +1,181 @@
+"""Running consumption and history aggregates for Lednice."""
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Iterable
+
+# Number of most recent consumption entries kept per room
+RECENT_ITEMS_PER_ROOM = 20
+
+
+class RoomConsumption:
+    """Running totals for a single room."""
+
+    __slots__ = ("quantity", "revenue", "count", "items", "recent")
+
+    def __init__(self) -> None:
+        """Initialize empty totals."""
+        self.quantity = 0
+        self.revenue = 0.0
+        self.count = 0
+        # item -> {quantity, unit_price (of the newest entry), total_price}
+        self.items: dict[str, dict[str, Any]] = {}
+        self.recent: deque[dict] = deque(maxlen=RECENT_ITEMS_PER_ROOM)
+
+
+class ConsumptionAggregates:
+    """Per-room and per-item totals kept in sync with the consumption log.
+
+    The coordinator calls add() for every appended log entry, remove() for every
+    entry trimmed from the front of the log and clear_room() when a room is
+    settled, so readers never have to rescan the log.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty aggregates."""
+        self.rooms: dict[str | None, RoomConsumption] = {}
+        self.item_totals: dict[str, int] = {}
+        self.total_quantity = 0
+        self.total_revenue = 0.0
+
+    def rebuild(self, consumption_log: list[dict]) -> None:
+        """Recompute all totals from the full consumption log."""
+        self.clear()
+        for entry in consumption_log:
+            self.add(entry)
+
+    def clear(self) -> None:
+        """Drop all totals."""
+        self.rooms.clear()
+        self.item_totals.clear()
+        self.total_quantity = 0
+        self.total_revenue = 0.0
+
+    def add(self, entry: dict) -> None:
+        """Account for a newly appended log entry."""
+        room = entry.get("room", "Unknown")
+        item = entry.get("item", "Unknown")
+        quantity = entry.get("quantity", 1)
+        price = entry.get("price", 0.0)
+        cost = price * quantity
+
+        totals = self.rooms.get(room)
+        if totals is None:
+            totals = self.rooms[room] = RoomConsumption()
+
+        totals.quantity += quantity
+        totals.revenue += cost
+        totals.count += 1
+        totals.recent.append(entry)
+
+        item_totals = totals.items.get(item)
+        if item_totals is None:
+            item_totals = totals.items[item] = {"quantity": 0, "unit_price": price, "total_price": 0.0}
+        # Only the oldest entries are ever removed, so the newest price stays valid and
+        # matches a rebuild from the remaining log
+        item_totals["unit_price"] = price
+        item_totals["quantity"] += quantity
+        item_totals["total_price"] += cost
+
+        self.item_totals[item] = self.item_totals.get(item, 0) + quantity
+        self.total_quantity += quantity
+        self.total_revenue += cost
+
+    def remove(self, entry: dict) -> None:
+        """Account for the oldest log entry being trimmed from the log."""
+        room = entry.get("room", "Unknown")
+        item = entry.get("item", "Unknown")
+        quantity = entry.get("quantity", 1)
+        cost = entry.get("price", 0.0) * quantity
+
+        totals = self.rooms.get(room)
+        if totals is not None:
+            totals.count -= 1
+            if totals.count <= 0:
+                del self.rooms[room]
+            else:
+                totals.quantity -= quantity
+                totals.revenue -= cost
+                item_totals = totals.items.get(item)
+                if item_totals is not None:
+                    item_totals["quantity"] -= quantity
+                    item_totals["total_price"] -= cost
+                    if item_totals["quantity"] <= 0:
+                        del totals.items[item]
+                # The oldest entry of a room can only be in its ring if the ring holds all of them
+                if totals.recent and totals.recent[0] is entry:
+                    totals.recent.popleft()
+
+        self._subtract_item(item, quantity)
+        self.total_quantity -= quantity
+        self.total_revenue -= cost
+        self._reset_if_empty()
+
+    def clear_room(self, room: str | None) -> None:
+        """Drop all totals of a settled room."""
+        totals = self.rooms.pop(room, None)
+        if totals is None:
+            return
+
+        for item, item_totals in totals.items.items():
+            self._subtract_item(item, item_totals["quantity"])
+        self.total_quantity -= totals.quantity
+        self.total_revenue -= totals.revenue
+        self._reset_if_empty()
+
+    def _reset_if_empty(self) -> None:
+        """Snap totals back to exact zero once no consumption is left (no float drift)."""
+        if not self.rooms:
+            self.clear()
+
+    def _subtract_item(self, item: str, quantity: int) -> None:
+        """Subtract quantity from the global per-item counter."""
+        remaining = self.item_totals.get(item, 0) - quantity
+        if remaining > 0:
+            self.item_totals[item] = remaining
+        else:
+            self.item_totals.pop(item, None)
+
+
+class HistoryAggregates:
+    """Added and removed quantities and action counts kept in sync with the history ring.
+
+    The coordinator calls add() for every appended history entry and remove()
+    for the entry the full ring drops, so the history sensor never rescans it.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty aggregates."""
+        self.total_added = 0
+        self.total_removed = 0
+        self.action_counts: dict[str, int] = {}
+
+    def rebuild(self, history: Iterable[dict]) -> None:
+        """Recompute all totals from the full history."""
+        self.total_added = 0
+        self.total_removed = 0
+        self.action_counts.clear()
+        for entry in history:
+            self.add(entry)
+
+    def add(self, entry: dict) -> None:
+        """Account for a newly appended history entry."""
+        self._count(entry, 1)
+
+    def remove(self, entry: dict) -> None:
+        """Account for the oldest history entry being dropped."""
+        self._count(entry, -1)
+
+    def _count(self, entry: dict, sign: int) -> None:
+        """Add (sign 1) or subtract (sign -1) an entry."""
+        action = entry.get("action", "unknown")
+        if action == "add":
+            self.total_added += sign * entry.get("quantity", 0)
+        elif action == "remove":
+            self.total_removed += sign * entry.get("quantity", 0)
+
+        count = self.action_counts.get(action, 0) + sign
+        if count > 0:
+            self.action_counts[action] = count
+        else:
+            self.action_counts.pop(action, None)
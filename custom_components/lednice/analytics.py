@@ -0,0 +1,214 @@
+"""Vectorized consumption analytics for Lednice (needs NumPy)."""
+from __future__ import annotations
+
+import time
+from datetime import datetime
+from typing import Any, Iterable
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from .reporting import UNKNOWN_ROOM
+
+# A guest night runs from noon to noon, so a late-night beer counts towards the evening before
+NIGHT_START_HOUR = 12
+SPEND_PERCENTILES = {"p25": 25, "median": 50, "p75": 75, "p90": 90}
+
+
+def _numpy():
+    """Import NumPy on first use; analytics are optional and the integration runs without it."""
+    try:
+        import numpy
+    except ImportError as err:
+        raise HomeAssistantError("Analytics need NumPy, which is not installed") from err
+    return numpy
+
+
+def _local_naive(value: datetime) -> datetime:
+    """Return a datetime as naive local time, the time base of the purchase columns."""
+    if value.tzinfo is not None:
+        value = dt_util.as_local(value).replace(tzinfo=None)
+    return value
+
+
+class ConsumptionColumns:
+    """Purchases as a NumPy structured array with interned room and item ids.
+
+    Each row holds the naive local purchase time (datetime64[s]), the room and
+    item ids, the quantity and the revenue. New purchases are queued with
+    extend() on the event loop and converted in bulk by the next analyze(),
+    which runs in the executor; the coordinator serializes analyze() calls.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty columns."""
+        np = _numpy()
+        self._np = np
+        self.dtype = np.dtype([
+            ("time", "datetime64[s]"),
+            ("room", np.uint16),
+            ("item", np.uint32),
+            ("quantity", np.int32),
+            ("revenue", np.float64),
+        ])
+        self.data = np.empty(0, dtype=self.dtype)
+        self.rooms: list[str] = []
+        self.items: list[str] = []
+        self._room_ids: dict[str, int] = {}
+        self._item_ids: dict[str, int] = {}
+        self._pending: list[dict[str, Any]] = []
+
+    def extend(self, records: Iterable[dict[str, Any]]) -> None:
+        """Queue purchases for conversion."""
+        self._pending.extend(records)
+
+    def take_pending(self) -> list[dict[str, Any]]:
+        """Return and clear the queued purchases (event loop)."""
+        records, self._pending = self._pending, []
+        return records
+
+    def _intern(self, name: str, ids: dict[str, int], names: list[str]) -> int:
+        """Return the id of a room or item name, assigning the next one to a new name."""
+        index = ids.get(name)
+        if index is None:
+            index = ids[name] = len(names)
+            names.append(name)
+        return index
+
+    def append(self, records: list[dict[str, Any]]) -> None:
+        """Convert purchases into rows and append them (executor)."""
+        if not records:
+            return
+
+        np = self._np
+        times, rooms, items, quantities, revenues = [], [], [], [], []
+        for record in records:
+            quantity = record.get("quantity", 1)
+            # Log timestamps are naive local ISO strings; seconds are enough
+            times.append(str(record.get("timestamp") or "NaT")[:19])
+            rooms.append(self._intern(record.get("room") or UNKNOWN_ROOM, self._room_ids, self.rooms))
+            items.append(self._intern(record.get("item", "Unknown"), self._item_ids, self.items))
+            quantities.append(quantity)
+            revenues.append(record.get("price", 0.0) * quantity)
+
+        rows = np.empty(len(records), dtype=self.dtype)
+        try:
+            # Parsed in C for the whole batch
+            rows["time"] = np.array(times, dtype="datetime64[s]")
+        except ValueError:
+            rows["time"] = [self._datetime64(value) for value in times]
+        rows["room"] = rooms
+        rows["item"] = items
+        rows["quantity"] = quantities
+        rows["revenue"] = revenues
+        self.data = np.concatenate([self.data, rows[~np.isnat(rows["time"])]])
+
+    def _datetime64(self, value: str):
+        """Return a timestamp as datetime64, or NaT if it cannot be parsed."""
+        try:
+            return self._np.datetime64(value, "s")
+        except ValueError:
+            return self._np.datetime64("NaT", "s")
+
+    def analyze(
+        self,
+        records: list[dict[str, Any]],
+        start: datetime | None = None,
+        end: datetime | None = None,
+        top: int = 10,
+        occupied_nights: int | None = None,
+    ) -> dict[str, Any]:
+        """Append queued purchases and return the analysis of [start, end) (executor)."""
+        started = time.perf_counter()
+        self.append(records)
+        np = self._np
+
+        data = self.data
+        if start is not None:
+            data = data[data["time"] >= np.datetime64(_local_naive(start), "s")]
+        if end is not None:
+            data = data[data["time"] < np.datetime64(_local_naive(end), "s")]
+
+        quantity = data["quantity"]
+        revenue = data["revenue"]
+        item_ids = data["item"]
+        room_ids = data["room"]
+        result: dict[str, Any] = {
+            "purchases": int(len(data)),
+            "start": str(data["time"].min()) if len(data) else None,
+            "end": str(data["time"].max()) if len(data) else None,
+            "total_quantity": int(quantity.sum()),
+            "total_revenue": round(float(revenue.sum()), 2),
+        }
+
+        # Top sellers by quantity and by revenue
+        item_quantity = np.bincount(item_ids, weights=quantity, minlength=len(self.items))
+        item_revenue = np.bincount(item_ids, weights=revenue, minlength=len(self.items))
+        result["top_sellers"] = self._ranked(
+            np.argsort(-item_quantity, kind="stable")[:top], item_quantity, item_revenue
+        )
+        result["top_revenue"] = self._ranked(
+            np.argsort(-item_revenue, kind="stable")[:top], item_quantity, item_revenue
+        )
+
+        # Hour-of-day histogram; times are naive local seconds, so hours wrap every 24
+        hours = data["time"].astype("datetime64[h]").astype(np.int64) % 24
+        result["hour_of_day"] = {
+            "quantity": np.bincount(hours, weights=quantity, minlength=24).astype(np.int64).tolist(),
+            "revenue": np.round(np.bincount(hours, weights=revenue, minlength=24), 2).tolist(),
+        }
+
+        # Spend per room and night: one group per (room, night) pair with purchases
+        nights = (data["time"] - np.timedelta64(NIGHT_START_HOUR, "h")).astype("datetime64[D]").astype(np.int64)
+        room_nights, group = np.unique(
+            room_ids.astype(np.int64) * (1 << 32) + (nights - (nights.min() if len(nights) else 0)),
+            return_inverse=True,
+        )
+        night_spend = np.bincount(group.reshape(-1), weights=revenue, minlength=len(room_nights))
+        night_rooms = room_nights >> 32
+
+        rooms = {}
+        for room_id in np.unique(night_rooms):
+            spend = night_spend[night_rooms == room_id]
+            in_room = room_ids == room_id
+            rooms[self.rooms[int(room_id)]] = {
+                "quantity": int(quantity[in_room].sum()),
+                "revenue": round(float(revenue[in_room].sum()), 2),
+                "nights": int(len(spend)),
+                "spend_per_night": {
+                    "mean": round(float(spend.mean()), 2),
+                    "min": round(float(spend.min()), 2),
+                    **{
+                        name: round(float(value), 2)
+                        for name, value in zip(
+                            SPEND_PERCENTILES, np.percentile(spend, list(SPEND_PERCENTILES.values()))
+                        )
+                    },
+                    "max": round(float(spend.max()), 2),
+                },
+            }
+        result["rooms"] = dict(sorted(rooms.items(), key=lambda pair: -pair[1]["revenue"]))
+
+        if occupied_nights:
+            result["occupied_nights"] = occupied_nights
+            result["occupied_nights_source"] = "input"
+        else:
+            result["occupied_nights"] = int(len(room_nights))
+            result["occupied_nights_source"] = "purchases"
+        result["revenue_per_occupied_night"] = (
+            round(result["total_revenue"] / result["occupied_nights"], 2) if result["occupied_nights"] else 0.0
+        )
+        result["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    def _ranked(self, order, item_quantity, item_revenue) -> list[dict[str, Any]]:
+        """Return items in the given order with their totals, skipping items without sales."""
+        return [
+            {
+                "item": self.items[int(index)],
+                "quantity": int(item_quantity[index]),
+                "revenue": round(float(item_revenue[index]), 2),
+            }
+            for index in order
+            if item_quantity[index] or item_revenue[index]
+        ]
@@ -0,0 +1,69 @@
+"""Barcode lookup index for Lednice."""
+from __future__ import annotations
+
+BARCODE_KIND_ITEM = "item"
+BARCODE_KIND_PRODUCT = "product"
+
+
+class BarcodeIndex:
+    """Maintained barcode -> inventory item / product code index.
+
+    Every inventory item and product code owns at most one barcode, so
+    re-registering an owner replaces its previous barcode. Owners sharing a
+    barcode are kept in registration order and lookups return the first one,
+    matching the order the old linear scan found them in.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._owners: dict[str, dict[str, list[str]]] = {
+            BARCODE_KIND_ITEM: {},
+            BARCODE_KIND_PRODUCT: {},
+        }
+        self._barcodes: dict[tuple[str, str], str] = {}
+
+    def __len__(self) -> int:
+        """Return number of registered barcodes."""
+        return len(self._barcodes)
+
+    def clear(self, kind: str | None = None) -> None:
+        """Drop all registrations, or only those of one kind."""
+        if kind is None:
+            for owners in self._owners.values():
+                owners.clear()
+            self._barcodes.clear()
+            return
+
+        self._owners[kind].clear()
+        self._barcodes = {key: barcode for key, barcode in self._barcodes.items() if key[0] != kind}
+
+    def set(self, kind: str, owner: str, barcode: str | None) -> list[str]:
+        """Register the barcode of an owner (empty removes it).
+
+        Returns the other owners of the same kind already using the barcode.
+        """
+        self.remove(kind, owner)
+        if not barcode:
+            return []
+
+        owners = self._owners[kind].setdefault(barcode, [])
+        collisions = list(owners)
+        owners.append(owner)
+        self._barcodes[(kind, owner)] = barcode
+        return collisions
+
+    def remove(self, kind: str, owner: str) -> None:
+        """Remove the barcode registered for an owner, if any."""
+        barcode = self._barcodes.pop((kind, owner), None)
+        if barcode is None:
+            return
+
+        owners = self._owners[kind][barcode]
+        owners.remove(owner)
+        if not owners:
+            del self._owners[kind][barcode]
+
+    def lookup(self, kind: str, barcode: str) -> str | None:
+        """Return the first owner of a barcode, or None."""
+        owners = self._owners[kind].get(barcode)
+        return owners[0] if owners else None
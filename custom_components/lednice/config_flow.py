@@ -9,7 +9,22 @@ from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 import homeassistant.helpers.config_validation as cv
 
-from .const import DOMAIN, DEFAULT_ROOMS
+from .const import (
+    DOMAIN,
+    DEFAULT_ROOMS,
+    CONF_SAVE_DELAY,
+    CONF_LEAN_ATTRIBUTES,
+    CONF_HISTORY_DATABASE,
+    CONF_CONSUMPTION_RETENTION,
+    CONF_HISTORY_RETENTION,
+    DEFAULT_SAVE_DELAY,
+    DEFAULT_LEAN_ATTRIBUTES,
+    DEFAULT_HISTORY_DATABASE,
+    DEFAULT_CONSUMPTION_RETENTION,
+    DEFAULT_HISTORY_RETENTION,
+    MIN_LOG_RETENTION,
+    MAX_LOG_RETENTION,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -67,14 +82,36 @@ class LedniceOptionsFlow(config_entries.OptionsFlow):
         coordinator = self.hass.data[DOMAIN][self.config_entry.entry_id]
 
         # Build room PIN schema
-        room_pins_schema = {}
+        options_schema = {}
         for room in DEFAULT_ROOMS:
             current_pin = coordinator.room_pins.get(room, "")
-            room_pins_schema[vol.Optional(f"pin_{room}", default=current_pin)] = cv.string
+            options_schema[vol.Optional(f"pin_{room}", default=current_pin)] = cv.string
+
+        # Storage tuning
+        options_schema[vol.Optional(
+            CONF_SAVE_DELAY,
+            default=self.config_entry.options.get(CONF_SAVE_DELAY, DEFAULT_SAVE_DELAY),
+        )] = vol.All(vol.Coerce(int), vol.Range(min=0, max=60))
+        options_schema[vol.Optional(
+            CONF_LEAN_ATTRIBUTES,
+            default=self.config_entry.options.get(CONF_LEAN_ATTRIBUTES, DEFAULT_LEAN_ATTRIBUTES),
+        )] = cv.boolean
+        options_schema[vol.Optional(
+            CONF_HISTORY_DATABASE,
+            default=self.config_entry.options.get(CONF_HISTORY_DATABASE, DEFAULT_HISTORY_DATABASE),
+        )] = cv.boolean
+        options_schema[vol.Optional(
+            CONF_CONSUMPTION_RETENTION,
+            default=self.config_entry.options.get(CONF_CONSUMPTION_RETENTION, DEFAULT_CONSUMPTION_RETENTION),
+        )] = vol.All(vol.Coerce(int), vol.Range(min=MIN_LOG_RETENTION, max=MAX_LOG_RETENTION))
+        options_schema[vol.Optional(
+            CONF_HISTORY_RETENTION,
+            default=self.config_entry.options.get(CONF_HISTORY_RETENTION, DEFAULT_HISTORY_RETENTION),
+        )] = vol.All(vol.Coerce(int), vol.Range(min=MIN_LOG_RETENTION, max=MAX_LOG_RETENTION))
 
         return self.async_show_form(
             step_id="init",
-            data_schema=vol.Schema(room_pins_schema),
+            data_schema=vol.Schema(options_schema),
         )
 
     async def async_step_save(self, user_input):
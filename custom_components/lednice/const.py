@@ -7,6 +7,11 @@ NAME = "Lednice"
 CONF_ROOMS = "rooms"
 CONF_ROOM_PINS = "room_pins"
 CONF_PRODUCTS = "products"
+CONF_SAVE_DELAY = "save_delay"
+CONF_LEAN_ATTRIBUTES = "lean_attributes"
+CONF_HISTORY_DATABASE = "history_database"
+CONF_CONSUMPTION_RETENTION = "consumption_retention"
+CONF_HISTORY_RETENTION = "history_retention"
 
 # Services
 SERVICE_ADD_ITEM = "add_item"
@@ -19,6 +24,12 @@ SERVICE_REMOVE_PRODUCT_CODE = "remove_product_code"
 SERVICE_CONSUME_PRODUCTS = "consume_products"
 SERVICE_VERIFY_PIN = "verify_pin"
 SERVICE_CLEAR_ROOM_CONSUMPTION = "clear_room_consumption"
+SERVICE_QUERY = "query"
+SERVICE_SET_TRACE = "set_trace"
+SERVICE_IMPORT_INVENTORY = "import_inventory"
+SERVICE_EXPORT_INVENTORY = "export_inventory"
+SERVICE_REPORT = "report"
+SERVICE_ANALYTICS = "analytics"
 
 # Attributes
 ATTR_ITEM_NAME = "item_name"
@@ -34,22 +45,95 @@ ATTR_PRICE = "price"
 ATTR_PRODUCTS = "products"
 ATTR_TOTAL_PRICE = "total_price"
 ATTR_HISTORY = "history"
+ATTR_ATOMIC = "atomic"
+ATTR_DATASET = "dataset"
+ATTR_OFFSET = "offset"
+ATTR_LIMIT = "limit"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_ENABLED = "enabled"
+ATTR_SAMPLE_RATE = "sample_rate"
+ATTR_ITEMS = "items"
+ATTR_ENTRY_ID = "entry_id"
+ATTR_FILE = "file"
+ATTR_MODE = "mode"
+ATTR_PERIOD = "period"
+ATTR_DATE = "date"
+ATTR_TOP = "top"
+ATTR_OCCUPIED_NIGHTS = "occupied_nights"
+
+# Inventory import modes: add delivered quantity to stock, or set stock to the counted quantity
+IMPORT_MODE_ADD = "add"
+IMPORT_MODE_SET = "set"
+IMPORT_MODES = [IMPORT_MODE_ADD, IMPORT_MODE_SET]
 
 # Default values
 DEFAULT_ROOMS = ["room1", "room2", "room3", "room4", "room5", "room6", "room7", "room8", "room9", "room10"]
 DEFAULT_OWNER_PIN = "0000"
 OWNER_ROOM = "owner"
 
+DEFAULT_LEAN_ATTRIBUTES = False
+DEFAULT_HISTORY_DATABASE = False
+
+# Query service
+QUERY_INVENTORY = "inventory"
+QUERY_PRODUCTS = "products"
+QUERY_CONSUMPTION = "consumption"
+QUERY_HISTORY = "history"
+QUERY_RESERVATIONS = "reservations"
+QUERY_DATASETS = [QUERY_INVENTORY, QUERY_PRODUCTS, QUERY_CONSUMPTION, QUERY_HISTORY, QUERY_RESERVATIONS]
+DEFAULT_QUERY_LIMIT = 50
+MAX_QUERY_LIMIT = 500
+
+# Report periods and how long the pre-aggregated buckets are kept
+REPORT_PERIOD_DAY = "day"
+REPORT_PERIOD_WEEK = "week"
+REPORT_PERIOD_MONTH = "month"
+REPORT_PERIODS = [REPORT_PERIOD_DAY, REPORT_PERIOD_WEEK, REPORT_PERIOD_MONTH]
+REPORT_HOUR_RETENTION_DAYS = 14
+REPORT_DAY_RETENTION_DAYS = 400
+DEFAULT_ANALYTICS_TOP = 10
+MAX_ANALYTICS_TOP = 100
+
 # Product codes range
 MIN_PRODUCT_CODE = 1
 MAX_PRODUCT_CODE = 100
 
 # Storage
 STORAGE_KEY = "lednice_storage"
+REPORTS_STORAGE_KEY = "lednice_reports"  # Report buckets, kept out of the main Store document
 STORAGE_VERSION = 1
+DEFAULT_SAVE_DELAY = 2  # Seconds to coalesce writes before saving (0 = save immediately)
+
+# Consumption ledger (append-only purchase records under .storage)
+INVENTORY_FILE_DIR = "lednice"  # Import/export files must be inside <config>/lednice/
+LEDGER_DIR = "lednice_ledger"
+LEDGER_SEGMENT_MAX_BYTES = 1024 * 1024  # Start a new segment file after 1 MiB
+
+# Optional SQLite database with the full history and consumption (.storage/lednice_history_<entry_id>.db)
+HISTORY_DB_FILE = "lednice_history"
+
+# Log retention (entries kept in the Store ring buffers)
+DEFAULT_CONSUMPTION_RETENTION = 1000
+DEFAULT_HISTORY_RETENTION = 200
+MIN_LOG_RETENTION = 50
+MAX_LOG_RETENTION = 100000
+# Newest log entries published in sensor attributes; lednice.query pages through the rest
+SENSOR_LOG_ENTRIES = 50
+
+# Change notification topics (sensors subscribe only to what they display)
+TOPIC_INVENTORY = "inventory"
+TOPIC_CONSUMPTION = "consumption"
+TOPIC_HISTORY = "history"
+TOPIC_PREVIO = "previo"
+TOPIC_PRODUCTS = "products"
+TOPIC_PINS = "pins"
+
+
+def consumption_topic(room: str | None) -> str:
+    """Return the change topic for consumption of a single room."""
+    return f"{TOPIC_CONSUMPTION}:{room}"
 
-# History
-MAX_HISTORY_ENTRIES = 200
 
 # Previo integration
 PREVIO_DOMAIN = "previo_v4"
@@ -58,3 +142,15 @@ PREVIO_ATTR_CARD_KEYS = "card_keys"
 PREVIO_ATTR_CHECKIN = "checkin"
 PREVIO_ATTR_CHECKOUT = "checkout"
 PREVIO_ATTR_GUEST = "guest"
+# Attributes a Previo sensor reservation is derived from
+PREVIO_FINGERPRINT_ATTRS = (
+    PREVIO_ATTR_ROOM,
+    PREVIO_ATTR_CARD_KEYS,
+    "card_key",
+    PREVIO_ATTR_CHECKIN,
+    PREVIO_ATTR_CHECKOUT,
+    PREVIO_ATTR_GUEST,
+)
+PREVIO_ENTITY_PREFIX = f"sensor.{PREVIO_DOMAIN}"
+PREVIO_INPUT_TEXT_PREFIX = "input_text.previo_used_pins_simple_"
+PREVIO_PIN_EXPIRY_SECONDS = 3600  # Reservations are dropped 1 hour after checkout
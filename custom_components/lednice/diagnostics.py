@@ -0,0 +1,24 @@
+"""Diagnostics support for Lednice."""
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "persistence": coordinator.persistence_stats,
+        "mutations": coordinator.mutation_stats,
+        "previo": coordinator.previo_stats,
+        "ledger": coordinator.ledger.stats,
+        "history_database": coordinator.history_db.stats if coordinator.history_db else None,
+        "statistics": coordinator.statistics.stats if coordinator.statistics else None,
+        "reports": coordinator.reports.stats if coordinator.reports else None,
+    }
@@ -0,0 +1,208 @@
+"""SQLite store for long-term Lednice history and consumption."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sqlite3
+from typing import Any, Iterable
+
+from homeassistant.core import HomeAssistant
+
+from .const import HISTORY_DB_FILE
+
+_LOGGER = logging.getLogger(__name__)
+
+TABLE_HISTORY = "history"
+TABLE_CONSUMPTION = "consumption"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    action TEXT,
+    item TEXT,
+    quantity INTEGER,
+    room TEXT,
+    guest TEXT,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS history_timestamp ON history (timestamp);
+CREATE INDEX IF NOT EXISTS history_room ON history (room, timestamp);
+CREATE INDEX IF NOT EXISTS history_item ON history (item, timestamp);
+CREATE INDEX IF NOT EXISTS history_action ON history (action, timestamp);
+
+CREATE TABLE IF NOT EXISTS consumption (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    item TEXT,
+    quantity INTEGER,
+    room TEXT,
+    price REAL
+);
+CREATE INDEX IF NOT EXISTS consumption_timestamp ON consumption (timestamp);
+CREATE INDEX IF NOT EXISTS consumption_room ON consumption (room, timestamp);
+CREATE INDEX IF NOT EXISTS consumption_item ON consumption (item, timestamp);
+"""
+
+_COLUMNS = {
+    TABLE_HISTORY: ("timestamp", "action", "item", "quantity", "room", "guest", "details"),
+    TABLE_CONSUMPTION: ("timestamp", "item", "quantity", "room", "price"),
+}
+
+
+class HistoryDatabase:
+    """Indexed SQLite copy of history and consumption entries.
+
+    The in-memory logs stay capped for the sensors; this database keeps every
+    entry for as long as the file exists. Entries are queued on the event loop
+    and inserted by one executor job per burst; all SQLite access runs in the
+    executor, serialized by an asyncio lock.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the database wrapper (the file is opened by async_open)."""
+        self.hass = hass
+        self.path = hass.config.path(".storage", f"{HISTORY_DB_FILE}_{entry_id}.db")
+        self._conn: sqlite3.Connection | None = None
+        self._pending: list[tuple[str, dict[str, Any]]] = []
+        self._flush_scheduled = False
+        self._lock = asyncio.Lock()
+        self.rows_written = 0
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return database counters."""
+        return {
+            "path": self.path,
+            "open": self._conn is not None,
+            "rows_written": self.rows_written,
+            "rows_pending": len(self._pending),
+        }
+
+    async def async_open(self, history: Iterable[dict], consumption_log: Iterable[dict]) -> None:
+        """Open the database, seeding a new one with the entries kept in memory."""
+        async with self._lock:
+            # Services are live already; the executor must not iterate the logs while purchases append
+            await self.hass.async_add_executor_job(self._open, list(history), list(consumption_log))
+
+    async def async_close(self) -> None:
+        """Write queued entries and close the database."""
+        await self.async_flush()
+        async with self._lock:
+            if self._conn is not None:
+                await self.hass.async_add_executor_job(self._conn.close)
+                self._conn = None
+
+    def add_history(self, entry: dict[str, Any]) -> None:
+        """Queue a history entry."""
+        self._queue(TABLE_HISTORY, entry)
+
+    def add_consumption(self, entry: dict[str, Any]) -> None:
+        """Queue a consumption entry."""
+        self._queue(TABLE_CONSUMPTION, entry)
+
+    def _queue(self, table: str, entry: dict[str, Any]) -> None:
+        """Queue an entry and schedule a flush."""
+        self._pending.append((table, entry))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.hass.async_create_task(self.async_flush())
+
+    async def async_flush(self) -> None:
+        """Insert all queued entries in one transaction, after any insert already in progress."""
+        self._flush_scheduled = False
+        async with self._lock:
+            if not self._pending or self._conn is None:
+                return
+
+            rows, self._pending = self._pending, []
+            await self.hass.async_add_executor_job(self._insert, rows)
+            self.rows_written += len(rows)
+
+    async def async_query(
+        self,
+        table: str,
+        room: str | None = None,
+        item: str | None = None,
+        start: str | None = None,
+        end: str | None = None,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> tuple[int, list[dict[str, Any]]]:
+        """Return (total, page) of matching rows, newest first."""
+        await self.async_flush()
+        async with self._lock:
+            return await self.hass.async_add_executor_job(
+                self._query, table, room, item, start, end, offset, limit
+            )
+
+    def _open(self, history: list[dict], consumption_log: list[dict]) -> None:
+        """Open or create the database file (executor)."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+
+        is_new = not conn.execute("SELECT 1 FROM history LIMIT 1").fetchone() and not conn.execute(
+            "SELECT 1 FROM consumption LIMIT 1"
+        ).fetchone()
+        self._conn = conn
+
+        if is_new:
+            self._insert(
+                [(TABLE_HISTORY, entry) for entry in history]
+                + [(TABLE_CONSUMPTION, entry) for entry in consumption_log]
+            )
+            _LOGGER.info(
+                "Created history database %s with %s history and %s consumption entries",
+                self.path, len(history), len(consumption_log)
+            )
+
+    def _insert(self, rows: list[tuple[str, dict[str, Any]]]) -> None:
+        """Insert rows in a single transaction (executor)."""
+        with self._conn:
+            for table, columns in _COLUMNS.items():
+                values = [
+                    tuple(entry.get(column) for column in columns)
+                    for row_table, entry in rows if row_table == table
+                ]
+                if values:
+                    self._conn.executemany(
+                        f"INSERT INTO {table} ({', '.join(columns)}) "
+                        f"VALUES ({', '.join('?' * len(columns))})",
+                        values,
+                    )
+
+    def _query(
+        self,
+        table: str,
+        room: str | None,
+        item: str | None,
+        start: str | None,
+        end: str | None,
+        offset: int,
+        limit: int,
+    ) -> tuple[int, list[dict[str, Any]]]:
+        """Run a filtered, paged query (executor)."""
+        clauses = []
+        params: list[Any] = []
+        for clause, value in (
+            ("room = ?", room),
+            ("item = ?", item),
+            ("timestamp >= ?", start),
+            ("timestamp < ?", end),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        total = self._conn.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+        cursor = self._conn.execute(
+            f"SELECT {', '.join(_COLUMNS[table])} FROM {table}{where} "
+            "ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+            [*params, limit, offset],
+        )
+        return total, [dict(row) for row in cursor]
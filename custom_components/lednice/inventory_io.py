@@ -0,0 +1,88 @@
+"""Inventory import/export helpers for Lednice."""
+from __future__ import annotations
+
+import csv
+import json
+import os
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import INVENTORY_FILE_DIR
+
+# Columns of exported files; imports also accept "name" and "barcode"
+INVENTORY_COLUMNS = ["item_name", "quantity", "code"]
+INVENTORY_FILE_FORMATS = (".csv", ".json")
+
+
+def resolve_inventory_file(hass: HomeAssistant, file: str) -> str:
+    """Return the absolute path of an import/export file, a CSV or JSON file inside <config>/lednice/.
+
+    The file is given relative to the config dir (lednice/dodavka.csv); other
+    files of the configuration stay out of reach of the services.
+    """
+    config_dir = os.path.realpath(hass.config.config_dir)
+    file_dir = os.path.join(config_dir, INVENTORY_FILE_DIR)
+    path = os.path.realpath(os.path.join(config_dir, file))
+
+    if os.path.commonpath([file_dir, path]) != file_dir:
+        raise HomeAssistantError(f"File {file} is outside the {INVENTORY_FILE_DIR} folder of the configuration")
+    if os.path.splitext(path)[1].lower() not in INVENTORY_FILE_FORMATS:
+        raise HomeAssistantError(f"File {file} must be a .csv or .json file")
+    return path
+
+
+def read_inventory_file(path: str) -> list[dict[str, Any]]:
+    """Read inventory rows from a CSV or JSON file (executor)."""
+    try:
+        with open(path, encoding="utf-8", newline="") as inventory_file:
+            if path.lower().endswith(".json"):
+                rows = json.load(inventory_file)
+                # Accept both a plain list and an export ({"items": [...]})
+                if isinstance(rows, dict):
+                    rows = rows.get("items", [])
+                if not isinstance(rows, list):
+                    raise HomeAssistantError(f"{path} does not contain a list of items")
+                return rows
+            return list(csv.DictReader(inventory_file))
+    except (OSError, ValueError, csv.Error) as err:
+        raise HomeAssistantError(f"Cannot read {path}: {err}") from err
+
+
+def write_inventory_file(path: str, rows: list[dict[str, Any]]) -> None:
+    """Write inventory rows to a CSV or JSON file (executor)."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8", newline="") as inventory_file:
+            if path.lower().endswith(".json"):
+                json.dump({"items": rows}, inventory_file, ensure_ascii=False, indent=2)
+            else:
+                writer = csv.DictWriter(inventory_file, fieldnames=INVENTORY_COLUMNS, extrasaction="ignore")
+                writer.writeheader()
+                writer.writerows(rows)
+    except OSError as err:
+        raise HomeAssistantError(f"Cannot write {path}: {err}") from err
+
+
+def parse_inventory_row(row: Any) -> tuple[str, int, str | None]:
+    """Return (item name, quantity, code or None) of an import row, raising ValueError if it is invalid."""
+    if not isinstance(row, dict):
+        raise ValueError("not_an_object")
+
+    name = row.get("item_name", row.get("name"))
+    name = str(name).strip() if name is not None else ""
+    if not name:
+        raise ValueError("missing_item_name")
+
+    quantity = row.get("quantity", 0)
+    try:
+        quantity = int(str(quantity).strip() or 0)
+    except ValueError as err:
+        raise ValueError("invalid_quantity") from err
+    if quantity < 0:
+        raise ValueError("invalid_quantity")
+
+    code = row.get("code", row.get("barcode"))
+    code = str(code).strip() if code not in (None, "") else None
+    return name, quantity, code
@@ -0,0 +1,129 @@
+"""Append-only consumption ledger for Lednice."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import LEDGER_DIR, LEDGER_SEGMENT_MAX_BYTES
+
+_LOGGER = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".jsonl"
+
+
+class ConsumptionLedger:
+    """Every purchase appended as one JSON line to rolling segment files.
+
+    Segments live in .storage/lednice_ledger_<entry_id>/ as segment-000001.jsonl,
+    segment-000002.jsonl, ...; a new segment is started once the current one
+    exceeds LEDGER_SEGMENT_MAX_BYTES. Records are buffered and appended by a
+    single executor job per burst, so a purchase never rewrites existing data.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the ledger."""
+        self.hass = hass
+        self.path = hass.config.path(".storage", f"{LEDGER_DIR}_{entry_id}")
+        self._pending: list[dict[str, Any]] = []
+        self._flush_scheduled = False
+        self._write_lock = asyncio.Lock()
+        self._segment: int | None = None  # Current segment number, read lazily from disk
+        self._segment_size = 0
+        self.records_written = 0
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return ledger counters."""
+        return {
+            "path": self.path,
+            "segment": self._segment,
+            "records_written": self.records_written,
+            "records_pending": len(self._pending),
+        }
+
+    def append(self, record: dict[str, Any]) -> None:
+        """Queue a purchase record; it is written by the next flush."""
+        self._pending.append(record)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.hass.async_create_task(self.async_flush())
+
+    async def async_flush(self) -> None:
+        """Append all queued records to disk, after any write already in progress."""
+        self._flush_scheduled = False
+        async with self._write_lock:
+            if not self._pending:
+                return
+
+            records, self._pending = self._pending, []
+            await self.hass.async_add_executor_job(self._write, records)
+            self.records_written += len(records)
+
+    async def async_read(self) -> list[dict[str, Any]]:
+        """Return all records from all segments, oldest first."""
+        await self.async_flush()
+        async with self._write_lock:
+            return await self.hass.async_add_executor_job(self._read)
+
+    def _segment_path(self, number: int) -> str:
+        """Return the file path of a segment."""
+        return os.path.join(self.path, f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}")
+
+    def _segment_numbers(self) -> list[int]:
+        """Return the numbers of all existing segments, ascending."""
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(
+            int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+            for name in os.listdir(self.path)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def _write(self, records: list[dict[str, Any]]) -> None:
+        """Append records to the current segment, rolling over when it is full (executor)."""
+        if self._segment is None:
+            os.makedirs(self.path, exist_ok=True)
+            numbers = self._segment_numbers()
+            self._segment = numbers[-1] if numbers else 1
+            segment_path = self._segment_path(self._segment)
+            self._segment_size = os.path.getsize(segment_path) if os.path.exists(segment_path) else 0
+
+        lines = [
+            (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+            for record in records
+        ]
+
+        while lines:
+            if self._segment_size >= LEDGER_SEGMENT_MAX_BYTES:
+                self._segment += 1
+                self._segment_size = 0
+
+            # Take as many lines as fit into the current segment (at least one)
+            batch = []
+            size = self._segment_size
+            while lines and (not batch or size + len(lines[0]) <= LEDGER_SEGMENT_MAX_BYTES):
+                size += len(lines[0])
+                batch.append(lines.pop(0))
+
+            with open(self._segment_path(self._segment), "ab") as segment_file:
+                segment_file.write(b"".join(batch))
+            self._segment_size = size
+
+    def _read(self) -> list[dict[str, Any]]:
+        """Read all records from all segments (executor)."""
+        records = []
+        for number in self._segment_numbers():
+            with open(self._segment_path(number), encoding="utf-8") as segment_file:
+                for line_number, line in enumerate(segment_file, start=1):
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # A line cut short by a crash mid-append; everything else is intact
+                        _LOGGER.warning("Skipping unreadable ledger line %s:%s", number, line_number)
+        return records
@@ -0,0 +1,198 @@
+"""Hourly consumption and revenue in Home Assistant long-term statistics."""
+from __future__ import annotations
+
+import bisect
+import hashlib
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Any, Iterable
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+METRIC_CONSUMPTION = "consumption"
+METRIC_REVENUE = "revenue"
+CURRENCY = "CZK"
+
+# Seconds between a purchase and its history entry (both take their own dt_util.now())
+HISTORY_MATCH_WINDOW = 1.0
+_HISTORY_PRICE = re.compile(r"Price: ([\d.]+)")
+
+
+class ConsumptionStatistics:
+    """Hourly consumption per room and consumption and revenue per item as external statistics.
+
+    Purchases are added to hourly buckets as they happen. Once an hour is over
+    its bucket is imported with async_add_external_statistics and folded into
+    the running sums. Buckets and sums are part of the Store data (key
+    "statistics"), so a restart neither loses nor double counts an hour.
+    Lifetime room revenue is recorded by the room revenue sensors instead.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, state: dict[str, Any]) -> None:
+        """Initialize from the persisted state ({"sums", "pending", "names"})."""
+        self.hass = hass
+        self.entry = entry
+        self._sums: dict[str, float] = state.setdefault("sums", {})
+        self._pending: dict[str, dict[str, float]] = state.setdefault("pending", {})
+        self._names: dict[str, str] = state.setdefault("names", {})
+        self._prefix = f"{DOMAIN}:{slugify(entry.entry_id)}"
+        self.hours_imported = 0
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return statistics counters."""
+        return {
+            "statistics": len(self._sums),
+            "hours_pending": len(self._pending),
+            "hours_imported": self.hours_imported,
+        }
+
+    def _statistic_id(self, kind: str, name: str, metric: str) -> str:
+        """Return the statistic ID of a room or item metric, registering its display name."""
+        statistic_id = f"{self._prefix}_{kind}_{_slug(name)}_{metric}"
+        if statistic_id not in self._names:
+            self._names[statistic_id] = f"{self.entry.title} {name} {metric}"
+        return statistic_id
+
+    def add(self, entry: dict[str, Any]) -> None:
+        """Add a purchase to the bucket of its hour."""
+        try:
+            hour = dt_util.as_utc(datetime.fromisoformat(entry["timestamp"])).replace(
+                minute=0, second=0, microsecond=0
+            )
+        except (KeyError, TypeError, ValueError):
+            return
+
+        quantity = entry.get("quantity", 1)
+        revenue = entry.get("price", 0.0) * quantity
+        bucket = self._pending.setdefault(hour.isoformat(), {})
+        values = [("item", entry.get("item", "Unknown"), METRIC_CONSUMPTION, quantity),
+                  ("item", entry.get("item", "Unknown"), METRIC_REVENUE, revenue)]
+        if entry.get("room"):
+            values.append(("room", entry["room"], METRIC_CONSUMPTION, quantity))
+
+        for kind, name, metric, value in values:
+            statistic_id = self._statistic_id(kind, name, metric)
+            bucket[statistic_id] = bucket.get(statistic_id, 0) + value
+
+    @callback
+    def async_import_completed_hours(self, now: datetime | None = None) -> bool:
+        """Import every bucket whose hour is over; return True if the state changed."""
+        current_hour = (now or dt_util.utcnow()).replace(minute=0, second=0, microsecond=0)
+        completed = sorted(
+            hour for hour in self._pending if datetime.fromisoformat(hour) < current_hour
+        )
+        if not completed:
+            return False
+
+        # Sums must grow in hour order, so fold the hours oldest first
+        rows: dict[str, list[StatisticData]] = {}
+        for hour in completed:
+            start = datetime.fromisoformat(hour)
+            for statistic_id, value in self._pending.pop(hour).items():
+                total = self._sums.get(statistic_id, 0.0) + value
+                self._sums[statistic_id] = total
+                rows.setdefault(statistic_id, []).append(
+                    StatisticData(start=start, state=value, sum=total)
+                )
+
+        for statistic_id, statistics in rows.items():
+            metadata = StatisticMetaData(
+                has_mean=False,
+                has_sum=True,
+                name=self._names.get(statistic_id),
+                source=DOMAIN,
+                statistic_id=statistic_id,
+                unit_of_measurement=CURRENCY if statistic_id.endswith(METRIC_REVENUE) else None,
+            )
+            async_add_external_statistics(self.hass, metadata, statistics)
+
+        self.hours_imported += len(completed)
+        _LOGGER.debug("Imported %s hours into %s statistics", len(completed), len(rows))
+        return True
+
+
+def backfill_records(
+    consumption: Iterable[dict[str, Any]], history: Iterable[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """Return every known purchase once, merged from consumption records and history.
+
+    Consumption records (ledger and consumption log) may repeat each other and
+    are deduplicated exactly. History "remove" entries also cover purchases
+    already settled out of the log; one that matches a consumption record of
+    the same item, room and quantity within HISTORY_MATCH_WINDOW is the same
+    purchase and is skipped.
+    """
+    records: dict[tuple, dict[str, Any]] = {}
+    for entry in consumption:
+        key = (entry.get("timestamp"), entry.get("item"), entry.get("room"), entry.get("quantity"))
+        records.setdefault(key, entry)
+
+    removals = []
+    for entry in history:
+        if entry.get("action") == "remove":
+            parsed = _timestamp(entry.get("timestamp"))
+            if parsed is not None:
+                removals.append((parsed, entry))
+
+    # Only purchases within the (short, capped) history can match one of its entries;
+    # log timestamps share one ISO format, so a string comparison skips the rest unparsed
+    purchase_times: dict[tuple, list[float]] = {}
+    if removals:
+        oldest = min(removals, key=lambda removal: removal[0])[1]["timestamp"]
+        cutoff = (datetime.fromisoformat(oldest) - timedelta(seconds=HISTORY_MATCH_WINDOW)).isoformat()
+        for timestamp, item, room, quantity in records:
+            if not isinstance(timestamp, str) or timestamp < cutoff:
+                continue
+            parsed = _timestamp(timestamp)
+            if parsed is not None:
+                purchase_times.setdefault((item, room, quantity), []).append(parsed)
+    for times in purchase_times.values():
+        times.sort()
+
+    merged = list(records.values())
+    for parsed, entry in removals:
+
+        times = purchase_times.get((entry.get("item"), entry.get("room"), entry.get("quantity")), [])
+        index = bisect.bisect_left(times, parsed - HISTORY_MATCH_WINDOW)
+        if index < len(times) and times[index] <= parsed + HISTORY_MATCH_WINDOW:
+            # Each purchase matches one history entry only
+            del times[index]
+            continue
+
+        price = _HISTORY_PRICE.search(entry.get("details") or "")
+        merged.append({
+            "item": entry.get("item"),
+            "quantity": entry.get("quantity", 1),
+            "room": entry.get("room"),
+            "price": float(price.group(1)) if price else 0.0,
+            "timestamp": entry["timestamp"],
+        })
+
+    return merged
+
+
+def _slug(name: str) -> str:
+    """Return the statistic ID part of a room or item name."""
+    slug = slugify(name)
+    if not slug or not any(char.isalnum() for char in name):
+        # Punctuation or emoji only would give an empty (invalid) or shared ("unknown") ID
+        return hashlib.sha256(name.encode()).hexdigest()[:12]
+    return slug
+
+
+def _timestamp(value: Any) -> float | None:
+    """Return the POSIX timestamp of an ISO timestamp, or None."""
+    try:
+        return dt_util.as_utc(datetime.fromisoformat(value)).timestamp()
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,76 @@
+"""PIN lookup index for Lednice."""
+from __future__ import annotations
+
+from typing import NamedTuple
+
+PIN_SOURCE_PREVIO = "previo"
+PIN_SOURCE_INPUT_TEXT = "input_text"
+PIN_SOURCE_STATIC = "static"
+
+# Lower value wins when the same PIN is known from more than one source
+_SOURCE_PRIORITY = {
+    PIN_SOURCE_PREVIO: 0,
+    PIN_SOURCE_INPUT_TEXT: 1,
+    PIN_SOURCE_STATIC: 2,
+}
+
+
+class PinIndexEntry(NamedTuple):
+    """A single place a PIN is registered."""
+
+    source: str
+    room: str
+    key: str  # previo_pins key, input_text entity_id or room name (static)
+    valid_from: float | None = None  # Epoch seconds
+    valid_until: float | None = None
+
+
+class PinIndex:
+    """Maintained PIN -> registrations index.
+
+    Every registration is identified by (source, key), so re-registering a key
+    (a changed card key, a new static PIN) replaces the old PIN automatically.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._pins: dict[str, list[PinIndexEntry]] = {}
+        self._keys: dict[tuple[str, str], str] = {}
+
+    def __len__(self) -> int:
+        """Return number of registrations."""
+        return len(self._keys)
+
+    def clear(self) -> None:
+        """Drop all registrations."""
+        self._pins.clear()
+        self._keys.clear()
+
+    def add(self, pin: str, entry: PinIndexEntry) -> None:
+        """Register a PIN, replacing any previous PIN stored under the same key."""
+        self.remove(entry.source, entry.key)
+
+        entries = self._pins.setdefault(pin, [])
+        entries.append(entry)
+        if len(entries) > 1:
+            entries.sort(key=lambda e: _SOURCE_PRIORITY[e.source])
+        self._keys[(entry.source, entry.key)] = pin
+
+    def remove(self, source: str, key: str) -> None:
+        """Remove the registration stored under (source, key), if any."""
+        pin = self._keys.pop((source, key), None)
+        if pin is None:
+            return
+
+        entries = [
+            e for e in self._pins.get(pin, [])
+            if not (e.source == source and e.key == key)
+        ]
+        if entries:
+            self._pins[pin] = entries
+        else:
+            self._pins.pop(pin, None)
+
+    def lookup(self, pin: str) -> list[PinIndexEntry]:
+        """Return all registrations of a PIN, highest priority source first."""
+        return self._pins.get(pin, [])
@@ -0,0 +1,207 @@
+"""Pre-aggregated consumption reports for Lednice."""
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    REPORT_DAY_RETENTION_DAYS,
+    REPORT_HOUR_RETENTION_DAYS,
+    REPORT_PERIOD_DAY,
+    REPORT_PERIOD_WEEK,
+)
+
+GRANULARITY_HOUR = "hour"
+GRANULARITY_DAY = "day"
+GRANULARITY_MONTH = "month"
+GRANULARITIES = [GRANULARITY_HOUR, GRANULARITY_DAY, GRANULARITY_MONTH]
+
+# Length of the bucket key prefix of a naive local ISO timestamp: 2025-01-15T10 / 2025-01-15 / 2025-01
+_KEY_LENGTH = {GRANULARITY_HOUR: 13, GRANULARITY_DAY: 10, GRANULARITY_MONTH: 7}
+_RETENTION = {
+    GRANULARITY_HOUR: timedelta(days=REPORT_HOUR_RETENTION_DAYS),
+    GRANULARITY_DAY: timedelta(days=REPORT_DAY_RETENTION_DAYS),
+}
+UNKNOWN_ROOM = "unknown"
+
+
+def _local(value: Any) -> datetime | None:
+    """Return an ISO timestamp or datetime as a naive datetime in the Home Assistant time zone, or None."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = dt_util.as_local(value).replace(tzinfo=None)
+    return value
+
+
+def _next_month(moment: datetime) -> datetime:
+    """Return the first day of the month after moment."""
+    return (moment.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def period_range(period: str, day: date | None = None) -> tuple[datetime, datetime]:
+    """Return the start and end of the day, week (from Monday) or month containing day (default today)."""
+    start = datetime.combine(day or dt_util.now().date(), time())
+    if period == REPORT_PERIOD_DAY:
+        return start, start + timedelta(days=1)
+    if period == REPORT_PERIOD_WEEK:
+        start -= timedelta(days=start.weekday())
+        return start, start + timedelta(days=7)
+    start = start.replace(day=1)
+    return start, _next_month(start)
+
+
+class ConsumptionReports:
+    """Consumption and revenue per hour, day and month, per room and item.
+
+    Buckets live in their own Store as
+    {granularity: {bucket key: {room: {item: [quantity, revenue]}}}} and are
+    updated for every purchase. Bucket keys are local times in the Home
+    Assistant time zone, like the log timestamps. A report over any range adds up whole months,
+    then whole days, then the remaining hours, so its cost depends on the
+    number of buckets, not on the number of purchases. Hour buckets are kept
+    for REPORT_HOUR_RETENTION_DAYS, day buckets for REPORT_DAY_RETENTION_DAYS
+    and month buckets forever.
+    """
+
+    def __init__(self, state: dict[str, Any]) -> None:
+        """Initialize from the persisted buckets."""
+        self._buckets: dict[str, dict[str, dict]] = {
+            granularity: state.setdefault(granularity, {}) for granularity in GRANULARITIES
+        }
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a copy of the buckets for the Store, unaffected by later purchases."""
+        return {
+            granularity: {
+                bucket_key: {
+                    room: {item: list(cell) for item, cell in items.items()}
+                    for room, items in bucket.items()
+                }
+                for bucket_key, bucket in buckets.items()
+            }
+            for granularity, buckets in self._buckets.items()
+        }
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return the number of buckets per granularity."""
+        return {granularity: len(buckets) for granularity, buckets in self._buckets.items()}
+
+    def add(self, entry: dict[str, Any]) -> None:
+        """Add a purchase to its hour, day and month buckets."""
+        moment = _local(entry.get("timestamp"))
+        if moment is None:
+            return
+
+        key = moment.isoformat()
+        room = entry.get("room") or UNKNOWN_ROOM
+        item = entry.get("item", "Unknown")
+        quantity = entry.get("quantity", 1)
+        revenue = entry.get("price", 0.0) * quantity
+
+        for granularity, buckets in self._buckets.items():
+            bucket_key = key[:_KEY_LENGTH[granularity]]
+            bucket = buckets.get(bucket_key)
+            if bucket is None:
+                bucket = buckets[bucket_key] = {}
+                self._prune(granularity)
+            cell = bucket.setdefault(room, {}).setdefault(item, [0, 0.0])
+            cell[0] += quantity
+            cell[1] += revenue
+
+    def _cutoff(self, granularity: str) -> str | None:
+        """Return the oldest bucket key still kept for a granularity, or None if kept forever."""
+        retention = _RETENTION.get(granularity)
+        if retention is None:
+            return None
+        return (_local(dt_util.now()) - retention).isoformat()[:_KEY_LENGTH[granularity]]
+
+    def _prune(self, granularity: str) -> None:
+        """Drop buckets older than the retention of their granularity."""
+        cutoff = self._cutoff(granularity)
+        if cutoff is None:
+            return
+        buckets = self._buckets[granularity]
+        for bucket_key in [bucket_key for bucket_key in buckets if bucket_key < cutoff]:
+            del buckets[bucket_key]
+
+    def _segments(self, start: datetime, end: datetime) -> list[tuple[str, str]]:
+        """Return the (granularity, bucket key) pairs that exactly cover [start, end)."""
+        segments = []
+        cursor = start
+        while cursor < end:
+            if cursor.day == 1 and cursor.hour == 0 and _next_month(cursor) <= end:
+                granularity, step_end = GRANULARITY_MONTH, _next_month(cursor)
+            elif cursor.hour == 0 and cursor + timedelta(days=1) <= end:
+                granularity, step_end = GRANULARITY_DAY, cursor + timedelta(days=1)
+            else:
+                granularity, step_end = GRANULARITY_HOUR, cursor + timedelta(hours=1)
+            segments.append((granularity, cursor.isoformat()[:_KEY_LENGTH[granularity]]))
+            cursor = step_end
+        return segments
+
+    def report(
+        self,
+        start: datetime,
+        end: datetime,
+        room: str | None = None,
+        item: str | None = None,
+    ) -> dict[str, Any]:
+        """Return consumption and revenue totals between start and end, rounded out to whole hours."""
+        start = _local(start).replace(minute=0, second=0, microsecond=0)
+        end_local = _local(end)
+        end = end_local.replace(minute=0, second=0, microsecond=0)
+        if end < end_local:
+            end += timedelta(hours=1)
+
+        rooms: dict[str, list] = {}
+        items: dict[str, list] = {}
+        complete = True
+        segments = self._segments(start, end)
+        cutoffs = {granularity: self._cutoff(granularity) for granularity in GRANULARITIES}
+
+        for granularity, bucket_key in segments:
+            cutoff = cutoffs[granularity]
+            if cutoff is not None and bucket_key < cutoff:
+                # Already pruned; this part of the range is missing from the totals
+                complete = False
+                continue
+
+            bucket = self._buckets[granularity].get(bucket_key)
+            if not bucket:
+                continue
+            for bucket_room, room_items in bucket.items():
+                if room is not None and bucket_room != room:
+                    continue
+                for bucket_item, (quantity, revenue) in room_items.items():
+                    if item is not None and bucket_item != item:
+                        continue
+                    for totals, name in ((rooms, bucket_room), (items, bucket_item)):
+                        total = totals.setdefault(name, [0, 0.0])
+                        total[0] += quantity
+                        total[1] += revenue
+
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "total_quantity": sum(quantity for quantity, _ in rooms.values()),
+            "total_revenue": round(sum((revenue for _, revenue in rooms.values()), 0.0), 2),
+            "rooms": [
+                {"room": name, "quantity": quantity, "revenue": round(revenue, 2)}
+                for name, (quantity, revenue) in sorted(rooms.items(), key=lambda pair: -pair[1][1])
+            ],
+            "items": [
+                {"item": name, "quantity": quantity, "revenue": round(revenue, 2)}
+                for name, (quantity, revenue) in sorted(items.items(), key=lambda pair: -pair[1][0])
+            ],
+            "buckets": len(segments),
+            "complete": complete,
+        }
@@ -1,13 +1,27 @@
 """Sensor platform for Lednice."""
 import logging
+from itertools import islice
 from typing import Any
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN, ATTR_INVENTORY, ATTR_CONSUMPTION_LOG, ATTR_HISTORY
+from .const import (
+    DOMAIN,
+    ATTR_INVENTORY,
+    ATTR_CONSUMPTION_LOG,
+    ATTR_HISTORY,
+    SENSOR_LOG_ENTRIES,
+    TOPIC_CONSUMPTION,
+    TOPIC_HISTORY,
+    TOPIC_INVENTORY,
+    TOPIC_PINS,
+    TOPIC_PREVIO,
+    TOPIC_PRODUCTS,
+    consumption_topic,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,12 +48,94 @@ async def async_setup_entry(
     # Add owner room sensor
     sensors.append(LedniceRoomConsumptionSensor(coordinator, entry, OWNER_ROOM))
 
+    # Compact numeric sensors for long-term statistics
+    for room in [*DEFAULT_ROOMS, OWNER_ROOM]:
+        sensors.append(LedniceRoomRevenueSensor(coordinator, entry, room))
+
+    stock_items: set[str] = set()
+
+    @callback
+    def async_add_stock_sensors() -> None:
+        """Add a stock sensor for every inventory item that does not have one yet."""
+        new_items = [item for item in coordinator.inventory if item not in stock_items]
+        if not new_items:
+            return
+        stock_items.update(new_items)
+        async_add_entities([LedniceItemStockSensor(coordinator, entry, item) for item in new_items])
+
     async_add_entities(sensors)
+    async_add_stock_sensors()
+    coordinator.add_listener(async_add_stock_sensors, [TOPIC_INVENTORY])
+    entry.async_on_unload(lambda: coordinator.remove_listener(async_add_stock_sensors))
+
+
+class LedniceSensorBase(SensorEntity):
+    """Base class for Lednice sensors fed by the coordinator.
+
+    The native value and attributes are built once per coordinator revision
+    and served from a cache until the coordinator notifies a change; the
+    state itself is left to SensorEntity, so numeric sensors keep its
+    validation, rounding and unit conversion.
+    """
+
+    _cached_revision: int | None = None
+    _cached_value: Any = None
+    _cached_attributes: dict[str, Any] | None = None
+
+    def _listener_topics(self) -> list[str]:
+        """Return the coordinator change topics this sensor displays."""
+        raise NotImplementedError
+
+    def _compute(self) -> tuple[Any, dict[str, Any]]:
+        """Return the native value and the state attributes from the coordinator data."""
+        raise NotImplementedError
+
+    def _refresh(self) -> None:
+        """Rebuild the cached value and attributes if the coordinator data changed."""
+        revision = self._coordinator.revision
+        if self._cached_revision != revision:
+            self._cached_value, self._cached_attributes = self._compute()
+            self._cached_revision = revision
+
+    @property
+    def native_value(self) -> Any:
+        """Return the value reported by the sensor."""
+        self._refresh()
+        return self._cached_value
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the state attributes."""
+        self._refresh()
+        return self._cached_attributes
+
+    @property
+    def available(self) -> bool:
+        """Return True if entity is available."""
+        return True
 
+    async def async_added_to_hass(self):
+        """When entity is added to hass."""
+        self._coordinator.add_listener(self.async_write_ha_state, self._listener_topics())
 
-class LedniceInventorySensor(SensorEntity):
+    async def async_will_remove_from_hass(self):
+        """When entity will be removed from hass."""
+        self._coordinator.remove_listener(self.async_write_ha_state)
+
+
+class LedniceInventorySensor(LedniceSensorBase):
     """Sensor for Lednice inventory."""
 
+    # Kilobytes per state change; the stock sensors carry the numbers into the recorder
+    _unrecorded_attributes = frozenset({
+        ATTR_INVENTORY,
+        "items_detail",
+        "product_codes",
+        "room_pins",
+        "previo_pins",
+        ATTR_CONSUMPTION_LOG,
+    })
+
     def __init__(self, coordinator, entry: ConfigEntry):
         """Initialize the sensor."""
         self._coordinator = coordinator
@@ -48,15 +144,25 @@ class LedniceInventorySensor(SensorEntity):
         self._attr_unique_id = f"{entry.entry_id}_inventory"
         self._attr_icon = "mdi:fridge"
 
-    @property
-    def state(self) -> int:
-        """Return the total number of items."""
-        return sum(item.get("quantity", 0) for item in self._coordinator.inventory.values())
-
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        """Return the state attributes."""
-        return {
+    def _listener_topics(self) -> list[str]:
+        """Return the coordinator change topics this sensor displays."""
+        if self._coordinator.lean_attributes:
+            return [TOPIC_INVENTORY, TOPIC_PRODUCTS]
+        return [TOPIC_INVENTORY, TOPIC_PRODUCTS, TOPIC_PINS, TOPIC_PREVIO, TOPIC_CONSUMPTION]
+
+    def _compute(self) -> tuple[int, dict[str, Any]]:
+        """Return the total number of items and the inventory attributes."""
+        total = sum(item.get("quantity", 0) for item in self._coordinator.inventory.values())
+
+        if self._coordinator.lean_attributes:
+            # Only what the cards render; logs, PINs and reservations come from lednice.query
+            return total, {
+                ATTR_INVENTORY: self._coordinator.inventory,
+                "total_items": len(self._coordinator.inventory),
+                "product_codes": self._coordinator.product_codes,
+            }
+
+        return total, {
             ATTR_INVENTORY: self._coordinator.inventory,
             "total_items": len(self._coordinator.inventory),
             "items_detail": [
@@ -70,26 +176,21 @@ class LedniceInventorySensor(SensorEntity):
             "product_codes": self._coordinator.product_codes,
             "room_pins": self._coordinator.room_pins,  # Show all static room PINs for admin
             "previo_pins": self._coordinator.data.get("previo_pins", {}),  # Show active Previo reservations with PINs
-            ATTR_CONSUMPTION_LOG: self._coordinator.consumption_log,  # Add consumption log for guest cards
+            # Newest entries only; retention can be far larger than what a state should carry
+            ATTR_CONSUMPTION_LOG: list(islice(reversed(self._coordinator.consumption_log), SENSOR_LOG_ENTRIES))[::-1],
         }
 
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return True
-
-    async def async_added_to_hass(self):
-        """When entity is added to hass."""
-        self._coordinator.add_listener(self.async_write_ha_state)
-
-    async def async_will_remove_from_hass(self):
-        """When entity will be removed from hass."""
-        self._coordinator.remove_listener(self.async_write_ha_state)
 
-
-class LedniceConsumptionSensor(SensorEntity):
+class LedniceConsumptionSensor(LedniceSensorBase):
     """Sensor for Lednice consumption log."""
 
+    _unrecorded_attributes = frozenset({
+        ATTR_CONSUMPTION_LOG,
+        "room_statistics",
+        "room_prices",
+        "item_statistics",
+    })
+
     def __init__(self, coordinator, entry: ConfigEntry):
         """Initialize the sensor."""
         self._coordinator = coordinator
@@ -98,69 +199,41 @@ class LedniceConsumptionSensor(SensorEntity):
         self._attr_unique_id = f"{entry.entry_id}_consumption"
         self._attr_icon = "mdi:chart-line"
 
-    @property
-    def state(self) -> int:
-        """Return the total number of consumption events."""
-        return len(self._coordinator.consumption_log)
-
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        """Return the state attributes."""
-        # Get last 50 consumption events
-        recent_log = self._coordinator.consumption_log[-50:] if self._coordinator.consumption_log else []
-
-        # Calculate statistics
-        room_stats = {}
-        item_stats = {}
-        room_prices = {}
-
-        for log_entry in self._coordinator.consumption_log:
-            room = log_entry.get("room", "Unknown")
-            item = log_entry.get("item", "Unknown")
-            quantity = log_entry.get("quantity", 1)
-            price = log_entry.get("price", 0.0)
-
-            # Room statistics (quantity)
-            if room not in room_stats:
-                room_stats[room] = 0
-            room_stats[room] += quantity
-
-            # Room prices (total cost)
-            if room not in room_prices:
-                room_prices[room] = 0.0
-            room_prices[room] += price * quantity
-
-            # Item statistics
-            if item not in item_stats:
-                item_stats[item] = 0
-            item_stats[item] += quantity
-
-        return {
-            ATTR_CONSUMPTION_LOG: recent_log,
-            "total_consumed": sum(log.get("quantity", 0) for log in self._coordinator.consumption_log),
-            "total_revenue": sum(log.get("price", 0.0) * log.get("quantity", 1) for log in self._coordinator.consumption_log),
-            "room_statistics": room_stats,
-            "room_prices": room_prices,
-            "item_statistics": item_stats,
-        }
+    def _listener_topics(self) -> list[str]:
+        """Return the coordinator change topics this sensor displays."""
+        return [TOPIC_CONSUMPTION]
 
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return True
+    def _compute(self) -> tuple[int, dict[str, Any]]:
+        """Return the number of consumption events and the consumption attributes."""
+        # Get the newest consumption events
+        recent_log = list(islice(reversed(self._coordinator.consumption_log), SENSOR_LOG_ENTRIES))[::-1]
 
-    async def async_added_to_hass(self):
-        """When entity is added to hass."""
-        self._coordinator.add_listener(self.async_write_ha_state)
+        # Statistics are maintained incrementally by the coordinator
+        summary = self._coordinator.consumption_summary()
 
-    async def async_will_remove_from_hass(self):
-        """When entity will be removed from hass."""
-        self._coordinator.remove_listener(self.async_write_ha_state)
+        return len(self._coordinator.consumption_log), {
+            ATTR_CONSUMPTION_LOG: recent_log,
+            "total_consumed": summary["total_consumed"],
+            "total_revenue": summary["total_revenue"],
+            "room_statistics": summary["room_statistics"],
+            "room_prices": summary["room_prices"],
+            "item_statistics": summary["item_statistics"],
+        }
 
 
-class LedniceRoomConsumptionSensor(SensorEntity):
+class LedniceRoomConsumptionSensor(LedniceSensorBase):
     """Sensor for per-room consumption."""
 
+    _unrecorded_attributes = frozenset({
+        "recent_items",
+        "item_statistics",
+        "item_summary",
+        "pin",
+        "guest",
+        "checkin",
+        "checkout",
+    })
+
     def __init__(self, coordinator, entry: ConfigEntry, room: str):
         """Initialize the sensor."""
         self._coordinator = coordinator
@@ -170,68 +243,35 @@ class LedniceRoomConsumptionSensor(SensorEntity):
         self._attr_unique_id = f"{entry.entry_id}_{room}_consumption"
         self._attr_icon = "mdi:door"
 
-    @property
-    def state(self) -> int:
-        """Return the total consumption for this room."""
-        return sum(
-            log.get("quantity", 0)
-            for log in self._coordinator.consumption_log
-            if log.get("room") == self._room
-        )
-
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        """Return the state attributes."""
-        # Filter logs for this room
-        room_logs = [
-            log for log in self._coordinator.consumption_log
-            if log.get("room") == self._room
-        ]
-
-        # Get last 20 items
-        recent_logs = room_logs[-20:] if room_logs else []
-
-        # Calculate item statistics and total price for this room
-        item_stats = {}
-        total_price = 0.0
-
-        for log_entry in room_logs:
-            item = log_entry.get("item", "Unknown")
-            quantity = log_entry.get("quantity", 1)
-            price = log_entry.get("price", 0.0)
+    def _listener_topics(self) -> list[str]:
+        """Return the coordinator change topics this sensor displays."""
+        return [consumption_topic(self._room), TOPIC_PINS, TOPIC_PREVIO]
 
-            if item not in item_stats:
-                item_stats[item] = 0
-            item_stats[item] += quantity
+    def _compute(self) -> tuple[int, dict[str, Any]]:
+        """Return the total consumption for this room and the room attributes."""
+        consumption = self._coordinator.room_consumption(self._room)
+        # Guest cards read the bill and the guest from here, also with lean inventory attributes
+        reservation = self._coordinator.room_reservation(self._room) or {}
 
-            total_price += price * quantity
-
-        return {
+        return consumption["total_quantity"], {
             "room": self._room,
-            "recent_items": recent_logs,
-            "item_statistics": item_stats,
-            "total_price": round(total_price, 2),
+            "recent_items": consumption["recent_items"],
+            "item_statistics": consumption["item_statistics"],
+            "item_summary": consumption["item_summary"],
+            "total_price": consumption["total_price"],
+            "guest": reservation.get("guest"),
+            "checkin": reservation.get("checkin"),
+            "checkout": reservation.get("checkout"),
             "pin_configured": self._room in self._coordinator.room_pins,
             "pin": self._coordinator.room_pins.get(self._room, "Not configured"),  # Show PIN for this room
         }
 
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return True
-
-    async def async_added_to_hass(self):
-        """When entity is added to hass."""
-        self._coordinator.add_listener(self.async_write_ha_state)
 
-    async def async_will_remove_from_hass(self):
-        """When entity will be removed from hass."""
-        self._coordinator.remove_listener(self.async_write_ha_state)
-
-
-class LedniceHistorySensor(SensorEntity):
+class LedniceHistorySensor(LedniceSensorBase):
     """Sensor for complete Lednice inventory history (add/remove/update operations)."""
 
+    _unrecorded_attributes = frozenset({ATTR_HISTORY, "action_counts", "last_action"})
+
     def __init__(self, coordinator, entry: ConfigEntry):
         """Initialize the sensor."""
         self._coordinator = coordinator
@@ -240,55 +280,107 @@ class LedniceHistorySensor(SensorEntity):
         self._attr_unique_id = f"{entry.entry_id}_history"
         self._attr_icon = "mdi:history"
 
-    @property
-    def state(self) -> int:
-        """Return the total number of history entries."""
-        return len(self._coordinator.data.get("history", []))
+    def _listener_topics(self) -> list[str]:
+        """Return the coordinator change topics this sensor displays."""
+        return [TOPIC_HISTORY]
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        """Return the state attributes."""
-        history = self._coordinator.data.get("history", [])
-
-        # Return last 50 for display (most recent first)
-        recent_history = list(reversed(history[-50:])) if history else []
-
-        # Calculate statistics
-        total_added = sum(
-            entry.get("quantity", 0)
-            for entry in history
-            if entry.get("action") == "add"
-        )
-        total_removed = sum(
-            entry.get("quantity", 0)
-            for entry in history
-            if entry.get("action") == "remove"
-        )
-
-        # Group by action type
-        action_counts = {}
-        for entry in history:
-            action = entry.get("action", "unknown")
-            action_counts[action] = action_counts.get(action, 0) + 1
-
-        return {
+    def _compute(self) -> tuple[int, dict[str, Any]]:
+        """Return the number of history entries and the history attributes."""
+        history = self._coordinator.history
+
+        # Return the newest entries for display (most recent first)
+        recent_history = list(islice(reversed(history), SENSOR_LOG_ENTRIES))
+
+        # Statistics are maintained incrementally by the coordinator
+        summary = self._coordinator.history_summary()
+
+        return len(history), {
             ATTR_HISTORY: recent_history,
             "total_entries": len(history),
-            "total_added": total_added,
-            "total_removed": total_removed,
-            "action_counts": action_counts,
+            "total_added": summary["total_added"],
+            "total_removed": summary["total_removed"],
+            "action_counts": summary["action_counts"],
             "last_action": history[-1] if history else None,
         }
 
+
+class LedniceRoomRevenueSensor(LedniceSensorBase):
+    """Lifetime revenue of a room, for long-term statistics."""
+
+    _attr_device_class = SensorDeviceClass.MONETARY
+    _attr_state_class = SensorStateClass.TOTAL
+    _attr_native_unit_of_measurement = "CZK"
+
+    def __init__(self, coordinator, entry: ConfigEntry, room: str):
+        """Initialize the sensor."""
+        self._coordinator = coordinator
+        self._entry = entry
+        self._room = room
+        self._attr_name = f"{entry.title} {room} Revenue"
+        self._attr_unique_id = f"{entry.entry_id}_{room}_revenue"
+        self._attr_icon = "mdi:cash"
+
+    def _listener_topics(self) -> list[str]:
+        """Return the coordinator change topics this sensor displays."""
+        return [consumption_topic(self._room)]
+
+    def _compute(self) -> tuple[float, dict[str, Any]]:
+        """Return the lifetime revenue of the room."""
+        return self._coordinator.room_revenue(self._room), {"room": self._room}
+
+
+class LedniceItemStockSensor(LedniceSensorBase):
+    """Stock of a single inventory item, for long-term statistics."""
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator, entry: ConfigEntry, item: str):
+        """Initialize the sensor."""
+        self._coordinator = coordinator
+        self._entry = entry
+        self._item = item
+        self._attr_name = f"{entry.title} {item} Stock"
+        self._attr_unique_id = f"{entry.entry_id}_stock_{item}"
+        self._attr_icon = "mdi:bottle-soda"
+        self._written: tuple[int, str] | None = None
+
+    def _listener_topics(self) -> list[str]:
+        """Return the coordinator change topics this sensor displays."""
+        return [TOPIC_INVENTORY]
+
     @property
     def available(self) -> bool:
-        """Return True if entity is available."""
-        return True
+        """Return True while the item is in the inventory."""
+        return self._item in self._coordinator.inventory
+
+    def _compute(self) -> tuple[int | None, dict[str, Any]]:
+        """Return the stock of the item."""
+        item = self._coordinator.inventory.get(self._item)
+        if item is None:
+            return None, {}
+        return item.get("quantity", 0), {"code": item.get("code", "")}
 
     async def async_added_to_hass(self):
         """When entity is added to hass."""
-        self._coordinator.add_listener(self.async_write_ha_state)
+        self._written = self._item_fingerprint()
+        self._coordinator.add_listener(self._async_inventory_changed, self._listener_topics())
 
     async def async_will_remove_from_hass(self):
         """When entity will be removed from hass."""
-        self._coordinator.remove_listener(self.async_write_ha_state)
+        self._coordinator.remove_listener(self._async_inventory_changed)
+
+    def _item_fingerprint(self) -> tuple[int, str] | None:
+        """Return what this sensor displays of the item, or None if it is gone."""
+        item = self._coordinator.inventory.get(self._item)
+        if item is None:
+            return None
+        return item.get("quantity", 0), item.get("code", "")
+
+    @callback
+    def _async_inventory_changed(self) -> None:
+        """Write the state only if this item changed; every sale notifies the inventory topic."""
+        fingerprint = self._item_fingerprint()
+        if fingerprint == self._written:
+            return
+        self._written = fingerprint
+        self.async_write_ha_state()
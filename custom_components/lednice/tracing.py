@@ -0,0 +1,86 @@
+"""Level-gated tracing for Lednice hot paths."""
+from __future__ import annotations
+
+import logging
+import random
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator
+
+_TRACE_LOGGER = logging.getLogger(__name__)
+
+# Sampling decision of the traced operation running in the current task (None = none running)
+_SAMPLED: ContextVar[bool | None] = ContextVar("lednice_trace_sampled", default=None)
+
+
+class Tracer:
+    """Verbose per-request trace output.
+
+    Trace messages use lazy %-style arguments and are dropped after a single
+    flag check unless tracing was switched on (lednice.set_trace) or the
+    custom_components.lednice.tracing logger is set to debug, so the default
+    path never builds a string. Switching tracing on leaves the logger level
+    alone; records are handed to the handlers directly.
+
+    With a sample rate below 1 only that share of operations is traced. The
+    decision is made once when an operation (a service call or a mutation)
+    starts and holds for every message of it, including nested operations.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a disabled tracer."""
+        self.enabled = False
+        self.sample_rate = 1.0
+
+    @property
+    def active(self) -> bool:
+        """Return True if trace messages of the current operation are emitted."""
+        if not self.enabled and not _TRACE_LOGGER.isEnabledFor(logging.DEBUG):
+            return False
+        return _SAMPLED.get() is not False
+
+    def configure(self, enabled: bool, sample_rate: float = 1.0) -> None:
+        """Switch tracing on or off at runtime."""
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+
+    def _sample(self) -> bool:
+        """Return True if a new operation is traced."""
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    @asynccontextmanager
+    async def operation(self) -> AsyncIterator[None]:
+        """Trace an operation as a whole; also usable as a decorator of async functions."""
+        if _SAMPLED.get() is not None:
+            # Nested in a traced operation, which already decided
+            yield
+            return
+
+        token = _SAMPLED.set(self._sample())
+        try:
+            yield
+        finally:
+            _SAMPLED.reset(token)
+
+    def __call__(self, msg: str, *args) -> None:
+        """Emit a trace message if tracing is active and its operation is sampled."""
+        debug = _TRACE_LOGGER.isEnabledFor(logging.DEBUG)
+        if not self.enabled and not debug:
+            return
+
+        sampled = _SAMPLED.get()
+        if sampled is None:
+            # Outside an operation a message stands alone
+            sampled = self._sample()
+        if not sampled:
+            return
+
+        if debug:
+            _TRACE_LOGGER.debug(msg, *args)
+        else:
+            _TRACE_LOGGER.handle(
+                _TRACE_LOGGER.makeRecord(_TRACE_LOGGER.name, logging.DEBUG, __file__, 0, msg, args, None)
+            )
+
+
+TRACE = Tracer()
@@ -0,0 +1,51 @@
+"""Shared fixtures for the Lednice tests."""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+from typing import Awaitable, Callable
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+# Make custom_components importable when running from a checkout
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homeassistant.core import CoreState, HomeAssistant  # noqa: E402
+from homeassistant.helpers import device_registry as dr, entity_registry as er  # noqa: E402
+
+
+def make_entry(entry_id: str = "test", options: dict | None = None) -> SimpleNamespace:
+    """Return a config entry stand-in."""
+    return SimpleNamespace(
+        entry_id=entry_id,
+        title="Lednice",
+        options=options or {},
+        data={},
+        async_on_unload=lambda func: None,
+        add_update_listener=lambda listener: (lambda: None),
+    )
+
+
+@pytest.fixture
+def run_with_hass(tmp_path) -> Callable[[Callable[[HomeAssistant], Awaitable[None]]], None]:
+    """Return a runner that awaits a test coroutine with a running Home Assistant core."""
+
+    def run(test: Callable[[HomeAssistant], Awaitable[None]]) -> None:
+        async def main() -> None:
+            hass = HomeAssistant(str(tmp_path))
+            hass.config.set_time_zone("Europe/Prague")
+            hass.state = CoreState.running
+            await dr.async_load(hass)
+            await er.async_load(hass)
+            try:
+                await test(hass)
+            finally:
+                await hass.async_stop(force=True)
+
+        asyncio.run(main())
+
+    return run
@@ -0,0 +1,45 @@
+"""Tests for the running consumption aggregates."""
+from __future__ import annotations
+
+import random
+from collections import deque
+
+import pytest
+
+from custom_components.lednice.aggregates import ConsumptionAggregates
+
+
+def test_incremental_matches_rebuild_after_eviction() -> None:
+    """Appending to a full ring and removing the evicted entry gives the same totals as a rebuild."""
+    rng = random.Random(5)
+    log: deque[dict] = deque(maxlen=50)
+    aggregates = ConsumptionAggregates()
+
+    for index in range(500):
+        entry = {
+            "item": f"Product {rng.randint(1, 4)}",
+            "quantity": rng.randint(1, 3),
+            "room": f"room{rng.randint(1, 3)}",
+            # Prices change over time, so old and new entries of an item differ
+            "price": rng.choice([5.0, 22.0, 30.0]),
+            "timestamp": f"2025-01-01T00:{index // 60:02d}:{index % 60:02d}",
+        }
+        if len(log) == log.maxlen:
+            aggregates.remove(log[0])
+        log.append(entry)
+        aggregates.add(entry)
+
+    rebuilt = ConsumptionAggregates()
+    rebuilt.rebuild(list(log))
+
+    assert aggregates.rooms.keys() == rebuilt.rooms.keys()
+    for room, totals in rebuilt.rooms.items():
+        incremental = aggregates.rooms[room]
+        assert incremental.quantity == totals.quantity
+        assert incremental.revenue == pytest.approx(totals.revenue)
+        assert incremental.items.keys() == totals.items.keys()
+        for item, item_totals in totals.items.items():
+            assert incremental.items[item]["quantity"] == item_totals["quantity"]
+            assert incremental.items[item]["unit_price"] == item_totals["unit_price"]
+            assert incremental.items[item]["total_price"] == pytest.approx(item_totals["total_price"])
+    assert aggregates.item_totals == rebuilt.item_totals
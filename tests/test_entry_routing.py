@@ -0,0 +1,61 @@
+"""Tests for routing calls and events between several fridges."""
+from __future__ import annotations
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.storage import Store
+
+from custom_components.lednice import LedniceDataCoordinator, async_setup_services
+from custom_components.lednice.const import DOMAIN
+
+from conftest import make_entry
+
+
+def _data(pin: str) -> dict:
+    """Return Store data with one product code and a room PIN."""
+    return {
+        "inventory": {"Pivo": {"quantity": 10, "price": 30.0}},
+        "room_pins": {"room1": pin},
+        "consumption_log": [],
+        "product_codes": {"1": {"name": "Pivo", "price": 30.0}},
+        "history": [],
+    }
+
+
+def test_events_carry_entry_id(run_with_hass) -> None:
+    """Kiosk events name the fridge they come from, so other fridges' kiosks can ignore them."""
+
+    async def test(hass) -> None:
+        for entry_id, pin in (("fridge_a", "1111"), ("fridge_b", "2222")):
+            hass.data.setdefault(DOMAIN, {})[entry_id] = LedniceDataCoordinator(
+                hass, Store(hass, 1, f"lednice_{entry_id}"), _data(pin), make_entry(entry_id)
+            )
+        await async_setup_services(hass)
+
+        events = []
+        for event_type in ("pin_verified", "products_consumed", "consume_failed"):
+            hass.bus.async_listen(f"{DOMAIN}_{event_type}", events.append)
+
+        await hass.services.async_call(
+            DOMAIN, "verify_pin", {"pin": "2222", "entry_id": "fridge_b"}, blocking=True, return_response=True
+        )
+        await hass.services.async_call(
+            DOMAIN, "consume_products", {"pin": "1111", "products": [1], "entry_id": "fridge_a"},
+            blocking=True, return_response=True,
+        )
+        await hass.services.async_call(
+            DOMAIN, "consume_products", {"pin": "2222", "products": [1], "entry_id": "fridge_a"},
+            blocking=True, return_response=True,
+        )
+        await hass.async_block_till_done()
+
+        assert [(event.event_type, event.data["entry_id"]) for event in events] == [
+            (f"{DOMAIN}_pin_verified", "fridge_b"),
+            (f"{DOMAIN}_products_consumed", "fridge_a"),
+            (f"{DOMAIN}_consume_failed", "fridge_a"),
+        ]
+
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(DOMAIN, "verify_pin", {"pin": "1111"}, blocking=True, return_response=True)
+
+    run_with_hass(test)
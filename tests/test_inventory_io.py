@@ -0,0 +1,61 @@
+"""Tests for the inventory import/export services."""
+from __future__ import annotations
+
+import os
+
+import pytest
+from homeassistant import auth
+from homeassistant.core import Context
+from homeassistant.exceptions import HomeAssistantError, Unauthorized
+from homeassistant.helpers.storage import Store
+
+from custom_components.lednice import LedniceDataCoordinator, async_setup_services
+from custom_components.lednice.const import DOMAIN
+from custom_components.lednice.inventory_io import resolve_inventory_file
+
+from conftest import make_entry
+
+
+def test_files_stay_in_lednice_folder(run_with_hass) -> None:
+    """Only CSV/JSON files inside <config>/lednice/ resolve."""
+
+    async def test(hass) -> None:
+        assert resolve_inventory_file(hass, "lednice/dodavka.csv") == os.path.join(
+            os.path.realpath(hass.config.config_dir), "lednice", "dodavka.csv"
+        )
+        for file in ("secrets.csv", "lednice/../other.json", ".storage/core.json", "lednice/notes.yaml"):
+            with pytest.raises(HomeAssistantError):
+                resolve_inventory_file(hass, file)
+
+    run_with_hass(test)
+
+
+def test_import_is_admin_only_and_hides_rows(run_with_hass) -> None:
+    """Non-admin users cannot import; rejected rows report their number and reason only."""
+
+    async def test(hass) -> None:
+        hass.auth = await auth.auth_manager_from_config(hass, [], [])
+        # The first user becomes the owner
+        admin = await hass.auth.async_create_user("Owner", group_ids=["system-admin"])
+        guest = await hass.auth.async_create_user("Guest", group_ids=["system-users"])
+
+        data = {"inventory": {}, "room_pins": {}, "consumption_log": [], "product_codes": {}, "history": []}
+        hass.data.setdefault(DOMAIN, {})["test"] = LedniceDataCoordinator(
+            hass, Store(hass, 1, "lednice_test"), data, make_entry()
+        )
+        await async_setup_services(hass)
+
+        items = {"items": [{"item_name": "Pivo", "quantity": 5}, {"secret": "x"}]}
+        with pytest.raises(Unauthorized):
+            await hass.services.async_call(
+                DOMAIN, "import_inventory", items, blocking=True, return_response=True,
+                context=Context(user_id=guest.id),
+            )
+
+        result = await hass.services.async_call(
+            DOMAIN, "import_inventory", items, blocking=True, return_response=True,
+            context=Context(user_id=admin.id),
+        )
+        assert result["added"] and result["rejected"] == [{"row": 2, "reason": "missing_item_name"}]
+
+    run_with_hass(test)
@@ -0,0 +1,62 @@
+"""Tests for the reservation shown by the room consumption sensors."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from custom_components.lednice import LedniceDataCoordinator
+from custom_components.lednice.sensor import LedniceRoomConsumptionSensor
+
+from conftest import make_entry
+
+
+def _reservation(guest: str, checkin_ts: float, checkout_ts: float) -> dict:
+    """Return a stored Previo reservation of room1."""
+    return {
+        "room": "room1",
+        "pin": "123456",
+        "guest": guest,
+        "checkin": dt_util.utc_from_timestamp(checkin_ts).isoformat(),
+        "checkout": dt_util.utc_from_timestamp(checkout_ts).isoformat(),
+        "checkin_ts": checkin_ts,
+        "checkout_ts": checkout_ts,
+    }
+
+
+def test_guest_appears_when_stay_begins(run_with_hass) -> None:
+    """The room sensor switches to the arriving guest at check-in without any other change."""
+
+    async def test(hass) -> None:
+        now = time.time()
+        data = {
+            "inventory": {},
+            "room_pins": {},
+            "consumption_log": [],
+            "product_codes": {},
+            "history": [],
+            "previo_pins": {
+                "room1_old": _reservation("Departing", now - 86400, now + 3600),
+                "room1_new": _reservation("Arriving", now + 0.5, now + 86400),
+            },
+        }
+        entry = make_entry()
+        coordinator = LedniceDataCoordinator(hass, Store(hass, 1, "lednice_test"), data, entry)
+        await coordinator.setup_previo_monitoring()
+
+        sensor = LedniceRoomConsumptionSensor(coordinator, entry, "room1")
+        sensor.hass = hass
+        sensor.entity_id = "sensor.lednice_room1_consumption"
+        await sensor.async_added_to_hass()
+        assert sensor.extra_state_attributes["guest"] == "Departing"
+
+        # Past the check-in time; nothing else touches the coordinator
+        await asyncio.sleep(1)
+        assert sensor.extra_state_attributes["guest"] == "Arriving"
+
+        for unsubscribe in coordinator._previo_listeners:
+            unsubscribe()
+
+    run_with_hass(test)
@@ -78,6 +78,7 @@ class LedniceProductAdminCard extends HTMLElement {
 
       // Listen for PIN verification events from server
       this._hass.connection.subscribeEvents((event) => {
+        if (!this._isOwnEvent(event.data)) return;
         console.log('📨 Received lednice_pin_verified event:', event.data);
         this._handlePinVerificationEvent(event.data);
       }, 'lednice_pin_verified');
@@ -86,6 +87,16 @@ class LedniceProductAdminCard extends HTMLElement {
     }
   }
 
+  _serviceData(data) {
+    // With several fridges configured, entry_id routes the call to this card's fridge
+    return this._config.entry_id ? { ...data, entry_id: this._config.entry_id } : data;
+  }
+
+  _isOwnEvent(data) {
+    // Events of other fridges are ignored when entry_id is configured
+    return !this._config.entry_id || data.entry_id === this._config.entry_id;
+  }
+
   _handlePinVerificationEvent(data) {
     const { valid, room, pin } = data;
 
@@ -152,9 +163,9 @@ class LedniceProductAdminCard extends HTMLElement {
 
   _verifyPin() {
     console.log('Verifying PIN...');
-    this._hass.callService('lednice', 'verify_pin', {
+    this._hass.callService('lednice', 'verify_pin', this._serviceData({
       pin: this._pin
-    });
+    }));
   }
 
   _handleFormInput(field, value) {
@@ -187,19 +198,19 @@ class LedniceProductAdminCard extends HTMLElement {
     }
 
     // 1. Add/update product code (template)
-    this._hass.callService('lednice', 'add_product_code', {
+    this._hass.callService('lednice', 'add_product_code', this._serviceData({
       product_code: parseInt(code),
       product_name: name.trim(),
       price: parseFloat(price),
       code: barcode.trim()
-    }).then(() => {
+    })).then(() => {
       // 2. If quantity is specified, add to inventory
       if (quantity && parseInt(quantity) > 0) {
-        return this._hass.callService('lednice', 'add_item', {
+        return this._hass.callService('lednice', 'add_item', this._serviceData({
           item_name: name.trim(),
           quantity: parseInt(quantity),
           code: barcode.trim() || undefined
-        });
+        }));
       }
     }).then(() => {
       const msg = this._editingProduct
@@ -265,9 +276,9 @@ class LedniceProductAdminCard extends HTMLElement {
 
   _deleteProduct(code) {
     if (confirm(`Opravdu chcete smazat produkt ${code}?`)) {
-      this._hass.callService('lednice', 'remove_product_code', {
+      this._hass.callService('lednice', 'remove_product_code', this._serviceData({
         product_code: parseInt(code)
-      }).then(() => {
+      })).then(() => {
         alert(`Produkt ${code} byl smazán!`);
         if (this._editingProduct === code) {
           this._clearForm();
@@ -301,9 +312,9 @@ class LedniceProductAdminCard extends HTMLElement {
 
   _clearRoomConsumption(room) {
     if (confirm(`Opravdu chcete vynulovat spotřebu pro ${room}?`)) {
-      this._hass.callService('lednice', 'clear_room_consumption', {
+      this._hass.callService('lednice', 'clear_room_consumption', this._serviceData({
         room: room
-      }).then(() => {
+      })).then(() => {
         alert(`Spotřeba pro ${room} byla vynulována!`);
         this.render();
       }).catch((err) => {
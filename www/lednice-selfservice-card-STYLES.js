@@ -52,6 +52,7 @@ class LedniceSelfServiceCard extends HTMLElement {
 
     if (!this._eventListenerSetup) {
       hass.connection.subscribeEvents((event) => {
+        if (!this._isOwnEvent(event.data)) return;
         console.warn('📨 Received event:', event);
         this._handlePinVerificationEvent(event.data);
       }, 'lednice_pin_verified');
@@ -60,6 +61,16 @@ class LedniceSelfServiceCard extends HTMLElement {
     }
   }
 
+  _serviceData(data) {
+    // With several fridges configured, entry_id routes the call to this card's fridge
+    return this.config.entry_id ? { ...data, entry_id: this.config.entry_id } : data;
+  }
+
+  _isOwnEvent(data) {
+    // Events of other fridges are ignored when entry_id is configured
+    return !this.config.entry_id || data.entry_id === this.config.entry_id;
+  }
+
   _handlePinVerificationEvent(data) {
     const { valid, room, pin } = data;
 
@@ -377,9 +388,9 @@ class LedniceSelfServiceCard extends HTMLElement {
 
       // Call Home Assistant service - response will come via event
       // Note: Using event-based approach because return_response has syntax issues
-      await this._hass.callService('lednice', 'verify_pin', {
+      await this._hass.callService('lednice', 'verify_pin', this._serviceData({
         pin: this._pin
-      });
+      }));
 
       console.warn('📡 Service call sent - response will arrive via event lednice_pin_verified');
 
@@ -763,10 +774,10 @@ class LedniceSelfServiceCard extends HTMLElement {
     console.warn(`🛒 Checkout: products=${products}, pin=${currentPin}`);
 
     try {
-      await this._hass.callService('lednice', 'consume_products', {
+      await this._hass.callService('lednice', 'consume_products', this._serviceData({
         pin: currentPin,
         products: products
-      });
+      }));
 
       alert(`✓ Úspěšně zaznamenáno!\n\nCelková částka: ${this._calculateTotal().toFixed(2)} Kč\n\nDěkujeme!`);
 
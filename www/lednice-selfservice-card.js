@@ -24,6 +24,7 @@ class LedniceSelfServiceCard extends HTMLElement {
     
     // SERVER VALIDATED STATE - never set manually!
     this._serverValidatedRoom = null;
+    this._sessionPin = null;
     this._sessionTimestamp = null;
     this._sessionTimeout = 60000; // Session expires after 60 seconds of no server contact
     
@@ -59,6 +60,7 @@ class LedniceSelfServiceCard extends HTMLElement {
       
       // Listen for PIN verification events from server
       this._hass.connection.subscribeEvents((event) => {
+        if (!this._isOwnEvent(event.data)) return;
         console.warn('📨 Received lednice_pin_verified event:', event.data);
         this._handlePinVerificationEvent(event.data);
       }, 'lednice_pin_verified');
@@ -67,6 +69,16 @@ class LedniceSelfServiceCard extends HTMLElement {
     }
   }
 
+  _serviceData(data) {
+    // With several fridges configured, entry_id routes the call to this card's fridge
+    return this.config.entry_id ? { ...data, entry_id: this.config.entry_id } : data;
+  }
+
+  _isOwnEvent(data) {
+    // Events of other fridges are ignored when entry_id is configured
+    return !this.config.entry_id || data.entry_id === this.config.entry_id;
+  }
+
   _handlePinVerificationEvent(data) {
     const { valid, room, pin } = data;
     
@@ -76,6 +88,7 @@ class LedniceSelfServiceCard extends HTMLElement {
       // ✅ SERVER CONFIRMED - Valid PIN
       console.warn(`✅ SERVER APPROVED ACCESS - Room: ${room}`);
       this._serverValidatedRoom = room;
+      this._sessionPin = pin; // Needed again by consume_products
       this._sessionTimestamp = Date.now();
       this._failedAttempts = 0;
       this._pin = ''; // Clear PIN after successful auth
@@ -85,6 +98,7 @@ class LedniceSelfServiceCard extends HTMLElement {
       // ❌ SERVER REJECTED - Invalid PIN
       console.warn('❌ SERVER DENIED ACCESS');
       this._serverValidatedRoom = null;
+      this._sessionPin = null;
       this._sessionTimestamp = null;
       this._failedAttempts++;
       
@@ -114,6 +128,7 @@ class LedniceSelfServiceCard extends HTMLElement {
     if (!isValid) {
       console.warn('⏰ Session expired');
       this._serverValidatedRoom = null;
+      this._sessionPin = null;
       this._sessionTimestamp = null;
     }
     
@@ -140,6 +155,7 @@ class LedniceSelfServiceCard extends HTMLElement {
     } else {
       console.warn('🔒 No valid session - Showing PIN screen');
       this._serverValidatedRoom = null;
+      this._sessionPin = null;
       this._sessionTimestamp = null;
       this._renderPinScreen();
     }
@@ -331,9 +347,9 @@ class LedniceSelfServiceCard extends HTMLElement {
 
       // Call Home Assistant service - response will come via event
       // Note: Using event-based approach because return_response has syntax issues
-      await this._hass.callService('lednice', 'verify_pin', {
+      await this._hass.callService('lednice', 'verify_pin', this._serviceData({
         pin: this._pin
-      });
+      }));
 
       console.warn('📡 Service call sent - response will arrive via event lednice_pin_verified');
 
@@ -353,6 +369,7 @@ class LedniceSelfServiceCard extends HTMLElement {
   _lockCard() {
     this._locked = true;
     this._serverValidatedRoom = null;
+    this._sessionPin = null;
     this._sessionTimestamp = null;
     this._failedAttempts = 0;
     this._pin = '';
@@ -773,26 +790,16 @@ class LedniceSelfServiceCard extends HTMLElement {
   }
 
   async _confirmPurchase() {
-    // Get PIN from current validated session (we need it for consume_products service)
+    // consume_products needs the PIN the server verified for this session
     // Note: The server will validate it again on consume_products
-    const inventoryEntity = this._hass.states[this.config.entity];
-    const roomPins = inventoryEntity?.attributes?.room_pins || {};
-    
-    // Find PIN for current room
-    let currentPin = null;
-    for (const [room, pin] of Object.entries(roomPins)) {
-      if (room === this._serverValidatedRoom) {
-        currentPin = pin;
-        break;
-      }
-    }
-    
+    const currentPin = this._sessionPin;
+
     if (!currentPin) {
       alert('Chyba: Nepodařilo se najít PIN pro aktuální místnost');
       this._logout();
       return;
     }
-    
+
     const products = [];
     for (const [code, qty] of Object.entries(this._cart)) {
       for (let i = 0; i < qty; i++) {
@@ -805,10 +812,10 @@ class LedniceSelfServiceCard extends HTMLElement {
     }
 
     try {
-      await this._hass.callService('lednice', 'consume_products', {
+      await this._hass.callService('lednice', 'consume_products', this._serviceData({
         pin: currentPin,
         products: products
-      });
+      }));
 
       alert(`✓ Úspěšně zaznamenáno!\n\nCelková částka: ${this._calculateTotal().toFixed(2)} Kč\n\nDěkujeme!`);
 
@@ -825,6 +832,7 @@ class LedniceSelfServiceCard extends HTMLElement {
     this._pin = '';
     this._cart = {};
     this._serverValidatedRoom = null;
+    this._sessionPin = null;
     this._sessionTimestamp = null;
 
     // Always turn off the guest logged in input_boolean